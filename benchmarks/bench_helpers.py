@@ -0,0 +1,161 @@
+"""Micro-benchmarks for the pure-Python helpers behind planning and bookkeeping.
+
+Usage:
+    python benchmarks/bench_helpers.py                              # 10k and 100k rows
+    python benchmarks/bench_helpers.py --sizes 10000 1000000 --only canonical_url dedupe_jobs
+    python benchmarks/bench_helpers.py --save benchmarks/baseline.json
+    python benchmarks/bench_helpers.py --compare benchmarks/baseline.json --tolerance 0.5
+
+No browser needed. Every case runs on a synthetic sheet of N rows (about
+10% duplicate URLs spelled differently, names with characters that need
+sanitizing) and reports the best of `--repeat` runs in µs per row. With
+`--compare`, a case that got more than `--tolerance` slower per row than
+the saved baseline is flagged and the exit code is 1; a baseline is only
+meaningful on the machine that recorded it.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.bench_rules import synthetic_rows  # noqa: E402
+from course_sheet import NAME_COLUMN_NAMES, URL_COLUMN_NAMES, dedupe_jobs, detect_columns  # noqa: E402
+from course_urls import canonical_url, page_type, url_slug  # noqa: E402
+from filter_rules import is_faq  # noqa: E402
+from incremental import diff_jobs  # noqa: E402
+from output_manager import build_filename  # noqa: E402
+from scheduler import balance, order_longest_first  # noqa: E402
+from sharding import shard_of  # noqa: E402
+
+_TYPES = ["learn", "specializations", "professional-certificates", "projects"]
+_NAMES = ["Python for Everybody", "AI: Basics / Advanced", 'Data "Science" <Intro>', "Cloud|DevOps?", None]
+_HEADER_NOISE = ["Row", "Notes", "Owner", "Status", "Added on", "Priority", "Category"]
+
+
+def synthetic_jobs(n, seed=0):
+    """`(row, url, name)` jobs; every 10th URL repeats an earlier one in another spelling."""
+    rnd = random.Random(seed)
+    jobs = []
+    for row_no in range(1, n + 1):
+        if row_no > 10 and row_no % 10 == 0:
+            url = jobs[rnd.randrange(len(jobs))][1].upper().replace("HTTPS", "https") + "/?utm_source=sheet#about"
+        else:
+            url = f"https://www.coursera.org/{rnd.choice(_TYPES)}/course-{row_no}-{rnd.randrange(10**6)}"
+        jobs.append((row_no, url, rnd.choice(_NAMES)))
+    return jobs
+
+
+def synthetic_headers(n, seed=0):
+    """Header rows of mixed width with the URL/name columns spelled different ways."""
+    rnd = random.Random(seed)
+    headers = []
+    for _ in range(n):
+        header = rnd.sample(_HEADER_NOISE, rnd.randrange(len(_HEADER_NOISE)))
+        header += [rnd.choice(URL_COLUMN_NAMES).upper(), f" {rnd.choice(NAME_COLUMN_NAMES).title()} "]
+        rnd.shuffle(header)
+        headers.append(header)
+    return headers
+
+
+def _history(jobs, seed=0):
+    rnd = random.Random(seed)
+    return {canonical_url(url): rnd.uniform(30, 300) for _, url, _ in jobs[::2]}
+
+
+def _snapshot(jobs):
+    """A previous run's snapshot: 5% of names changed, 5% of rows gone."""
+    snapshot = {}
+    for row_no, url, name in jobs:
+        if row_no % 20 == 0:
+            continue
+        snapshot[canonical_url(url)] = {"row": row_no, "url": url, "name": "old name" if row_no % 20 == 1 else name}
+    return snapshot
+
+
+def cases(n):
+    """`{name: zero-argument callable}` over inputs of `n` rows, built outside the timing."""
+    jobs = synthetic_jobs(n)
+    urls = [url for _, url, _ in jobs]
+    buttons = synthetic_rows(n)
+    headers = synthetic_headers(n)
+    unique, _ = dedupe_jobs(jobs)
+    history = _history(unique)
+    snapshot = _snapshot(unique)
+    return {
+        "url_slug": lambda: [url_slug(u) for u in urls],
+        "canonical_url": lambda: [canonical_url(u) for u in urls],
+        "page_type": lambda: [page_type(u) for u in urls],
+        "build_filename": lambda: [build_filename(url, "Course title", name) for _, url, name in jobs],
+        "is_faq": lambda: [is_faq(*row) for row in buttons],
+        "detect_columns": lambda: [detect_columns(header) for header in headers],
+        "dedupe_jobs": lambda: dedupe_jobs(jobs),
+        "shard_of": lambda: [shard_of(u, 8) for u in urls],
+        "diff_jobs": lambda: diff_jobs(snapshot, unique),
+        "order_longest_first": lambda: order_longest_first(unique, history),
+        "balance": lambda: balance(unique, 8, history),
+    }
+
+
+def run(sizes, only=None, repeat=5):
+    """`{"<case>@<rows>": µs per row}`, best of `repeat` runs."""
+    results = {}
+    for n in sizes:
+        for name, fn in cases(n).items():
+            if only and name not in only:
+                continue
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - start)
+            results[f"{name}@{n}"] = best * 1e6 / n
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Cases more than `tolerance` (0.5 = 50%) slower than the baseline: `[(key, old, new)]`."""
+    return [
+        (key, baseline[key], value)
+        for key, value in results.items()
+        if key in baseline and value > baseline[key] * (1 + tolerance)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--only", nargs="+", help="run only these cases")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="write the results as a baseline JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown per row (default: 0.5)")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.only, args.repeat)
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else {}
+    for key, value in results.items():
+        name, rows = key.split("@")
+        line = f"  {name:<20} {int(rows):>9,} rows {value:9.3f} µs/row {value * int(rows) / 1e3:10.1f} ms"
+        if key in baseline:
+            line += f"  ({(value / baseline[key] - 1) * 100:+.0f}% vs baseline)"
+        print(line)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=1, sort_keys=True))
+        print(f"💾 Baseline saved to {args.save}")
+    if args.compare:
+        regressions = compare(results, baseline, args.tolerance)
+        for key, old, new in regressions:
+            print(f"❌ {key}: {old:.3f} -> {new:.3f} µs/row")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No case more than {args.tolerance:.0%} slower than the baseline")
+
+
+if __name__ == "__main__":
+    main()
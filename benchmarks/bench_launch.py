@@ -0,0 +1,141 @@
+"""Compare browser launch profiles by time and memory per row.
+
+Usage:
+    python benchmarks/bench_launch.py                       # fixture page, all headless profiles
+    python benchmarks/bench_launch.py --rows 10 --profiles headless single-process
+    python benchmarks/bench_launch.py --source sheet --excel courses.xlsx --rows 5 --workload full
+    python benchmarks/bench_launch.py --source sheet --rows 5 --workload full --har-dir pdfs/har
+
+`render` only loads, scrolls and prints each page; `full` runs the whole
+coursera_pipeline flow, so it includes the pipeline's fixed waits.
+With `--har-dir`, sheet rows are replayed offline from archives recorded
+by `coursera_pipeline.py --har record`, so every run sees the same pages.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from playwright.sync_api import sync_playwright  # noqa: E402
+
+from course_sheet import dedupe_jobs, read_jobs  # noqa: E402
+from filter_rules import add_init_rules  # noqa: E402
+from har_replay import replay_context  # noqa: E402
+from launch_config import LAUNCH_PROFILES, launch_browser  # noqa: E402
+from resource_usage import process_tree_rss_mb  # noqa: E402
+
+FIXTURE_PAGE = ROOT / "tests" / "fixtures" / "course_page.html"
+
+
+def _load_urls(args):
+    """URLs to render: the fixture page repeated, or the first rows of the sheet."""
+    if args.source == "fixture":
+        return [FIXTURE_PAGE.as_uri()] * args.rows
+
+    jobs, _, _, _ = read_jobs(args.excel)
+    jobs, _ = dedupe_jobs(jobs)
+    return [url for _, url, _ in jobs[: args.rows]]
+
+
+def _render_row(page, url, workload, out_dir):
+    """Process one row and return the PDF size in bytes."""
+    if workload == "full":
+        import coursera_pipeline as cp
+
+        page.goto(url, wait_until="domcontentloaded")
+        cp.process_about_section(page, url)
+        cp.process_modules_section(page, url)
+        cp.progressive_scroll_to_bottom(page)
+        cp.prepare_page_for_pdf(page)
+        path = cp.generate_pdf(page, url, output_dir=out_dir)
+        return os.path.getsize(path) if path else 0
+
+    page.goto(url, wait_until="load")
+    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+    page.emulate_media(media="print")
+    return len(page.pdf(format="A4", print_background=True))
+
+
+def bench_profile(playwright, profile, urls, workload, har_dir=None):
+    """Run every URL through one launch profile and collect timings."""
+    t0 = time.perf_counter()
+    browser = launch_browser(playwright, profile)
+    context = browser.new_context(viewport={"width": 1920, "height": 1080},
+                                  **({"service_workers": "block"} if har_dir else {}))
+    if har_dir:
+        for url in replay_context(context, har_dir, urls):
+            print(f"  ⚠️ No HAR archive for {url[:60]}; it will fail offline")
+    add_init_rules(context, observe=True)
+    page = context.new_page()
+    launch_s = time.perf_counter() - t0
+
+    row_times, peak_mb, total_bytes, failures = [], process_tree_rss_mb(), 0, 0
+    with tempfile.TemporaryDirectory() as out_dir:
+        for url in urls:
+            start = time.perf_counter()
+            try:
+                total_bytes += _render_row(page, url, workload, out_dir)
+            except Exception as e:
+                failures += 1
+                print(f"  ⚠️ {profile}: {url[:60]} failed: {str(e)[:60]}")
+            row_times.append(time.perf_counter() - start)
+            peak_mb = max(peak_mb, process_tree_rss_mb())
+
+    context.close()
+    browser.close()
+    return {
+        "profile": profile,
+        "rows": len(urls),
+        "failures": failures,
+        "launch_s": round(launch_s, 3),
+        "mean_row_s": round(sum(row_times) / max(len(row_times), 1), 3),
+        "max_row_s": round(max(row_times, default=0.0), 3),
+        "peak_rss_mb": round(peak_mb, 1),
+        "pdf_bytes": total_bytes,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--profiles",
+        nargs="+",
+        default=[name for name, spec in LAUNCH_PROFILES.items() if spec["headless"]],
+        choices=sorted(LAUNCH_PROFILES),
+    )
+    parser.add_argument("--rows", type=int, default=5)
+    parser.add_argument("--source", choices=["fixture", "sheet"], default="fixture")
+    parser.add_argument("--excel", default=str(ROOT / "courses.xlsx"))
+    parser.add_argument("--workload", choices=["render", "full"], default="render")
+    parser.add_argument("--har-dir", help="replay the rows offline from the HAR archives in this folder")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    urls = _load_urls(args)
+    results = []
+    with sync_playwright() as p:
+        for profile in args.profiles:
+            print(f"▶️  {profile} ({len(urls)} rows, {args.workload})")
+            results.append(bench_profile(p, profile, urls, args.workload, args.har_dir))
+
+    header = f"{'profile':<18}{'launch s':>10}{'row s':>9}{'max s':>9}{'peak MB':>10}{'fails':>7}"
+    print("\n" + header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['profile']:<18}{r['launch_s']:>10.2f}{r['mean_row_s']:>9.2f}"
+            f"{r['max_row_s']:>9.2f}{r['peak_rss_mb']:>10.1f}{r['failures']:>7}"
+        )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
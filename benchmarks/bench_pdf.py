@@ -0,0 +1,115 @@
+"""Compare PDF layout profiles by render time, page count and size.
+
+Usage:
+    python benchmarks/bench_pdf.py                      # every profile, every fixture page
+    python benchmarks/bench_pdf.py --profiles a4 long --repeat 5
+    python benchmarks/bench_pdf.py --pages tests/fixtures/course_page.html
+
+Each page is loaded and prepared once per profile; `page.pdf()` is timed
+separately from the load-and-scroll that precedes it ("settle s", until the
+network is idle), and the bytes loaded meanwhile are counted. A profile
+that skips lazy assets (`pdf_profiles.asset_skips`) is also run with every
+asset loaded, as "<profile> (all assets)", to show what the skips save.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from playwright.sync_api import sync_playwright  # noqa: E402
+
+from launch_config import launch_browser  # noqa: E402
+from lazy_assets import skip_assets  # noqa: E402
+from pdf_profiles import PDF_PROFILES, asset_skips, pdf_options, pdf_page_count  # noqa: E402
+
+FIXTURES = ROOT / "tests" / "fixtures"
+
+
+def _body_size(request):
+    try:
+        return max(request.sizes()["responseBodySize"], 0)
+    except Exception:
+        return 0
+
+
+def bench_profile(page, profile, pages, repeat, skip=True):
+    """Render every fixture page `repeat` times with one profile.
+
+    With `skip`, the profile's lazy-asset skips are applied before the
+    scroll, as in the pipeline.
+    """
+    skipped = asset_skips(profile) if skip else ()
+    times, settle, page_counts, sizes = [], [], [], []
+    loaded = []
+
+    def on_finished(request):
+        loaded.append(_body_size(request))
+
+    page.on("requestfinished", on_finished)
+    for path in pages:
+        page.emulate_media(media="screen")
+        start = time.perf_counter()
+        page.goto(Path(path).resolve().as_uri(), wait_until="domcontentloaded")
+        skip_assets(page, skipped)
+        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        page.wait_for_load_state("networkidle")
+        settle.append(time.perf_counter() - start)
+        page.emulate_media(media="print")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            data = page.pdf(**pdf_options(profile, page))
+            times.append(time.perf_counter() - start)
+        page_counts.append(pdf_page_count(data))
+        sizes.append(len(data))
+    page.remove_listener("requestfinished", on_finished)
+    return {
+        "profile": profile if skip or not asset_skips(profile) else f"{profile} (all assets)",
+        "skipped_assets": list(skipped),
+        "renders": len(times),
+        "mean_settle_s": round(sum(settle) / max(len(settle), 1), 4),
+        "loaded_bytes": sum(loaded),
+        "mean_render_s": round(sum(times) / max(len(times), 1), 4),
+        "max_render_s": round(max(times, default=0.0), 4),
+        "pages": sum(page_counts),
+        "bytes": sum(sizes),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", default=list(PDF_PROFILES), choices=sorted(PDF_PROFILES))
+    parser.add_argument("--pages", nargs="+", default=sorted(str(p) for p in FIXTURES.glob("*.html")))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    with sync_playwright() as p:
+        browser = launch_browser(p, "headless")
+        page = browser.new_context(viewport={"width": 1200, "height": 800}).new_page()
+        for profile in args.profiles:
+            print(f"▶️  {profile} ({len(args.pages)} page(s) x {args.repeat})")
+            results.append(bench_profile(page, profile, args.pages, args.repeat))
+            if asset_skips(profile):
+                results.append(bench_profile(page, profile, args.pages, args.repeat, skip=False))
+        browser.close()
+
+    header = f"{'profile':<26}{'settle s':>10}{'loaded KB':>11}{'render s':>10}{'max s':>9}{'pages':>7}{'KB':>10}"
+    print("\n" + header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['profile']:<26}{r['mean_settle_s']:>10.3f}{r['loaded_bytes'] / 1024:>11.1f}"
+            f"{r['mean_render_s']:>10.3f}{r['max_render_s']:>9.3f}{r['pages']:>7}{r['bytes'] / 1024:>10.1f}"
+        )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark the compiled FAQ/read-more matchers and check Python/JS agree.
+
+Usage:
+    python benchmarks/bench_rules.py                 # Python matcher only
+    python benchmarks/bench_rules.py --js            # also time the in-page matcher
+    python benchmarks/bench_rules.py --rows 1000000
+
+The `legacy` column is the old per-call `.lower()` + substring checks, kept
+here only as a baseline.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from filter_rules import is_faq, rules_js, should_skip_read_more  # noqa: E402
+
+_LABELS = [
+    "Course 1: Foundations", "Module 3 - Testing", "Frequently Asked Questions",
+    "Read more about partner Fixture University", "Explore more courses", "",
+    "What is the refund policy?", "Week 2: Automation", "FAQ",
+]
+_CLASSES = ["css-1x2y", "cds-accordion", "css-faq-item", "module-toggle", ""]
+
+
+def synthetic_rows(n, seed=0):
+    """Attribute tuples `(aria_label, data_e2e, class, text)` for n fake buttons."""
+    rnd = random.Random(seed)
+    return [
+        (rnd.choice(_LABELS), rnd.choice(["", "faq-question", "module"]), rnd.choice(_CLASSES), rnd.choice(_LABELS))
+        for _ in range(n)
+    ]
+
+
+def legacy_is_faq(aria_label, data_e2e, btn_class, btn_text):
+    texts = [aria_label.lower(), data_e2e.lower(), btn_class.lower(), btn_text.lower()]
+    return any(kw in t for kw in ["faq", "frequently asked", "question"] for t in texts)
+
+
+def _time(fn, rows):
+    start = time.perf_counter()
+    hits = sum(1 for r in rows if fn(*r))
+    return time.perf_counter() - start, hits
+
+
+def bench_js(rows):
+    """Render `rows` as buttons and classify them in-page; returns (seconds, results)."""
+    from playwright.sync_api import sync_playwright
+    from launch_config import launch_browser
+
+    with sync_playwright() as p:
+        browser = launch_browser(p)
+        page = browser.new_page()
+        page.set_content("<body></body>")
+        page.evaluate(
+            """rows => {
+                const frag = document.createDocumentFragment();
+                for (const [label, e2e, cls, text] of rows) {
+                    const div = document.createElement('div');
+                    const inner = document.createElement('div');
+                    const b = document.createElement('button');
+                    if (label) b.setAttribute('aria-label', label);
+                    if (e2e) b.setAttribute('data-e2e', e2e);
+                    if (cls) b.setAttribute('class', cls);
+                    b.textContent = text;
+                    inner.appendChild(b); div.appendChild(inner); frag.appendChild(div);
+                }
+                document.body.appendChild(frag);
+            }""",
+            rows,
+        )
+        page.evaluate(rules_js())
+        start = time.perf_counter()
+        results = page.evaluate(
+            "() => Array.from(document.querySelectorAll('button'), b => window.__certRules.isFaqElement(b))"
+        )
+        elapsed = time.perf_counter() - start
+        browser.close()
+    return elapsed, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--js", action="store_true", help="also benchmark the in-page matcher (needs a browser)")
+    args = parser.parse_args(argv)
+
+    rows = synthetic_rows(args.rows)
+    compiled_s, compiled_hits = _time(is_faq, rows)
+    legacy_s, legacy_hits = _time(legacy_is_faq, rows)
+    skip_s, _ = _time(lambda label, *_: should_skip_read_more(label), rows)
+
+    print(f"rows: {args.rows}")
+    print(f"  is_faq (compiled)        {compiled_s * 1e6 / args.rows:8.3f} µs/row  hits={compiled_hits}")
+    print(f"  is_faq (legacy .lower()) {legacy_s * 1e6 / args.rows:8.3f} µs/row  hits={legacy_hits}")
+    print(f"  should_skip_read_more    {skip_s * 1e6 / args.rows:8.3f} µs/row")
+
+    if args.js:
+        js_s, js_results = bench_js(rows)
+        mismatches = sum(1 for r, js in zip(rows, js_results) if is_faq(*r) != js)
+        print(f"  isFaqElement (in-page)   {js_s * 1e6 / args.rows:8.3f} µs/row  mismatches={mismatches}")
+        if mismatches:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
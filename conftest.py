@@ -1,60 +1,163 @@
-import pytest
+"""Browser fixtures for the test suite.
+
+- `browser`: one headless Chromium per test process (so one per
+  pytest-xdist worker), launched through the `headless` launch profile;
+  `--headed` shows the window.
+- `page`: a fresh page in a context borrowed from a small pool of warm
+  contexts. The context is reset (localStorage, sessionStorage and
+  IndexedDB of its open pages, cookies and permissions cleared, pages
+  closed) before the next test gets it; if a page's storage cannot be
+  cleared the context is closed instead. Contexts get the blocking rules
+  and the popup observer from `filter_rules.add_init_rules`, and count
+  dismissed popups in `context_pool.popups`, as in the pipeline.
+- `--tracing retain-on-failure` records a trace chunk per test and keeps
+  it, in `traces/<test>.zip`, only when the test fails.
+- `course_page_url`: the local fixture page, so no test needs the network.
 
+Tests that need a browser are marked `browser`; they are skipped when
+Playwright's browser build is not installed (`playwright install chromium`).
+"""
+import re
 from pathlib import Path
-from datetime import datetime
-from playwright.sync_api import sync_playwright, Page
 
+import pytest
+
+from popup_handler import PopupCounter
+
+FIXTURES = Path(__file__).resolve().parent / "tests" / "fixtures"
+TRACES = Path("traces")
+VIEWPORT = {"width": 1920, "height": 1080}
+
+_CLEAR_STORAGE_JS = """async () => {
+    localStorage.clear();
+    sessionStorage.clear();
+    for (const db of await indexedDB.databases()) indexedDB.deleteDatabase(db.name);
+}"""
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("browser")
+    group.addoption("--headed", action="store_true", help="show the browser window")
+    group.addoption(
+        "--tracing",
+        choices=("off", "retain-on-failure"),
+        default="off",
+        help="record a Playwright trace per test and keep the failed ones (default: off)",
+    )
+    group.addoption("--context-pool", type=int, default=2, help="warm browser contexts kept per test process")
+
+
+@pytest.hookimpl(hookwrapper=True, tryfirst=True)
+def pytest_runtest_makereport(item, call):
+    # Expose each phase's report to fixtures so teardown knows whether the test failed.
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+
+
+class ContextPool:
+    """Warm browser contexts handed out one per test and reset on return."""
+
+    def __init__(self, browser, size, tracing=False):
+        self.browser = browser
+        self.size = size
+        self.tracing = tracing
+        self.popups = PopupCounter()
+        self._idle = [self._new() for _ in range(size)]
+
+    def _new(self):
+        from filter_rules import add_init_rules
+
+        context = self.browser.new_context(viewport=VIEWPORT)
+        self.popups.attach(context)
+        add_init_rules(context, observe=True)
+        if self.tracing:
+            context.tracing.start(screenshots=True, snapshots=True, sources=True)
+        return context
+
+    def acquire(self):
+        return self._idle.pop() if self._idle else self._new()
+
+    def release(self, context, reuse=True):
+        if reuse and len(self._idle) < self.size:
+            reuse = all(self._clear_storage(page) for page in context.pages)
+        if not reuse or len(self._idle) >= self.size:
+            context.close()
+            return
+        for page in context.pages:
+            page.close()
+        context.clear_cookies()
+        context.clear_permissions()
+        self._idle.append(context)
+
+    @staticmethod
+    def _clear_storage(page) -> bool:
+        """Clear the web storage of the page's origin; False if that failed."""
+        if page.url == "about:blank":
+            return True
+        try:
+            page.evaluate(_CLEAR_STORAGE_JS)
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        while self._idle:
+            self._idle.pop().close()
 
 
 @pytest.fixture(scope="session")
-def browser():
+def browser(pytestconfig):
+    try:
+        from playwright.sync_api import sync_playwright
+
+        from launch_config import launch_options
+    except ImportError as e:
+        pytest.skip(f"Playwright is not installed: {e}")
+
+    options = launch_options("headless")
+    options["headless"] = not pytestconfig.getoption("headed")
     with sync_playwright() as p:
-        # Try to launch Chrome first, fall back to Chromium if Chrome is not available
         try:
-            browser = p.chromium.launch(
-                channel="chrome",
-                headless=False,  # Set to True for container environment
-                args=[
-                    "--disable-blink-features=AutomationControlled",
-                    "--disable-gpu",   # Disable GPU for container environments
-                    "--window-size=1920,1080" # Set window size for consistency
-                ]
-            )
+            browser = p.chromium.launch(**options)
         except Exception as e:
-            print(f"Failed to launch Chrome: {e}")
-            print("Falling back to Chromium...")
-            browser = p.chromium.launch(
-                headless=True,  # Set to True for container environment
-                args=[
-                    "--disable-blink-features=AutomationControlled",
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--disable-gpu",    # Disable GPU for container environments
-                    "--window-size=1920,1080" # Set window size for consistency
-                ]
-            )
+            pytest.skip(f"No browser available: {str(e).splitlines()[0]}")
         yield browser
         browser.close()
- 
-@pytest.fixture
-def page(browser, request):
-    context = browser.new_context(
-        viewport={"width": 1920, "height": 1080}
-    )
 
-    context.tracing.start(screenshots=True, snapshots=True, sources=True)
+
+@pytest.fixture(scope="session")
+def context_pool(browser, pytestconfig):
+    tracing = pytestconfig.getoption("tracing") == "retain-on-failure"
+    pool = ContextPool(browser, pytestconfig.getoption("context_pool"), tracing)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def page(context_pool, request):
+    context = context_pool.acquire()
+    if context_pool.tracing:
+        context.tracing.start_chunk(title=request.node.nodeid)
     page = context.new_page()
+    page.on("popup", lambda popup: popup.close())
 
     try:
         yield page
     finally:
-        test_name = request.node.name
-        trace_path = f"traces/{test_name}.zip"
-        Path("traces").mkdir(exist_ok=True)
+        report = getattr(request.node, "rep_call", None)
+        failed = report is None or report.failed
+        if context_pool.tracing:
+            if failed:
+                TRACES.mkdir(exist_ok=True)
+                name = re.sub(r"[^\w.-]+", "_", request.node.nodeid)
+                context.tracing.stop_chunk(path=str(TRACES / f"{name}.zip"))
+            else:
+                context.tracing.stop_chunk()
+        # A failed test may leave the context in a bad state; do not hand it on.
+        context_pool.release(context, reuse=not failed)
 
-        context.tracing.stop(path=trace_path)   # MUST run before close
-        page.close()
-        context.close()
 
- 
\ No newline at end of file
+@pytest.fixture
+def course_page_url():
+    return (FIXTURES / "course_page.html").as_uri()
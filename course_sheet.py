@@ -0,0 +1,212 @@
+"""Read the input sheet of course URLs and names.
+
+`.xlsx` files are read straight from the worksheet XML, which is several
+times faster than pandas/openpyxl on large sheets and needs no extra
+imports; anything unusual falls back to openpyxl. `.csv` is supported too.
+"""
+import csv
+import os
+import posixpath
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse, parse
+
+from course_urls import canonical_url
+
+URL_COLUMN_NAMES = [
+    "url",
+    "course_url",
+    "course url",
+    "link",
+    "course_link",
+    "course link",
+    "coursera_url",
+    "coursera url",
+]
+NAME_COLUMN_NAMES = [
+    "name",
+    "course_name",
+    "course name",
+    "title",
+    "course_title",
+    "course title",
+    "coursera course name",
+]
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_COLUMN_LETTERS = re.compile(r"[A-Z]+")
+
+
+def detect_columns(header):
+    """Return `(url_column, name_column)` from a header row, case-insensitive; None if missing."""
+    lower_map = {str(c).strip().lower(): c for c in header}
+
+    def _find(possible_names):
+        for name in possible_names:
+            if name in lower_map:
+                return lower_map[name]
+        return None
+
+    return _find(URL_COLUMN_NAMES), _find(NAME_COLUMN_NAMES)
+
+
+def _column_index(ref) -> int:
+    """Zero-based column index from a cell reference such as `AB12`."""
+    index = 0
+    for ch in _COLUMN_LETTERS.match(ref).group():
+        index = index * 26 + ord(ch) - 64
+    return index - 1
+
+
+def _first_sheet_path(archive) -> str:
+    """Zip path of the first worksheet in workbook order."""
+    with archive.open("xl/workbook.xml") as fh:
+        first = parse(fh).getroot().find(f"{_NS}sheets/{_NS}sheet")
+    rel_id = first.get(f"{_REL_NS}id")
+    with archive.open("xl/_rels/workbook.xml.rels") as fh:
+        for rel in parse(fh).getroot().iter(f"{_PKG_REL_NS}Relationship"):
+            if rel.get("Id") == rel_id:
+                target = rel.get("Target")
+                return target.lstrip("/") if target.startswith("/") else posixpath.join("xl", target)
+    raise KeyError(rel_id)
+
+
+def _read_xlsx_fast(path):
+    """Rows of the first worksheet as lists of strings/None."""
+    with zipfile.ZipFile(path) as archive:
+        shared = []
+        if "xl/sharedStrings.xml" in archive.namelist():
+            with archive.open("xl/sharedStrings.xml") as fh:
+                for _, el in iterparse(fh):
+                    if el.tag == f"{_NS}si":
+                        shared.append("".join(t.text or "" for t in el.iter(f"{_NS}t")))
+                        el.clear()
+
+        rows = []
+        with archive.open(_first_sheet_path(archive)) as fh:
+            for _, el in iterparse(fh):
+                if el.tag != f"{_NS}row":
+                    continue
+                row = []
+                for cell in el.iter(f"{_NS}c"):
+                    kind = cell.get("t")
+                    if kind == "inlineStr":
+                        value = "".join(t.text or "" for t in cell.iter(f"{_NS}t"))
+                    else:
+                        v = cell.find(f"{_NS}v")
+                        value = None if v is None else v.text
+                        if kind == "s" and value is not None:
+                            value = shared[int(value)]
+                    col = _column_index(cell.get("r")) if cell.get("r") else len(row)
+                    row.extend([None] * (col - len(row) + 1))
+                    row[col] = value
+                rows.append(row)
+                el.clear()
+        return rows
+
+
+def _read_xlsx_openpyxl(path):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        return [list(r) for r in workbook.worksheets[0].iter_rows(values_only=True)]
+    finally:
+        workbook.close()
+
+
+def read_sheet_rows(path):
+    """All rows of the sheet, header first. Raises PermissionError if the file is locked."""
+    if os.path.splitext(path)[1].lower() == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as fh:
+            return list(csv.reader(fh))
+    try:
+        return _read_xlsx_fast(path)
+    except PermissionError:
+        raise
+    except Exception:
+        return _read_xlsx_openpyxl(path)
+
+
+def _cell(row, idx):
+    value = row[idx] if idx < len(row) else None
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value if value and value.lower() != "nan" else None
+
+
+def read_jobs(path):
+    """Read `(row_number, url, name)` jobs from the sheet; see `jobs_from_rows`."""
+    return jobs_from_rows(read_sheet_rows(path))
+
+
+def jobs_from_rows(rows):
+    """`(row_number, url, name)` jobs from rows already read by `read_sheet_rows`.
+
+    Returns `(jobs, total_rows, url_column, name_column)`. Rows without a
+    URL are left out; row numbers are 1-based data rows, as in the logs.
+    Raises ValueError if the URL or name column cannot be found.
+    """
+    if not rows:
+        return [], 0, None, None
+
+    header, data = rows[0], rows[1:]
+    url_col, name_col = detect_columns(header)
+    if url_col is None:
+        raise ValueError(
+            "Could not detect URL column in Excel. "
+            "Please name it one of: 'url', 'course_url', 'link'."
+        )
+    if name_col is None:
+        raise ValueError(
+            "Could not detect course-name column in Excel. "
+            "Please name it one of: 'name', 'course_name', 'course name', 'title'."
+        )
+
+    url_idx, name_idx = header.index(url_col), header.index(name_col)
+    jobs = []
+    for row_no, row in enumerate(data, 1):
+        url = _cell(row, url_idx)
+        if url:
+            jobs.append((row_no, url, _cell(row, name_idx)))
+    return jobs, len(data), url_col, name_col
+
+
+def column_from_rows(rows, possible_names):
+    """Optional per-row setting: `(column, {row_number: value})` for non-empty cells.
+
+    `rows` come from `read_sheet_rows`. `column` is None (and the dict
+    empty) when the sheet has no such column.
+    """
+    if not rows:
+        return None, {}
+    lower_map = {str(c).strip().lower(): c for c in rows[0]}
+    column = next((lower_map[n] for n in possible_names if n in lower_map), None)
+    if column is None:
+        return None, {}
+    idx = rows[0].index(column)
+    values = {}
+    for row_no, row in enumerate(rows[1:], 1):
+        value = _cell(row, idx)
+        if value:
+            values[row_no] = value
+    return column, values
+
+
+def dedupe_jobs(jobs):
+    """Drop rows whose canonical URL already appeared earlier in the sheet.
+
+    Returns `(unique_jobs, duplicate_jobs)`.
+    """
+    seen, unique, duplicates = set(), [], []
+    for job in jobs:
+        key = canonical_url(job[1])
+        if key in seen:
+            duplicates.append(job)
+        else:
+            seen.add(key)
+            unique.append(job)
+    return unique, duplicates
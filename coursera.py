@@ -1,9 +1,18 @@
 from playwright.sync_api import sync_playwright
-import re
 import os
 import sys
+import time
 import pandas as pd
 
+from dom_snapshot import element, expand_toggles, snapshot
+from filter_rules import add_init_rules
+from launch_config import launch_browser
+from output_manager import OutputManager
+from page_state import context_options, load_state, prepare_context, resolve_state_path
+from pdf_profiles import pdf_options
+from popup_handler import PopupCounter
+from run_log import ROW, configure as configure_logging, event, log, log_context, step
+
 try:
     sys.stdout.reconfigure(errors="ignore")
 except Exception:
@@ -29,246 +38,68 @@ def safe_click(page, locator, timeout: int = 2000) -> bool:
         return False
 
 
-def setup_ad_blocker(page):
-    """Set up continuous ad blocking using MutationObserver - runs automatically."""
-    page.evaluate("""
-        () => {
-            // Cleanup function
-            window.removeAds = () => {
-                // Remove promotional/Black Friday overlays
-                const promoSelectors = [
-                    '[class*="black-friday"]', '[class*="promo"]', '[class*="sale"]',
-                    '[id*="black-friday"]', '[class*="discount"]', '[class*="banner"]'
-                ];
-                promoSelectors.forEach(sel => {
-                    document.querySelectorAll(sel).forEach(el => el.remove());
-                });
-                
-                // Remove modals (but not FAQ)
-                document.querySelectorAll('[role="dialog"], [role="alertdialog"], [class*="modal"]').forEach(el => {
-                    const text = (el.textContent || '').toLowerCase();
-                    if (!text.includes('frequently asked') && !text.includes('faq')) {
-                        el.remove();
-                    }
-                });
-                
-                // Remove high z-index overlays (ads, popups)
-                document.querySelectorAll('*').forEach(el => {
-                    const style = window.getComputedStyle(el);
-                    const zIndex = parseInt(style.zIndex);
-                    if ((style.position === 'fixed' || style.position === 'absolute') && zIndex > 999) {
-                        const text = (el.textContent || '').toLowerCase();
-                        const classList = (el.className || '').toLowerCase();
-                        // Remove if it looks like an ad/overlay (not FAQ)
-                        if (!text.includes('frequently asked') && !text.includes('faq') &&
-                            (classList.includes('overlay') || classList.includes('backdrop') || 
-                             classList.includes('modal') || classList.includes('popup') ||
-                             zIndex > 9999)) {
-                            el.remove();
-                        }
-                    }
-                });
-                
-                // Accept cookies immediately
-                const cookieBtn = document.querySelector('#onetrust-accept-btn-handler, [id*="cookie-accept"]');
-                if (cookieBtn) cookieBtn.click();
-                
-                // Reset scroll lock
-                document.body.style.overflow = 'visible';
-                document.documentElement.style.overflow = 'visible';
-            };
-            
-            // Run cleanup immediately
-            window.removeAds();
-            
-            // Set up MutationObserver to watch for new ads
-            const observer = new MutationObserver((mutations) => {
-                window.removeAds();
-            });
-            
-            // Observe document for any DOM changes
-            observer.observe(document.body, {
-                childList: true,
-                subtree: true
-            });
-            
-            // Also run cleanup every 2 seconds as backup
-            setInterval(window.removeAds, 2000);
-            
-            console.log('✅ Ad blocker activated');
-        }
-    """)
-
-
-def block_unwanted_elements(page):
-    """Permanently block FAQ accordions and unwanted buttons with CSS."""
-    page.add_style_tag(content="""
-        /* Block FAQ accordions - CRITICAL */
-        button[aria-label*='frequently asked' i],
-        button[aria-label*='FAQ' i],
-        [data-testid*='faq' i],
-        [data-e2e*='faq' i],
-        div[class*='faq' i] button[aria-expanded],
-        section[class*='faq' i] button[aria-expanded] {
-            pointer-events: none !important;
-            opacity: 0.3 !important;
-            cursor: not-allowed !important;
-        }
-        
-        /* Block Explore buttons */
-        button[data-testid*='explore' i],
-        button[aria-label*='Explore' i] {
-            pointer-events: none !important;
-            display: none !important;
-        }
-        
-        /* Aggressively hide promotional modals */
-        [class*="black-friday" i],
-        [class*="promo-modal" i],
-        [class*="sale-modal" i],
-        [class*="discount-modal" i],
-        [data-track*="promo" i],
-        [data-track*="sale" i] {
-            display: none !important;
-            visibility: hidden !important;
-            opacity: 0 !important;
-            z-index: -9999 !important;
-            pointer-events: none !important;
-        }
-        
-        /* Hide cookie banners */
-        #onetrust-banner-sdk,
-        [id*="cookie-banner" i],
-        [class*="cookie-banner" i] {
-            display: none !important;
-        }
-    """)
-
-
-def close_popups(page):
-    """Manual popup cleanup - call when needed."""
-    try:
-        # Press Escape key
-        page.keyboard.press("Escape")
-        wait(page, 100)
-        
-        # Trigger manual cleanup
-        page.evaluate("if (window.removeAds) window.removeAds();")
-    except Exception:
-        pass
-
-
-def is_faq_element(element) -> bool:
-    """Check if an element is FAQ-related."""
-    try:
-        aria_label = (element.get_attribute("aria-label") or "").lower()
-        data_e2e = (element.get_attribute("data-e2e") or "").lower()
-        btn_class = (element.get_attribute("class") or "").lower()
-        btn_text = (element.text_content() or "").lower()
-        
-        faq_keywords = ['faq', 'frequently asked', 'question']
-        return any(kw in text for kw in faq_keywords 
-                  for text in [aria_label, data_e2e, btn_class, btn_text])
-    except:
-        return False
-
-
-def click_read_more_buttons(page):
-    """Click only valid Read more buttons, excluding FAQ/Explore."""
+def expand_toggles_on_page(page, root=None):
+    """Click all valid Read more / View all skills toggles under `root` in one pass, excluding FAQ/Explore."""
     try:
-        buttons = page.locator('button:has-text("Read more")').all()
-        clicked = 0
-        
-        for btn in buttons:
-            if not btn.is_visible(timeout=500):
-                continue
-                
-            aria_label = (btn.get_attribute("aria-label") or "").lower()
-            skip_keywords = ['explore', 'frequently asked', 'faq', 'offered by', 'partner']
-            
-            if any(kw in aria_label for kw in skip_keywords):
-                continue
-            
-            if safe_click(page, btn, timeout=1000):
-                clicked += 1
-        
-        if clicked > 0:
-            print(f"    ✓ Clicked {clicked} Read more button(s)")
+        counts = expand_toggles(page, root)
+        if counts:
+            log.debug(f"    ✓ Expanded {sum(counts.values())} toggle(s): {counts}")
+        return counts
     except Exception:
-        pass
+        return {}
 
 
 def process_about_section(page, base_url):
     """Process About section - expand skills and read more."""
-    print("\n" + "="*70)
-    print("📍 STEP 1: ABOUT SECTION")
-    print("="*70)
+    log.info("📍 STEP 1: ABOUT SECTION", extra={"banner": True})
     
     try:
         page.goto(f"{base_url}#about", wait_until="load")
         wait(page, 800)  # Let ad blocker work
         
-        # Expand skills
-        skills_btn = page.locator('button:has-text("View all skills")').first
-        if safe_click(page, skills_btn, timeout=2000):
-            print("    ✓ Expanded skills")
-        
-        # Click read more
-        click_read_more_buttons(page)
-        print("  ✅ About section complete")
+        # Expand skills and read more
+        expand_toggles_on_page(page, "#about")
+        log.info("  ✅ About section complete")
     except Exception as e:
-        print(f"  ⚠️ About section error: {str(e)[:50]}")
-    
-    print("="*70)
+        log.warning(f"  ⚠️ About section error: {str(e)[:50]}")
 
 
 def process_modules_section(page, base_url):
     """Process Modules - expand module accordions (NOT FAQ)."""
-    print("\n" + "="*70)
-    print("📍 STEP 2: MODULES SECTION")
-    print("="*70)
+    log.info("📍 STEP 2: MODULES SECTION", extra={"banner": True})
     
     try:
         page.goto(f"{base_url}#modules", wait_until="load")
         wait(page, 800)  # Let ad blocker work
         
-        # Find all accordion buttons
-        all_accordions = page.locator('button[aria-expanded]').all()
-        
-        # Filter out FAQ accordions
-        module_buttons = [btn for btn in all_accordions if not is_faq_element(btn)]
+        # Read all accordion buttons in one round trip, filter out FAQ
+        module_buttons = [info for info in snapshot(page.locator('button[aria-expanded]')) if not info.is_faq]
         
         if not module_buttons:
             # Try courses section
             page.goto(f"{base_url}#courses", wait_until="load")
             wait(page, 800)
-            all_accordions = page.locator('button[aria-expanded]').all()
-            module_buttons = [btn for btn in all_accordions if not is_faq_element(btn)]
+            module_buttons = [info for info in snapshot(page.locator('button[aria-expanded]')) if not info.is_faq]
         
         if module_buttons:
             total = len(module_buttons)
-            print(f"  📊 Found {total} module(s) (FAQ excluded)")
+            log.info(f"  📊 Found {total} module(s) (FAQ excluded)")
             
-            for idx, btn in enumerate(module_buttons, 1):
+            for idx, info in enumerate(module_buttons, 1):
                 try:
-                    is_expanded = btn.get_attribute("aria-expanded")
-                    if is_expanded == "true":
-                        continue
-                    
-                    # Double-check not FAQ before clicking
-                    if is_faq_element(btn):
-                        print(f"    [{idx}/{total}] ⊘ Skipped FAQ")
+                    if info.is_expanded:
                         continue
                     
+                    btn = element(page, info)
                     btn.scroll_into_view_if_needed()
                     wait(page, 200)
                     
                     if safe_click(page, btn, timeout=1500):
-                        print(f"    [{idx}/{total}] ✓ Expanded")
+                        log.debug(f"    [{idx}/{total}] ✓ Expanded")
                 except Exception:
                     pass
             
-            print("  ✅ All modules processed")
+            log.info("  ✅ All modules processed")
         
         # Scroll through content
         for _ in range(3):
@@ -276,19 +107,15 @@ def process_modules_section(page, base_url):
             wait(page, 300)
         
         # Click read more in modules
-        click_read_more_buttons(page)
+        expand_toggles_on_page(page, "#modules, #courses")
         
     except Exception as e:
-        print(f"  ⚠️ Modules error: {str(e)[:50]}")
-    
-    print("="*70)
+        log.warning(f"  ⚠️ Modules error: {str(e)[:50]}")
 
 
 def scroll_to_bottom(page):
     """Scroll to bottom to load all content."""
-    print("\n" + "="*70)
-    print("📍 STEP 3: SCROLL TO BOTTOM")
-    print("="*70)
+    log.info("📍 STEP 3: SCROLL TO BOTTOM", extra={"banner": True})
     
     try:
         last_height = page.evaluate("document.body.scrollHeight")
@@ -304,7 +131,7 @@ def scroll_to_bottom(page):
             current_pos = page.evaluate("window.pageYOffset + window.innerHeight")
             
             if current_pos >= new_height - 100:
-                print(f"    ✓ Reached bottom after {scroll_count} scrolls")
+                log.debug(f"    ✓ Reached bottom after {scroll_count} scrolls")
                 break
             
             if new_height == last_height:
@@ -313,22 +140,16 @@ def scroll_to_bottom(page):
             last_height = new_height
         
         page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        print("  ✅ Scroll complete")
+        log.info("  ✅ Scroll complete")
     except Exception as e:
-        print(f"  ⚠️ Scroll error: {str(e)[:50]}")
-    
-    print("="*70)
+        log.warning(f"  ⚠️ Scroll error: {str(e)[:50]}")
 
 
 def prepare_for_pdf(page):
     """Final preparation - remove overlays."""
-    print("\n" + "="*70)
-    print("📍 STEP 4: PREPARE FOR PDF")
-    print("="*70)
+    log.info("📍 STEP 4: PREPARE FOR PDF", extra={"banner": True})
     
     try:
-        # Manual cleanup before PDF
-        close_popups(page)
         page.evaluate("window.scrollTo({top: 0, behavior: 'smooth'})")
         wait(page, 500)
         
@@ -357,43 +178,35 @@ def prepare_for_pdf(page):
             }
         """)
         
-        print("  ✅ Page prepared")
+        log.info("  ✅ Page prepared")
     except Exception as e:
-        print(f"  ⚠️ Preparation error: {str(e)[:50]}")
-    
-    print("="*70)
+        log.warning(f"  ⚠️ Preparation error: {str(e)[:50]}")
 
 
-def generate_pdf(page, base_url, output_dir=".", custom_name=None):
-    """Generate PDF with selectable text."""
-    print("\n" + "="*70)
-    print("📍 STEP 5: GENERATE PDF")
-    print("="*70)
+def generate_pdf(page, base_url, output_dir="pdfs", custom_name=None, pdf_profile=None, outputs=None):
+    """Generate PDF with selectable text, laid out by the named `pdf_profile`.
+
+    `outputs` is the `OutputManager` of `output_dir`, shared by every row.
+    """
+    log.info("📍 STEP 5: GENERATE PDF", extra={"banner": True})
     
     try:
         page.emulate_media(media="print")
         
         # Extract course name
-        course_name = "Coursera_Course"
+        course_name = None
         try:
-            title = page.locator('h1').first.text_content().strip()
-            course_name = re.sub(r'[<>:"/\\|?*]', '_', title)
+            course_name = page.locator('h1').first.text_content().strip()
         except:
             pass
         
-        # Create filename
-        url_slug = base_url.split("/")[-1].split("?")[0]
-        if custom_name:
-            safe_custom = re.sub(r'[<>:"/\\|?*]', '_', str(custom_name).strip())
-            filename = f"{safe_custom}_{url_slug}.pdf"
-        else:
-            filename = f"{course_name}_{url_slug}.pdf"
-        
-        filename = re.sub(r'[<>:"/\\|?*]', '_', filename)[:200]
-        os.makedirs(output_dir, exist_ok=True)
-        full_path = os.path.join(output_dir, filename)
+        # Reserve a collision-free name; recorded in the folder's manifest once written
+        if outputs is None:
+            outputs = OutputManager(output_dir)
+        full_path = outputs.reserve(base_url, title=course_name, custom_name=custom_name)
+        filename = os.path.basename(full_path)
         
-        print(f"  💾 Saving: {filename}")
+        log.info(f"  💾 Saving: {filename}")
         
         # Prepare page for PDF rendering
         page.set_viewport_size({"width": 1200, "height": 800})
@@ -423,22 +236,14 @@ def generate_pdf(page, base_url, output_dir=".", custom_name=None):
         wait(page, 1000)
         
         # Generate PDF
-        page.pdf(
-            path=full_path,
-            format="A4",
-            print_background=True,
-            prefer_css_page_size=False,
-            margin={"top": "0.4in", "bottom": "0.4in", "left": "0.5in", "right": "0.5in"},
-            scale=0.90
-        )
+        pdf_bytes = page.pdf(**pdf_options(pdf_profile, page))
         
-        print(f"  ✅ PDF SAVED: {full_path}")
-        print("="*70)
+        full_path = outputs.store(full_path, pdf_bytes)
+        log.info(f"  ✅ PDF SAVED: {full_path}")
         return full_path
     
     except Exception as e:
-        print(f"  ❌ PDF generation failed: {str(e)}")
-        print("="*70)
+        log.error(f"  ❌ PDF generation failed: {str(e)}")
         return None
 
 
@@ -456,51 +261,87 @@ def detect_excel_columns(df):
     return url_col, name_col
 
 
+def render_row(page, base_url, output_dir, custom_name=None, outputs=None):
+    """Load, clean up, expand and print one course page; returns the PDF path or None."""
+    # Load page
+    with step("load"):
+        try:
+            page.goto(base_url, wait_until="domcontentloaded")
+            wait(page, 1000)
+        except Exception as e:
+            log.error(f"❌ Navigation failed: {e}")
+            return None
+    
+    # Popups are dismissed as they appear: the observer and blocking CSS
+    # run from document start (see main)
+    
+    # Process page
+    with step("about"):
+        process_about_section(page, base_url)
+    with step("modules"):
+        process_modules_section(page, base_url)
+    with step("scroll"):
+        scroll_to_bottom(page)
+    with step("prepare"):
+        prepare_for_pdf(page)
+    
+    # Generate PDF
+    with step("pdf"):
+        return generate_pdf(page, base_url, output_dir, custom_name, outputs=outputs)
+
+
 def main():
-    """Main execution: batch process URLs from Excel."""
+    """Main execution: batch process URLs from Excel.
+
+    Logging follows `COURSERA_LOG_LEVEL` / `COURSERA_LOG_FORMAT` /
+    `COURSERA_LOG_FILE` (see `run_log.py`).
+    """
+    configure_logging()
     excel_path = "courses.xlsx"
     output_dir = "pdfs"
     
-    print("\n" + "="*70)
-    print("🚀 COURSERA SCRAPER - BATCH MODE")
-    print("="*70)
-    print(f"📄 Excel: {excel_path}")
-    print(f"📂 Output: {output_dir}")
-    print("="*70)
+    log.info("🚀 COURSERA SCRAPER - BATCH MODE", extra={"banner": True})
+    log.info(f"📄 Excel: {excel_path}")
+    log.info(f"📂 Output: {output_dir}")
     
     if not os.path.exists(excel_path):
-        print(f"❌ Excel file not found: {excel_path}")
+        log.error(f"❌ Excel file not found: {excel_path}")
         return
     
     try:
         df = pd.read_excel(excel_path)
     except PermissionError:
-        print(f"❌ Cannot open Excel. Please close it and try again.")
+        log.error(f"❌ Cannot open Excel. Please close it and try again.")
         return
     
     if df.empty:
-        print("❌ Excel file is empty")
+        log.error("❌ Excel file is empty")
         return
     
     url_col, name_col = detect_excel_columns(df)
     if not url_col:
-        print("❌ Could not find URL column (expected: 'url', 'course_url', 'link')")
+        log.error("❌ Could not find URL column (expected: 'url', 'course_url', 'link')")
         return
     if not name_col:
-        print("❌ Could not find name column (expected: 'name', 'course_name', 'title')")
+        log.error("❌ Could not find name column (expected: 'name', 'course_name', 'title')")
         return
     
-    print(f"✅ Columns - URL: '{url_col}', Name: '{name_col}'")
-    print(f"🧮 Total rows: {len(df)}")
+    log.info(f"✅ Columns - URL: '{url_col}', Name: '{name_col}'")
+    log.info(f"🧮 Total rows: {len(df)}")
+    outputs = OutputManager(output_dir)
     
     with sync_playwright() as p:
-        browser = p.chromium.launch(
-            channel="msedge",
-            headless=False,
-            args=['--disable-blink-features=AutomationControlled', '--no-sandbox']
-        )
-        
-        context = browser.new_context(viewport={"width": 1920, "height": 1080})
+        browser = launch_browser(p)
+        
+        # Consent flags from page_state.json keep the cookie banner and dialogs closed
+        state_path = resolve_state_path()
+        page_state = load_state(state_path) if state_path else None
+        context = browser.new_context(viewport={"width": 1920, "height": 1080}, **context_options(page_state))
+        # Popup observer and blocking CSS on every page, from document start
+        popups = PopupCounter()
+        popups.attach(context)
+        add_init_rules(context, observe=True)
+        prepare_context(context, page_state)
         page = context.new_page()
         page.on("popup", lambda popup: popup.close())
         
@@ -511,57 +352,41 @@ def main():
             for idx, row in enumerate(df.itertuples(index=False, name=None)):
                 base_url = str(row[url_idx]).strip()
                 if not base_url or base_url.lower() == "nan":
-                    print(f"\n[Row {idx+1}] ⚠️ Skipping empty URL")
+                    log.warning(f"\n[Row {idx+1}] ⚠️ Skipping empty URL")
                     continue
                 
                 name_value = row[name_idx]
                 custom_name = name_value if pd.notna(name_value) else None
                 
-                print("\n" + "="*70)
-                print(f"▶️  Row {idx + 1}/{len(df)}")
-                print(f"📍 URL: {base_url}")
-                if custom_name:
-                    print(f"🏷  Name: {custom_name}")
-                print("="*70)
-                
-                # Load page
-                try:
-                    page.goto(base_url, wait_until="domcontentloaded")
-                    wait(page, 1000)
-                except Exception as e:
-                    print(f"❌ Navigation failed: {e}")
-                    continue
-                
-                # Set up automatic ad blocker FIRST
-                setup_ad_blocker(page)
-                block_unwanted_elements(page)
-                wait(page, 1000)  # Let initial ads get blocked
-                
-                # Process page
-                process_about_section(page, base_url)
-                process_modules_section(page, base_url)
-                scroll_to_bottom(page)
-                prepare_for_pdf(page)
-                
-                # Generate PDF
-                pdf_file = generate_pdf(page, base_url, output_dir, custom_name)
-                
-                if pdf_file:
-                    print("\n🎉 SUCCESS!")
-                    print(f"📄 {pdf_file}")
+                with log_context(row=idx + 1, url=base_url):
+                    title = f"▶️  Row {idx + 1}/{len(df)}\n📍 URL: {base_url}"
+                    if custom_name:
+                        title += f"\n🏷  Name: {custom_name}"
+                    log.info(title, extra={"banner": True})
+                    started = time.perf_counter()
+                    pdf_file = render_row(page, base_url, output_dir, custom_name, outputs)
+                    seconds = time.perf_counter() - started
+                    event(
+                        ROW,
+                        f"{'🎉' if pdf_file else '❌'} Row {idx + 1}/{len(df)} "
+                        f"{'done' if pdf_file else 'failed'} in {seconds:.1f}s: {pdf_file or base_url}",
+                        event="row",
+                        outcome="ok" if pdf_file else "failed",
+                        duration_s=round(seconds, 3),
+                        path=pdf_file,
+                        name=custom_name,
+                        popups=popups.take(page),
+                    )
                 
                 wait(page, 1000)
         
         except Exception as e:
-            print(f"\n❌ Critical error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            log.error(f"\n❌ Critical error: {str(e)}", exc_info=True)
         
         finally:
             context.close()
             browser.close()
-            print("\n✅ Browser closed")
-
+            log.info("\n✅ Browser closed")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,10 +1,39 @@
 from playwright.sync_api import sync_playwright
-import re
+import argparse
+import contextlib
+import itertools
+import logging
+import queue
+import subprocess
+import threading
 import time
 import os
 import sys
 
-import pandas as pd
+from course_sheet import column_from_rows, dedupe_jobs, jobs_from_rows, read_sheet_rows
+from course_urls import canonical_url
+from dom_snapshot import element, expand_toggles, snapshot
+from filter_rules import INIT_COST_JS, add_init_rules, cleanup_js, close_button_selector
+from har_replay import HAR_DIR, HAR_MODES, har_options
+from incremental import apply_diff, diff_jobs, load_snapshot, save_snapshot, snapshot_path
+from launch_config import DEFAULT_LAUNCH_PROFILE, LAUNCH_PROFILES, launch_browser, resolve_profile_name
+from lazy_assets import skip_assets
+from output_manager import LAYOUTS, OutputManager
+from page_state import (
+    check_popups, context_options, load_state, prepare_context, record_stale, resolve_state_path, stale_rows,
+)
+from page_capture import EXTENSIONS, FORMATS, capture, parse_formats
+from pdf_profiles import PDF_PROFILE_COLUMN_NAMES, PDF_PROFILES, asset_skips, resolve_pdf_profile
+from pdf_writer import PdfWriter
+from planner import build_plan, print_plan
+from popup_handler import PopupCounter
+from profiling import Profiler
+from progress import PROGRESS_MODES, Progress, resolve_mode
+from resource_usage import child_pids, process_tree_rss_mb
+from run_log import LOG_FORMATS, LOG_LEVELS, ROW, configure as configure_logging, event, log, log_context, step
+from run_ledger import append_record, ledger_path, load_timings
+from scheduler import SCHEDULES, balance, order_longest_first
+from sharding import merge_shards, parse_shard, save_report, select_shard, shard_suffix
 
 # Avoid UnicodeEncodeError on Windows consoles when printing emoji/special chars
 try:
@@ -35,12 +64,6 @@ def safe_click(page, locator, *, timeout: int = 2000, scroll: bool = True, force
         return False
 
 
-def clean_ads(page, times: int = 1, delay_ms: int = 400):
-    """Run the aggressive popup cleaner multiple times with a delay."""
-    for _ in range(times):
-        close_ads_and_popups(page)
-
-
 def close_ads_and_popups(page):
     """Aggressively close all ads, popups, and overlays including Black Friday ads"""
     try:
@@ -52,12 +75,7 @@ def close_ads_and_popups(page):
         # First: Try to find and click close buttons with Playwright
         try:
             # Black Friday specific close buttons
-            black_friday_close = page.locator(
-                'button[aria-label*="Close"], '
-                'button[data-testid*="close"], '
-                '[class*="modal"] button:has-text("×"), '
-                '[role="dialog"] button[aria-label*="Close"]'
-            ).all()
+            black_friday_close = page.locator(close_button_selector()).all()
 
             # Limit to first few to avoid clicking FAQ dialogs deeply nested
             for btn in black_friday_close[:5]:
@@ -65,476 +83,131 @@ def close_ads_and_popups(page):
         except Exception:
             pass
         
-        # Execute JavaScript to remove popups and ads
-        page.evaluate("""
-            () => {
-                // Remove Black Friday / promotional overlays FIRST
-                const blackFridaySelectors = [
-                    '[class*="black-friday"]', '[class*="Black-Friday"]',
-                    '[class*="blackfriday"]', '[class*="BlackFriday"]',
-                    '[id*="black-friday"]', '[id*="BlackFriday"]',
-                    '[class*="cyber-monday"]', '[class*="CyberMonday"]',
-                    '[class*="promotion"]', '[class*="Promotion"]',
-                    '[class*="promo"]', '[class*="Promo"]',
-                    '[class*="sale-modal"]', '[class*="SaleModal"]',
-                    '[class*="discount-modal"]', '[class*="DiscountModal"]',
-                    '[data-track*="promo"]', '[data-track*="sale"]',
-                    '[data-track*="black-friday"]'
-                ];
-                
-                blackFridaySelectors.forEach(selector => {
-                    try {
-                        document.querySelectorAll(selector).forEach(el => {
-                            el.remove();
-                        });
-                    } catch(e) {}
-                });
-                
-                // Remove all modal dialogs
-                const dialogs = document.querySelectorAll(
-                    '[role="dialog"], [role="alertdialog"], ' +
-                    '[class*="modal"], [class*="Modal"], ' +
-                    '[id*="modal"], [id*="Modal"], ' +
-                    '[class*="popup"], [class*="Popup"]'
-                );
-                dialogs.forEach(el => {
-                    // Don't remove if it's part of FAQ
-                    const text = el.textContent || '';
-                    if (!text.toLowerCase().includes('frequently asked') && 
-                        !text.toLowerCase().includes('faq')) {
-                        el.remove();
-                    }
-                });
-                
-                // Click close buttons but NOT FAQ buttons
-                const closeButtons = document.querySelectorAll(
-                    '[data-testid*="close"]:not([data-testid*="faq"]), ' +
-                    '[aria-label*="Close"]:not([aria-label*="FAQ"]):not([aria-label*="frequently"]), ' +
-                    'button[class*="close"]:not([class*="faq"])'
-                );
-                closeButtons.forEach(btn => {
-                    try:
-                        const parent = btn.closest('[role="dialog"], [class*="modal"]');
-                        if (parent) {
-                            const parentText = parent.textContent || '';
-                            if (!parentText.toLowerCase().includes('frequently asked') &&
-                                !parentText.toLowerCase().includes('faq')) {
-                                btn.click();
-                            }
-                        }
-                    } catch(e) {}
-                });
-                
-                // Remove all high z-index overlays and backdrops
-                const allElements = document.querySelectorAll('*');
-                allElements.forEach(el => {
-                    const style = window.getComputedStyle(el);
-                    if (style.position === 'fixed' || style.position === 'absolute') {
-                        const zIndex = parseInt(style.zIndex);
-                        // High z-index elements are likely popups
-                        if (zIndex > 999 || (zIndex > 100 && (
-                            el.className.toLowerCase().includes('overlay') ||
-                            el.className.toLowerCase().includes('backdrop') ||
-                            el.className.toLowerCase().includes('modal') ||
-                            el.className.toLowerCase().includes('popup')
-                        ))) {
-                            // Don't remove FAQ elements
-                            const elText = el.textContent || '';
-                            const elClass = el.className || '';
-                            if (!elText.toLowerCase().includes('frequently asked') &&
-                                !elClass.toLowerCase().includes('faq')) {
-                                el.remove();
-                            }
-                        }
-                    }
-                });
-                
-                // Accept cookie consent if present
-                const cookieBtn = document.querySelector(
-                    '#onetrust-accept-btn-handler, ' +
-                    '[id*="cookie"] button, ' +
-                    'button[id*="accept-cookie"]'
-                );
-                if (cookieBtn) cookieBtn.click();
-                
-                // Remove any ad containers
-                const ads = document.querySelectorAll(
-                    '[class*="ad-"], [class*="ad_"], ' +
-                    '[id*="ad-"], [id*="ad_"], ' +
-                    '[class*="advertisement"], [class*="Advertisement"], ' +
-                    'iframe[src*="ads"], iframe[src*="doubleclick"]'
-                );
-                ads.forEach(ad => ad.remove());
-                
-                // Remove notification banners (but not FAQ)
-                const notifications = document.querySelectorAll(
-                    '[class*="notification"], [class*="Notification"], ' +
-                    '[class*="banner"], [class*="Banner"]'
-                );
-                notifications.forEach(notif => {
-                    const style = window.getComputedStyle(notif);
-                    const notifText = notif.textContent || '';
-                    if ((style.position === 'fixed' || style.position === 'sticky') &&
-                        !notifText.toLowerCase().includes('frequently asked') &&
-                        !notifText.toLowerCase().includes('faq')) {
-                        notif.remove();
-                    }
-                });
-                
-                // Reset body overflow to prevent scroll lock
-                document.body.style.overflow = 'visible';
-                document.body.style.position = 'static';
-                document.documentElement.style.overflow = 'visible';
-            }
-        """)
+        # Remove popups, promos and ad containers with the shared in-page matcher
+        page.evaluate(cleanup_js())
         return True
         
     except Exception as e:
         return False
 
 
-def close_initial_popups(page):
-    """Close only the Recommended Experience popup - ONCE at start"""
-    try:
-        print("  🔒 Closing initial popups and ads...")
-        
-        # Close ads and popups aggressively - multiple times
-        clean_ads(page, times=5, delay_ms=600)
-        
-        # Look for the Recommended Experience popup specifically
-        try:
-            popup = page.locator("text=Recommended experience").first
-            if popup.is_visible(timeout=3000):
-                # Click OK button
-                ok_btn = page.locator("button:has-text('OK')").first
-                if safe_click(page, ok_btn, timeout=2000):
-                    print("    ✓ Closed 'Recommended Experience' popup")
-                    wait(page, 1000)
-        except Exception:
-            print("    ℹ️  No Recommended Experience popup found")
-        
-        # Block unwanted buttons permanently with CSS
-        page.add_style_tag(content="""
-            /* Block Explore button */
-            button[data-testid*='explore'],
-            button[aria-label*='Explore'],
-            a[href*='/explore'],
-            [data-track-component*='explore'] {
-                pointer-events: none !important;
-                opacity: 0.3 !important;
-                display: none !important;
-            }
-            
-            /* Block FAQ accordions - CRITICAL */
-            button[data-e2e*='faq'],
-            button[data-e2e*='FAQ'],
-            button[aria-label*='frequently asked'],
-            button[aria-label*='Frequently asked'],
-            button[aria-label*='Frequently Asked'],
-            [data-testid*='faq'],
-            [data-testid*='FAQ'],
-            div[class*='faq'] button[aria-expanded],
-            section[class*='faq'] button[aria-expanded] {
-                pointer-events: none !important;
-                opacity: 0.3 !important;
-                cursor: not-allowed !important;
-            }
-            
-            /* Block difficulty level info button */
-            button[aria-label*='Information about difficulty level'] {
-                pointer-events: none !important;
-                opacity: 0.3 !important;
-            }
-            
-            /* Block Black Friday and promotional popups - AGGRESSIVE */
-            [class*="black-friday"],
-            [class*="Black-Friday"],
-            [class*="blackfriday"],
-            [class*="BlackFriday"],
-            [id*="black-friday"],
-            [id*="BlackFriday"],
-            [class*="cyber-monday"],
-            [class*="promotion-modal"],
-            [class*="promo-modal"],
-            [class*="sale-modal"],
-            [data-track*="promo-modal"],
-            [data-track*="black-friday"] {
-                display: none !important;
-                visibility: hidden !important;
-                pointer-events: none !important;
-                opacity: 0 !important;
-                z-index: -9999 !important;
-            }
-        """)
-        
-        print("    ✓ Blocked unwanted buttons (Explore, FAQ, Difficulty info, Promo ads)")
-        
-        # Final cleanup after blocking
-        clean_ads(page, times=3, delay_ms=500)
-        
-    except Exception as e:
-        print(f"    ⚠️  Popup close warning: {str(e)[:50]}")
-
+def scroll_and_wait(page, pixels=500, settle_ms=400):
+    """Smooth scroll, then wait for it to finish (popups are dismissed in-page meanwhile).
 
-def scroll_and_wait(page, pixels=500):
-    """Smooth scroll with wait and AGGRESSIVE ad cleanup"""
+    The wait keeps back-to-back smooth scrolls from cutting each other short;
+    it replaces the time the old polling cleanup took.
+    """
     page.evaluate(f"window.scrollBy({{top: {pixels}, behavior: 'smooth'}})")
-    # Close any ads that appeared during scroll
-    clean_ads(page, times=2, delay_ms=200)
+    wait(page, settle_ms)
 
 
 def process_about_section(page, base_url):
-    """Process About section - View skills FIRST, then Read more"""
-    print("\n" + "="*70)
-    print("📍 STEP 1: ABOUT SECTION")
-    print("="*70)
-    
+    """Process About section - View all skills and Read more"""
     try:
         # Navigate to About
         page.goto(f"{base_url}#about", wait_until="load")
         
-        # Close any ads that appeared - AGGRESSIVE
-        clean_ads(page, times=3, delay_ms=500)
-        
         # Scroll within About section first
-        print("  📜 Initial scroll through About section...")
+        log.info("  📜 Initial scroll through About section...")
         for _ in range(2):
             scroll_and_wait(page, 50)
         
-        # Close ads after scrolling
-        clean_ads(page, times=1, delay_ms=50)
+        # "View all skills" and "Read more" in one in-page pass
+        log.info("  📖 STEP 1A: Expanding skills and 'Read more' toggles...")
+        expand_toggles_in_section(page, "About", "#about")
         
-        # FIRST: Click "View all skills" button
-        print("  🔍 STEP 1A: Looking for 'View all skills' button...")
-        try:
-            skills_btn = page.locator('button:has-text("View all skills")').first
-
-            if skills_btn.is_visible(timeout=3000):
-                # Close ads before clicking
-                clean_ads(page, times=1, delay_ms=300)
-
-                if safe_click(page, skills_btn, timeout=1000):
-                    print("    ✅ Expanded 'View all skills'")
-                    # Close ads immediately after expansion
-                    clean_ads(page, times=2, delay_ms=500)
-            else:
-                print("    ℹ️  'View all skills' not found")
-        except Exception as e:
-            print(f"    ℹ️  'View all skills' not available: {str(e)[:40]}")
-        
-        # SECOND: Click Read more buttons
-        print("  📖 STEP 1B: Clicking 'Read more' buttons...")
-        click_read_more_buttons_in_section(page, "About")
-        
-        # Close ads after all clicks
-        clean_ads(page, times=2, delay_ms=400)
-        
-        print("  ✅ About section complete")
+        log.info("  ✅ About section complete")
         
     except Exception as e:
-        print(f"  ❌ Error in About: {str(e)[:50]}")
-    
-    print("="*70)
+        log.error(f"  ❌ Error in About: {str(e)[:50]}")
+
 
+def expand_toggles_in_section(page, section_name="", root=None):
+    """Click every valid "Read more" / "View all skills" toggle under `root` in one in-page pass.
 
-def click_read_more_buttons_in_section(page, section_name=""):
-    """Click ONLY valid Read more buttons - skip Explore/FAQ/Partner sections"""
+    Explore/FAQ/partner toggles are skipped by the shared rules; toggles
+    the first clicks reveal are clicked too. Returns `{section id: clicks}`.
+    """
     try:
-        print(f"  📖 Looking for 'Read more' buttons in {section_name}...")
-        
-        # Find all Read more buttons
-        all_buttons = page.locator('button:has-text("Read more")').all()
-        
-        if not all_buttons:
-            print(f"    ℹ️  No 'Read more' buttons found")
-            return
-        
-        print(f"    Found {len(all_buttons)} potential buttons, filtering...")
-        
-        clicked = 0
-        for idx, btn in enumerate(all_buttons, 1):
-            try:
-                # Check if button is visible
-                if not btn.is_visible(timeout=1000):
-                    continue
-                
-                # Get context to filter out unwanted buttons
-                aria_label = btn.get_attribute("aria-label") or ""
-                
-                # Skip unwanted buttons
-                skip_keywords = [
-                    "explore", "Explore", "EXPLORE",
-                    "frequently asked", "FAQ", "faq",
-                    "offered by", "partner", "Partner",
-                    "Learn more about"
-                ]
-                
-                should_skip = any(keyword.lower() in aria_label.lower() 
-                                 for keyword in skip_keywords)
-                
-                if should_skip:
-                    print(f"      ⊘ Skipped unwanted: {aria_label[:40]}")
-                    continue
-                
-                # Valid button - click it
-                if safe_click(page, btn, timeout=1500):
-                    clicked += 1
-                    print(f"      ✓ Clicked Read more {clicked}")
-                
-            except Exception as e:
-                continue
-        
-        if clicked > 0:
-            print(f"    ✅ Clicked {clicked} valid 'Read more' button(s)")
-        else:
-            print(f"    ℹ️  No valid buttons to click")
-            
+        counts = expand_toggles(page, root)
     except Exception as e:
-        print(f"    ⚠️  Error: {str(e)[:50]}")
+        log.warning(f"    ⚠️  Error: {str(e)[:50]}")
+        return {}
+    if counts:
+        summary = ", ".join(f"{n} in #{section}" for section, n in counts.items())
+        event(logging.DEBUG, f"    ✅ Expanded {sum(counts.values())} toggle(s) from {section_name}: {summary}",
+              event="expand", section=section_name, clicks=counts)
+    else:
+        log.debug(f"    ℹ️  No valid toggles to click in {section_name}")
+    return counts
 
 
 def process_modules_section(page, base_url):
     """Process Modules - expand ALL module accordions one by one (NOT FAQ)"""
-    print("\n" + "="*70)
-    print("📍 STEP 2: MODULES/COURSES SECTION")
-    print("="*70)
-    
     try:
         # Navigate to Modules
         page.goto(f"{base_url}#modules", wait_until="load")
         
-        # Close any ads
-        clean_ads(page, times=1, delay_ms=50    )
-        
-        print("  📦 Expanding module accordions sequentially (excluding FAQ)...")
-        
-        # Find all module accordion buttons with STRICT filtering
-        all_accordions = page.locator('button[aria-expanded]').all()
+        log.info("  📦 Expanding module accordions sequentially (excluding FAQ)...")
         
-        # Filter to ONLY module buttons, EXCLUDE FAQ
+        # Read every accordion button in one round trip; EXCLUDE FAQ
         module_buttons = []
-        for btn in all_accordions:
-            try:
-                aria_label = (btn.get_attribute("aria-label") or "").lower()
-                data_e2e = (btn.get_attribute("data-e2e") or "").lower()
-                btn_class = (btn.get_attribute("class") or "").lower()
-                btn_text = (btn.text_content() or "").lower()
-                
-                # Get parent section to check context
-                parent_text = ""
-                try:
-                    parent = btn.locator('xpath=../..').first
-                    parent_text = (parent.text_content() or "")[:200].lower()
-                except:
-                    pass
-                
-                # STRICT FAQ filtering - do not expand any FAQ / question accordions
-                is_faq = (
-                    'faq' in aria_label
-                    or 'faq' in data_e2e
-                    or 'faq' in btn_class
-                    or 'faq' in btn_text
-                    or 'frequently asked' in aria_label
-                    or 'frequently asked' in btn_text
-                    or 'frequently asked' in parent_text
-                    or 'frequently asked questions' in parent_text
-                    or 'questions' in btn_text
-                )
-                
-                if not is_faq:
-                    module_buttons.append(btn)
-                else:
-                    print(f"    ⊘ Filtered out FAQ button: {aria_label[:40] or data_e2e[:40]}")
-            except:
-                continue
-        
+        for info in snapshot(page.locator('button[aria-expanded]')):
+            if info.is_faq:
+                log.debug(f"    ⊘ Filtered out FAQ button: {info.aria_label[:40] or info.data_e2e[:40]}")
+            else:
+                module_buttons.append(info)
+
         if not module_buttons:
-            print("    ℹ️  No module accordions found, trying Courses section...")
+            log.debug("    ℹ️  No module accordions found, trying Courses section...")
             page.goto(f"{base_url}#courses", wait_until="load")
-            clean_ads(page, times=1, delay_ms=50)
-            
-            # Try again with filtering
-            all_accordions = page.locator('button[aria-expanded]').all()
-            module_buttons = [
-                btn for btn in all_accordions
-                if 'faq' not in (btn.get_attribute('aria-label') or '').lower()
-                and 'frequently' not in (btn.get_attribute('aria-label') or '').lower()
-            ]
-        
+            module_buttons = [info for info in snapshot(page.locator('button[aria-expanded]')) if not info.is_faq]
+
         if module_buttons:
             total = len(module_buttons)
-            print(f"  📊 Found {total} valid module(s) to expand (FAQ excluded)")
+            log.info(f"  📊 Found {total} valid module(s) to expand (FAQ excluded)")
             
-            for idx, btn in enumerate(module_buttons, 1):
+            for idx, info in enumerate(module_buttons, 1):
                 try:
-                    # Close ads before each click
-                    clean_ads(page, times=1, delay_ms=250)
-                    
-                    # Check if already expanded
-                    is_expanded = btn.get_attribute("aria-expanded")
-                    
-                    if is_expanded == "true":
-                        print(f"    [{idx}/{total}] Already expanded, skipping")
-                        continue
-                    
-                    # Double-check it's not FAQ before clicking
-                    btn_label = (btn.get_attribute("aria-label") or "").lower()
-                    btn_text_click = (btn.text_content() or "").lower()
-                    if (
-                        'faq' in btn_label
-                        or 'frequently' in btn_label
-                        or 'faq' in btn_text_click
-                        or 'frequently' in btn_text_click
-                        or 'question' in btn_text_click
-                    ):
-                        print(f"    [{idx}/{total}] ⊘ Skipped FAQ button")
+                    if info.is_expanded:
+                        log.debug(f"    [{idx}/{total}] Already expanded, skipping")
                         continue
-                    
+
                     # Scroll to module
-                    print(f"    [{idx}/{total}] Scrolling to module...")
+                    log.debug(f"    [{idx}/{total}] Scrolling to module...")
+                    btn = element(page, info)
                     btn.scroll_into_view_if_needed()
 
 
                     # Click to expand
-                    print(f"    [{idx}/{total}] Clicking to expand...")
+                    log.debug(f"    [{idx}/{total}] Clicking to expand...")
                     if safe_click(page, btn, timeout=1800, scroll=False):
-                        print(f"    [{idx}/{total}] ✅ Expanded")
+                        log.debug(f"    [{idx}/{total}] ✅ Expanded")
 
-            
-                    clean_ads(page, times=1, delay_ms=300)
-                    
                 except Exception as e:
-                    print(f"    [{idx}/{total}] ⚠️  Error: {str(e)[:40]}")
+                    log.warning(f"    [{idx}/{total}] ⚠️  Error: {str(e)[:40]}")
             
-            print("  ✅ All modules processed")
+            log.info("  ✅ All modules processed")
         else:
-            print("    ℹ️  No valid modules found")
+            log.debug("    ℹ️  No valid modules found")
         
         # Scroll through expanded modules
-        print("  📜 Scrolling through expanded content...")
+        log.info("  📜 Scrolling through expanded content...")
         for _ in range(3):
             scroll_and_wait(page, 450)
         
         # Click Read more in modules
-        click_read_more_buttons_in_section(page, "Modules")
+        expand_toggles_in_section(page, "Modules", "#modules, #courses")
         
-        # Final ad cleanup
-        clean_ads(page, times=1, delay_ms=400)
-        
-        print("  ✅ Modules section complete")
+        log.info("  ✅ Modules section complete")
         
     except Exception as e:
-        print(f"  ❌ Error in Modules: {str(e)[:50]}")
-    
-    print("="*70)
+        log.error(f"  ❌ Error in Modules: {str(e)[:50]}")
 
 
 def progressive_scroll_to_bottom(page):
     """Scroll to absolute bottom to load all lazy content"""
-    print("\n" + "="*70)
-    print("📍 STEP 3: SCROLL TO BOTTOM")
-    print("="*70)
-    print("  📜 Scrolling to load all remaining content...")
+    log.info("  📜 Scrolling to load all remaining content...")
     
     try:
         last_height = page.evaluate("document.body.scrollHeight")
@@ -545,10 +218,6 @@ def progressive_scroll_to_bottom(page):
             # Scroll by viewport height
             page.evaluate("window.scrollBy(0, window.innerHeight * 0.8)")
             
-            # Close ads periodically
-            if scroll_count % 5 == 0:
-                clean_ads(page, times=1, delay_ms=300)
-            
             scroll_count += 1
             
             # Check if at bottom
@@ -556,11 +225,11 @@ def progressive_scroll_to_bottom(page):
             current_pos = page.evaluate("window.pageYOffset + window.innerHeight")
             
             if scroll_count % 10 == 0:
-                print(f"    → Scrolled {scroll_count} times...")
+                log.debug(f"    → Scrolled {scroll_count} times...")
             
             # Check if reached bottom
             if current_pos >= new_height - 100:
-                print(f"    ✅ Reached bottom after {scroll_count} scrolls")
+                log.debug(f"    ✅ Reached bottom after {scroll_count} scrolls")
                 break
             
             # Check if no new content
@@ -572,28 +241,16 @@ def progressive_scroll_to_bottom(page):
         # Ensure absolute bottom
         page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
         
-        # Final ad cleanup
-        clean_ads(page, times=1, delay_ms=100)
-        
-        print("  ✅ Scroll complete")
+        log.info("  ✅ Scroll complete")
         
     except Exception as e:
-        print(f"  ⚠️  Scroll warning: {str(e)[:50]}")
-    
-    print("="*70)
+        log.warning(f"  ⚠️  Scroll warning: {str(e)[:50]}")
 
 
 def prepare_page_for_pdf(page):
     """Final preparation - expand all, remove overlays"""
-    print("\n" + "="*70)
-    print("📍 STEP 4: PREPARE FOR PDF")
-    print("="*70)
-    
     try:
-        print("  🔧 Removing overlays and expanding content...")
-        
-        # Final aggressive ad/popup cleanup
-        clean_ads(page, times=3, delay_ms=100)
+        log.info("  🔧 Removing overlays and expanding content...")
         
         # Scroll to top
         page.evaluate("window.scrollTo({top: 0, behavior: 'smooth'})")
@@ -642,7 +299,7 @@ def prepare_page_for_pdf(page):
         """)
                 
         # One final scroll to ensure everything loaded
-        print("  📜 Final scroll to ensure all content loaded...")
+        log.info("  📜 Final scroll to ensure all content loaded...")
         page.evaluate("""
             () => {
                 let pos = 0;
@@ -655,54 +312,100 @@ def prepare_page_for_pdf(page):
             }
         """)
         
-        print("  ✅ Page prepared")
+        log.info("  ✅ Page prepared")
         
     except Exception as e:
-        print(f"  ⚠️  Preparation warning: {str(e)[:50]}")
-    
-    print("="*70)
+        log.warning(f"  ⚠️  Preparation warning: {str(e)[:50]}")
 
 
-def generate_pdf(page, base_url, output_dir=".", custom_name=None):
-    """Generate PDF with selectable text.
+def _partner_name(page):
+    """Partner/university shown on the course page, or None."""
+    try:
+        return page.evaluate("""
+            () => {
+                const el = document.querySelector(
+                    '[data-e2e*="partner-name" i], [data-e2e*="partner" i] a, a[href*="/partners/"]'
+                );
+                return el ? (el.textContent || '').trim() || null : null;
+            }
+        """)
+    except Exception:
+        return None
+
+
+def _fix_layout(page):
+    """Remove fixed headers/overlays that ruin PDF rendering, then let the page settle."""
+    page.evaluate("""
+    document.querySelectorAll("*").forEach(el => {
+        const style = getComputedStyle(el);
+        if (style.position === "fixed" || style.position === "sticky") {
+            el.style.position = "static";
+            el.style.top = "auto";
+            el.style.zIndex = "0";
+        }
+    });
+
+    // Ensure main content is visible
+    document.querySelectorAll('main, article, section, .content').forEach(el => {
+        el.style.display = 'block';
+        el.style.visibility = 'visible';
+        el.style.opacity = '1';
+    });
+
+    // Remove any remaining overlays
+    document.querySelectorAll('[role="dialog"], [role="alertdialog"], .modal, .overlay').forEach(el => el.remove());
+    """)
+    wait(page, 3000)
+
+
+def generate_pdf(page, base_url, output_dir=".", custom_name=None, outputs=None, render_started=None,
+                 formats=("pdf",), pdf_profile=None):
+    """Generate PDF with selectable text, plus any other requested formats.
 
     - `output_dir`: directory where the PDF will be saved.
     - `custom_name`: optional name (from Excel) to use in the filename.
+    - `outputs`: optional `OutputManager` for `output_dir`; it reserves a
+      collision-free name (in its layout) and may write in the background.
+    - `render_started`: `time.perf_counter()` at the start of the row, for
+      the render time recorded in the manifest.
+    - `formats`: any of `pdf`, `png`, `mhtml`, `html`, all taken from the
+      same prepared page.
+    - `pdf_profile`: named PDF layout (see `pdf_profiles.py`).
+
+    Returns the PDF path (or the first other artifact without `pdf`).
     """
-    print("\n" + "="*70)
-    print("📍 STEP 5: GENERATE PDF")
-    print("="*70)
+    render_started = render_started or time.perf_counter()
     
     try:
-        # Emulate print media
-        print("  🖨️  Setting print mode...")
-        page.emulate_media(media="print")
-        
+        # PDF only: print mode from the start, so the layout fixes and the
+        # settle wait below apply to the print layout. With screen formats
+        # the switch happens in `capture`, which then re-runs `_fix_layout`.
+        if all(kind == "pdf" for kind in formats):
+            log.info("  🖨️  Setting print mode...")
+            page.emulate_media(media="print")
+
         # Extract course name (fallback if no custom name provided)
-        course_name = "Coursera_Course"
+        course_name = None
         try:
-            title = page.locator('h1').first.text_content().strip()
-            course_name = re.sub(r'[<>:"/\\|?*]', '_', title)
-            print(f"  📖 Course title: {course_name}")
+            course_name = page.locator('h1').first.text_content().strip()
+            log.info(f"  📖 Course title: {course_name}")
         except:
-            print("  ℹ️  Using default course title in filename")
+            log.info("  ℹ️  Using default course title in filename")
         
         # Create filename using optional custom name from Excel
-        url_slug = base_url.split("/")[-1].split("?")[0]
-        if custom_name:
-            safe_custom = re.sub(r'[<>:"/\\|?*]', '_', str(custom_name).strip())
-            filename = f"{safe_custom}_{url_slug}.pdf"
-        else:
-            filename = f"{course_name}_{url_slug}.pdf"
-
-        filename = re.sub(r'[<>:"/\\|?*]', '_', filename)[:200]
-
-        # Ensure output directory exists
-        os.makedirs(output_dir, exist_ok=True)
-        full_path = os.path.join(output_dir, filename)
-        
-        print(f"  💾 Filename: {full_path}")
-        print("Preparing page for PDF...")
+        if outputs is None:
+            outputs = OutputManager(output_dir)
+        partner = _partner_name(page) if outputs.layout == "partner" else None
+        paths = {
+            kind: outputs.reserve(
+                base_url, title=course_name, custom_name=custom_name, ext=EXTENSIONS[kind], partner=partner
+            )
+            for kind in formats
+        }
+
+        for full_path in paths.values():
+            log.info(f"  💾 Filename: {full_path}")
+        log.info("Preparing page for PDF...")
 
         # --- FIX BLANK PDF (Ensure all content is visible) ---
 
@@ -717,228 +420,859 @@ def generate_pdf(page, base_url, output_dir=".", custom_name=None):
             page.evaluate("window.scrollBy(0, window.innerHeight)")
             wait(page, 500)
 
-        # 4) Remove fixed headers/overlays that ruin PDF rendering
-        page.evaluate("""
-        document.querySelectorAll("*").forEach(el => {
-            const style = getComputedStyle(el);
-            if (style.position === "fixed" || style.position === "sticky") {
-                el.style.position = "static";
-                el.style.top = "auto";
-                el.style.zIndex = "0";
-            }
-        });
-
-        // Ensure main content is visible
-        document.querySelectorAll('main, article, section, .content').forEach(el => {
-            el.style.display = 'block';
-            el.style.visibility = 'visible';
-            el.style.opacity = '1';
-        });
+        # 4) Remove fixed headers/overlays that ruin PDF rendering, 5) let it settle
+        _fix_layout(page)
 
-        // Remove any remaining overlays
-        document.querySelectorAll('[role="dialog"], [role="alertdialog"], .modal, .overlay').forEach(el => el.remove());
-        """)
+        log.info(f"Saving {', '.join(k.upper() for k in formats)} now...")
 
-        # 5) Final wait for rendering
-        wait(page, 3000)
-
-        print("Saving PDF now...")
-
-        page.pdf(
-            path=full_path,
-            format="A4",
-            print_background=True,
-            prefer_css_page_size=False,
-            margin={
-                "top": "0.4in",
-                "bottom": "0.4in",
-                "left": "0.5in",
-                "right": "0.5in"
-            },
-            scale=0.90
-        )
-        
-        print(f"\n  ✅ PDF SAVED: {full_path}")
-        print("="*70)
-        return full_path
+        render_s = round(time.perf_counter() - render_started, 3)
+        written = {}
+        pdf_profile = resolve_pdf_profile(pdf_profile)
+        for kind, data, capture_s in capture(page, formats, pdf_profile, before_pdf=lambda: _fix_layout(page)):
+            if data is None:
+                continue
+            meta = {"pdf_profile": pdf_profile} if kind == "pdf" else {}
+            written[kind] = outputs.store(
+                paths[kind], data, render_s=render_s, capture_s=round(capture_s, 3), **meta
+            )
+            log.info(f"\n  ✅ {kind.upper()} {'QUEUED' if outputs.writer else 'SAVED'}: {written[kind]} "
+                     f"({capture_s:.2f}s)")
+        if "pdf" in formats:
+            return written.get("pdf")
+        return next((written[k] for k in formats if k in written), None)
         
-    
     except Exception as e:
-        print(f"  ❌ PDF generation failed: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        print("="*70)
+        log.error(f"  ❌ PDF generation failed: {str(e)}", exc_info=True)
         return None
 
 
-def _detect_excel_columns(df):
-    """Detect URL and name columns in the Excel file with flexible matching."""
-    def _find_col(possible_names):
-        lower_map = {str(c).strip().lower(): c for c in df.columns}
-        for name in possible_names:
-            if name in lower_map:
-                return lower_map[name]
+def _new_page(browser, page_state=None, popups=None, har=None):
+    """Open a fresh context and page; popups are closed per-page to avoid closing the main tab.
+
+    The blocking rules, the popup observer and `page_state` (see
+    `page_state.py`) are registered once here and apply from document start
+    on every page of the context. A `PopupCounter` in `popups` is attached
+    to count what the observer dismisses. `har` holds `route_from_har()`
+    arguments to record or replay the context's traffic (see `har_replay.py`).
+    """
+    options = context_options(page_state)
+    if har:
+        # Service workers fetch around the routes, so they would bypass the HAR.
+        options["service_workers"] = "block"
+    context = browser.new_context(viewport={"width": 1920, "height": 1080}, **options)
+    if har:
+        context.route_from_har(**har)
+    if popups:
+        popups.attach(context)
+    add_init_rules(context, observe=True)
+    prepare_context(context, page_state)
+    page = context.new_page()
+    page.on("popup", lambda popup: popup.close())
+    return context, page
+
+
+def render_row(page, base_url, output_dir, custom_name=None, outputs=None, formats=("pdf",), pdf_profile=None,
+               page_state=None):
+    """Run the full flow for one URL on an already open page.
+
+    Returns the PDF path, or None if navigation or PDF generation failed.
+    `formats` and `pdf_profile` are passed on to `generate_pdf`; the profile
+    also picks the lazy assets to skip (`pdf_profiles.asset_skips`). Pass the
+    `page_state` the page's context was made with to check that the saved
+    flags still keep the consent dialogs away.
+    With a background writer behind `outputs` the file may still be in
+    flight when this returns.
+    """
+    render_started = time.perf_counter()
+
+    # Initial page load
+    with step("load", "⏳ Loading page..."):
+        try:
+            page.goto(base_url, wait_until="domcontentloaded")
+        except Exception as e:
+            log.error(f"\n❌ Navigation failed for URL '{base_url}': {e}")
+            log.info("   Skipping this row and continuing with the next one.")
+            return None
+        # Before any scrolling, so the skipped assets never load
+        skipped = asset_skips(pdf_profile)
+        if skipped:
+            stubs = skip_assets(page, skipped)
+            log.debug(f"  🪶 Skipping lazy assets: {', '.join(skipped)} ({stubs} video stub(s))")
+        page.wait_for_timeout(3000)
+
+    # Popups are dismissed as they appear (see `popup_handler.py`); only
+    # check that the saved flags still keep the consent dialogs away.
+    with step("popups"):
+        popups = check_popups(page) if page_state else None
+        if page_state and popups is None:
+            log.warning("  ⚠️  Could not check for consent popups; the saved page state is unverified")
+        elif popups and popups["consent"]:
+            record_stale()
+            event(
+                logging.WARNING,
+                f"  ⚠️  Popups despite the saved page state ({', '.join(popups['consent'])}); "
+                "the site may have changed its flags, run 'python page_state.py capture'",
+                event="stale_page_state",
+                popups=popups["consent"],
+            )
+            close_ads_and_popups(page)
+        elif popups:
+            log.info("  ✅ Consent dialogs kept away by the saved page state")
+
+    # Sequential flow
+    with step("about", "📍 STEP 1: ABOUT SECTION"):
+        process_about_section(page, base_url)
+        page.wait_for_timeout(500)
+
+    with step("modules", "📍 STEP 2: MODULES/COURSES SECTION"):
+        process_modules_section(page, base_url)
+        page.wait_for_timeout(600)
+
+    with step("scroll", "📍 STEP 3: SCROLL TO BOTTOM"):
+        progressive_scroll_to_bottom(page)
+        page.wait_for_timeout(600)
+
+    with step("prepare", "📍 STEP 4: PREPARE FOR PDF"):
+        prepare_page_for_pdf(page)
+
+    with step("pdf", "📍 STEP 5: GENERATE PDF"):
+        return generate_pdf(
+            page,
+            base_url,
+            output_dir=output_dir,
+            custom_name=custom_name,
+            outputs=outputs,
+            render_started=render_started,
+            formats=formats,
+            pdf_profile=pdf_profile,
+        )
+
+def _new_stats(worker_id):
+    return {
+        "worker": worker_id,
+        "rows": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "recycles": 0,
+        "contexts": 0,
+        "peak_rss_mb": 0.0,
+        "seconds": 0.0,
+        "inject_ms": 0.0,
+        "popups": 0,
+    }
+
+
+def run_worker(browser, jobs, output_dir, *, total_rows=None, recycle_rows=20, recycle_mb=1500,
+               worker_id=0, memory_pid=None, ledger=None, outputs=None, formats=("pdf",),
+               pdf_profile=None, row_pdf_profiles=None, progress=None, profiler=None, page_state=None,
+               har_mode="off", har_dir=None):
+    """Process `jobs` on one browser, recycling the context to bound memory.
+
+    - `jobs`: iterable of `(row_number, url, custom_name)` tuples; may be a
+      generator fed from a queue shared with other workers.
+    - `recycle_rows`: open a fresh context after this many rows (0 = never).
+    - `recycle_mb`: open a fresh context once the browser process tree uses
+      more than this many MB of RSS (0 = never).
+    - `memory_pid`: root process whose descendants are measured (default: this process).
+    - `ledger`: path of the run ledger; every row is appended with its duration.
+    - `outputs`: shared `OutputManager` for `output_dir` (names, index, writes).
+    - `formats`: output formats per row (default: PDF only).
+    - `pdf_profile`: PDF layout for the run; `row_pdf_profiles` maps row
+      numbers to a different layout for single rows.
+    - `progress`: shared `Progress` told when each row starts and ends.
+    - `profiler`: shared `Profiler` for traces and per-step metrics.
+    - `page_state`: consent/popup flags loaded into every new context.
+    - `har_mode`: `record` or `replay` each row's traffic to/from an archive
+      in `har_dir` (see `har_replay.py`); every row then gets its own context.
+
+    Returns a stats dict with row counts, recycle count and peak RSS.
+    """
+    stats = _new_stats(worker_id)
+    started = time.perf_counter()
+    total_rows = total_rows or "?"
+    popup_counter = PopupCounter()
+    per_row_context = har_mode not in (None, "off")
+    context, page = (None, None) if per_row_context else _new_page(browser, page_state, popup_counter)
+    stats["contexts"] += 0 if per_row_context else 1
+    rows_on_context = 0
+
+    try:
+        for row_no, base_url, custom_name in jobs:
+            row_started = time.perf_counter()
+            with log_context(row=row_no, url=base_url, worker=worker_id):
+                if per_row_context:
+                    # One context per row: its HAR is written when it closes.
+                    if context:
+                        context.close()
+                    context = page = None
+                    try:
+                        har = har_options(har_mode, har_dir, base_url)
+                    except FileNotFoundError as e:
+                        log.error(f"❌ {e}")
+                        har = None
+                    if har:
+                        context, page = _new_page(browser, page_state, popup_counter, har)
+                        stats["contexts"] += 1
+                title = f"▶️  [worker {worker_id}] Processing row {row_no}/{total_rows}\n📍 URL: {base_url}"
+                if custom_name:
+                    title += f"\n🏷  Name: {custom_name}"
+                log.info(title, extra={"banner": True})
+                if progress:
+                    progress.row_started(worker_id, row_no, base_url)
+
+                profiled = profiler.row(context, page, row_no) if profiler and page else contextlib.nullcontext({})
+                with profiled as profile:
+                    try:
+                        pdf_file = None if page is None else render_row(
+                            page, base_url, output_dir, custom_name, outputs, formats,
+                            (row_pdf_profiles or {}).get(row_no, pdf_profile), page_state,
+                        )
+                    except Exception as e:
+                        log.error(f"\n❌ Critical error: {str(e)}", exc_info=True)
+                        pdf_file = None
+                    profile["ok"] = bool(pdf_file)
+                inject_ms, popups = 0.0, {}
+                if page is not None:
+                    try:
+                        inject_ms = page.evaluate(INIT_COST_JS)
+                    except Exception:
+                        pass
+                    popups = popup_counter.take(page)
+                stats["inject_ms"] += inject_ms
+                stats["popups"] += sum(popups.values())
+
+                stats["rows"] += 1
+                rows_on_context += 1
+                if progress:
+                    progress.row_finished(worker_id, bool(pdf_file))
+                if pdf_file:
+                    stats["succeeded"] += 1
+                else:
+                    stats["failed"] += 1
+                seconds = time.perf_counter() - row_started
+                rss_mb = process_tree_rss_mb(memory_pid)
+                stats["peak_rss_mb"] = max(stats["peak_rss_mb"], rss_mb)
+                event(
+                    ROW,
+                    f"{'🎉' if pdf_file else '❌'} Row {row_no}/{total_rows} "
+                    f"{'done' if pdf_file else 'failed'} in {seconds:.1f}s: {pdf_file or base_url}",
+                    event="row",
+                    outcome="ok" if pdf_file else "failed",
+                    duration_s=round(seconds, 3),
+                    path=pdf_file,
+                    name=custom_name,
+                    rss_mb=round(rss_mb, 1),
+                    inject_ms=round(inject_ms, 2),
+                    popups=popups,
+                )
+
+            if ledger:
+                append_record(
+                    ledger,
+                    row=row_no,
+                    url=base_url,
+                    name=custom_name,
+                    status="ok" if pdf_file else "failed",
+                    seconds=round(seconds, 3),
+                    rss_mb=round(rss_mb, 1),
+                    pdf=pdf_file,
+                    worker=worker_id,
+                )
+
+            over_rows = recycle_rows and rows_on_context >= recycle_rows
+            over_mb = recycle_mb and rss_mb >= recycle_mb
+            if (over_rows or over_mb) and not per_row_context:
+                reason = f"{rows_on_context} rows" if over_rows else f"{rss_mb:.0f} MB RSS"
+                log.info(f"  ♻️  Recycling browser context after {reason}")
+                context.close()
+                context, page = _new_page(browser, page_state, popup_counter)
+                rows_on_context = 0
+                stats["recycles"] += 1
+                stats["contexts"] += 1
+    finally:
+        if context:
+            context.close()
+        stats["seconds"] = time.perf_counter() - started
+
+    return stats
+
+
+_LAUNCH_LOCK = threading.Lock()
+
+
+def _drain(job_queue):
+    """Yield jobs from a shared queue until it is empty."""
+    while True:
+        try:
+            yield job_queue.get_nowait()
+        except queue.Empty:
+            return
+
+
+def _tracked(jobs, current):
+    """Yield `jobs`, keeping the one being processed in the list `current`.
+
+    A job counts as finished when the consumer asks for the next one.
+    """
+    for job in jobs:
+        current[:] = [job]
+        yield job
+        current.clear()
+
+
+def _worker_thread(worker_id, jobs, args, output_dir, total_rows, ledger, outputs, results, progress=None,
+                   profiler=None, spill=None):
+    """Run one worker with its own Playwright driver and browser.
+
+    The sync API is not thread-safe, so every thread starts its own driver.
+    The driver's pid is captured at start-up so the worker's memory reading
+    covers only its own browser.
+
+    With `spill` (balanced schedule), `jobs` is this worker's own bucket:
+    the worker also takes rows from `spill` once its bucket is done, and
+    puts the row it was on plus what is left of its bucket there if its
+    browser fails.
+    """
+    own = iter(jobs)
+    current = []    # the row `run_worker` has taken and not finished
+    if spill is not None:
+        jobs = _tracked(itertools.chain(own, _drain(spill)), current)
+    with _LAUNCH_LOCK:
+        before = child_pids()
+        playwright = sync_playwright().start()
+        started = child_pids() - before
+    driver_pid = next(iter(started)) if len(started) == 1 else None
+
+    try:
+        browser = launch_browser(playwright, args.launch_profile, single_process=args.single_process)
+        try:
+            results[worker_id] = run_worker(
+                browser,
+                jobs,
+                output_dir,
+                total_rows=total_rows,
+                recycle_rows=args.recycle_rows,
+                recycle_mb=args.recycle_mb,
+                worker_id=worker_id,
+                memory_pid=driver_pid,
+                ledger=ledger,
+                outputs=outputs,
+                formats=args.formats,
+                pdf_profile=args.pdf_profile,
+                row_pdf_profiles=args.row_pdf_profiles,
+                progress=progress,
+                profiler=profiler,
+                page_state=args.page_state,
+                har_mode=args.har,
+                har_dir=args.har_dir or os.path.join(output_dir, HAR_DIR),
+            )
+        finally:
+            browser.close()
+            log.info(f"\n✅ [worker {worker_id}] Browser closed")
+    except Exception as e:
+        log.error(f"\n❌ [worker {worker_id}] Critical error: {str(e)}", exc_info=True)
+        results.setdefault(worker_id, _new_stats(worker_id))
+        if spill is not None:
+            left = current + list(own)
+            if left:
+                log.warning(f"  ↪️  [worker {worker_id}] Handing {len(left)} row(s) to the other workers")
+            for job in left:
+                spill.put(job)
+    finally:
+        playwright.stop()
+
+
+def _record_unrun(jobs, ledger):
+    """Record rows no worker was left to render as failed; their stats, or None."""
+    if not jobs:
         return None
+    log.error(f"\n❌ {len(jobs)} row(s) not rendered: every worker that could take them had failed")
+    stats = _new_stats("unassigned")
+    for row_no, base_url, custom_name in jobs:
+        stats["rows"] += 1
+        stats["failed"] += 1
+        append_record(ledger, row=row_no, url=base_url, name=custom_name, status="failed", seconds=0.0, pdf=None)
+    return stats
 
-    # Allow a few common header variants (case-insensitive, with/without spaces)
-    url_col = _find_col([
-        "url",
-        "course_url",
-        "course url",
-        "link",
-        "course_link",
-        "course link",
-        "coursera_url",
-        "coursera url",
-    ])
-    name_col = _find_col([
-        "name",
-        "course_name",
-        "course name",
-        "title",
-        "course_title",
-        "course title",
-        "coursera course name",
-    ])
-    return url_col, name_col
-
-
-def main():
+
+def run_batch(jobs, args, output_dir, total_rows):
+    """Schedule `jobs` over `args.workers` threads.
+
+    Returns `(worker_stats, writer_stats)`; `writer_stats` is None with
+    `--sync-write`.
+
+    - `sheet`: one shared queue in sheet order.
+    - `longest-first`: one shared queue, most expensive rows first; idle
+      workers pull the next row, so the big ones do not end up last.
+    - `balanced`: rows pre-assigned to workers with equal estimated cost.
+
+    With `--shard` the ledger and manifest go to the shard's own files.
+    """
+    shard = shard_suffix(*args.shard) if args.shard else None
+    ledger = ledger_path(output_dir, shard)
+    history = load_timings(ledger_path(output_dir))
+    workers = max(1, min(args.workers, len(jobs) or 1))
+    # Rows no worker has taken yet: the shared queue, or what a failed balanced worker handed back.
+    pending = queue.Queue()
+    spill = None
+
+    if args.schedule == "balanced":
+        buckets, totals = balance(jobs, workers, history)
+        worker_jobs = buckets
+        spill = pending
+        log.info(f"⚖️  Balanced {len(jobs)} row(s) over {workers} worker(s), "
+                 f"estimated makespan {max(totals, default=0) / 60:.1f} min")
+    else:
+        ordered = order_longest_first(jobs, history) if args.schedule == "longest-first" else list(jobs)
+        for job in ordered:
+            pending.put(job)
+        worker_jobs = [_drain(pending) for _ in range(workers)]
+        log.info(f"📋 Schedule '{args.schedule}': {len(jobs)} row(s), {workers} worker(s), "
+                 f"history for {sum(1 for j in jobs if canonical_url(j[1]) in history)} row(s)")
+
+    def _written(result):
+        outputs.commit(result)
+        append_record(ledger, event="written", pdf=result["path"], bytes=result["bytes"], sha256=result["sha256"])
+
+    writer = None if args.sync_write else PdfWriter(compress=args.compress, on_done=_written)
+    outputs = OutputManager(output_dir, layout=args.layout, writer=writer, shard=shard)
+    results = {}
+    mode = resolve_mode(args.progress)
+    progress = Progress(len(jobs), mode=mode)
+    profiler = Profiler(
+        output_dir,
+        trace_sample=args.trace_sample,
+        trace_on_failure=args.trace_on_failure,
+        trace_budget_s=args.trace_slower_than,
+        metrics=args.perf_metrics,
+    )
+    profiler = profiler if profiler.enabled else None
+    threads = [
+        threading.Thread(
+            target=_worker_thread,
+            args=(i, worker_jobs[i], args, output_dir, total_rows, ledger, outputs, results, progress, profiler,
+                  spill),
+            name=f"worker-{i}",
+        )
+        for i in range(workers)
+    ]
+
+    with contextlib.ExitStack() as stack:
+        # The live view owns the terminal; the step-by-step output goes to a log file.
+        if mode == "live":
+            log_path = os.path.join(output_dir, "run.log")
+            log.info(f"📝 Detailed output: {log_path}")
+            os.makedirs(output_dir, exist_ok=True)
+            log_file = stack.enter_context(open(log_path, "a", encoding="utf-8"))
+            stack.enter_context(contextlib.redirect_stdout(log_file))
+            stack.enter_context(contextlib.redirect_stderr(log_file))
+        if writer:
+            stack.enter_context(writer)
+        progress.start()
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            unrun = _record_unrun(list(_drain(pending)), ledger)
+        finally:
+            if writer:
+                log.info("\n⏳ Waiting for background PDF writes...")
+                writer.close()
+            progress.close()
+    if profiler:
+        print_profile_report(profiler.summary())
+    worker_stats = [results[i] for i in sorted(results)] + ([unrun] if unrun else [])
+    return worker_stats, writer.stats if writer else None
+
+
+def print_run_report(worker_stats, writer_stats=None):
+    """Print a per-worker summary, including peak memory for machine sizing."""
+    log.log(ROW, "📊 RUN REPORT", extra={"banner": True})
+    for s in worker_stats:
+        log.log(
+            ROW,
+            f"  worker {s['worker']}: {s['succeeded']}/{s['rows']} ok, {s['failed']} failed, "
+            f"{s['recycles']} recycle(s), peak RSS {s['peak_rss_mb']:.0f} MB, {s['seconds']:.0f}s"
+        )
+    if worker_stats:
+        peak = max(s["peak_rss_mb"] for s in worker_stats)
+        log.log(ROW, f"  📈 Peak memory per worker: {peak:.0f} MB")
+        rows = sum(s["rows"] for s in worker_stats)
+        contexts = sum(s.get("contexts", 0) for s in worker_stats)
+        inject_ms = sum(s.get("inject_ms", 0.0) for s in worker_stats)
+        log.log(
+            ROW,
+            f"  💉 Blocking rules: {inject_ms / max(rows, 1):.1f} ms/row in-page, "
+            f"registered once on each of {contexts} context(s)"
+        )
+        popups = sum(s.get("popups", 0) for s in worker_stats)
+        log.log(ROW, f"  🧹 Popups dismissed as they appeared: {popups} ({popups / max(rows, 1):.1f}/row)")
+    if stale_rows():
+        log.warning(f"  ⚠️  {stale_rows()} row(s) showed consent popups despite the saved page state; "
+                    "refresh it with 'python page_state.py capture'")
+    if writer_stats:
+        saved = writer_stats["write_s"] - writer_stats["submit_wait_s"]
+        log.log(
+            ROW,
+            f"  💾 Background writer: {writer_stats['written']} file(s), "
+            f"{writer_stats['bytes'] / (1024 * 1024):.1f} MB, {writer_stats['errors']} error(s), "
+            f"max queue depth {writer_stats['max_queue_depth']}, ~{saved:.1f}s off the workers"
+        )
+
+
+def print_profile_report(summary):
+    """Print per-step means from `--perf-metrics` and the traces that were kept."""
+    log.log(ROW, "🔬 PROFILE", extra={"banner": True})
+    for name, s in summary["steps"].items():
+        log.log(
+            ROW,
+            f"  {name:<8} {s['rows']} row(s), mean {s['mean_s']:.1f}s, script {s['mean_script_s']:.2f}s, "
+            f"{s['mean_layouts']:.0f} layout(s), peak JS heap {s['peak_heap_mb']:.0f} MB"
+        )
+    for row_no, reason, path in summary["traces"]:
+        log.log(ROW, f"  🧵 row {row_no} ({reason}): {path}")
+    if not summary["traces"]:
+        log.log(ROW, "  No traces kept")
+
+
+def _parse_args(argv=None):
+    """Command-line options for batch mode."""
+    parser = argparse.ArgumentParser(description="Render Coursera course pages listed in an Excel sheet to PDF.")
+    parser.add_argument(
+        "mode",
+        nargs="?",
+        choices=["run", "plan", "update", "watch", "merge"],
+        default="run",
+        help="'run' renders the sheet (default); 'plan' only prints what a run would do and its estimated cost; "
+        "'update' applies only the sheet's changes since the last update; 'watch' repeats 'update' "
+        "whenever the sheet is saved; 'merge' folds finished shards into the main ledger and manifest",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        metavar="I/N",
+        help="only render the rows whose URL hashes to shard I of N (0-based); "
+        "run every shard, on one or several machines, then 'merge'",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="split the run into N shards in separate processes on this machine and merge them",
+    )
+    parser.add_argument("--interval", type=float, default=30, help="seconds between sheet checks in watch mode")
+    parser.add_argument("--excel", default="courses.xlsx", help="input sheet (default: courses.xlsx)")
+    parser.add_argument("--output-dir", default="pdfs", help="folder for generated PDFs (default: pdfs)")
+    parser.add_argument(
+        "--launch-profile",
+        choices=sorted(LAUNCH_PROFILES),
+        default=None,
+        help=f"browser launch profile (default: $COURSERA_LAUNCH_PROFILE or '{DEFAULT_LAUNCH_PROFILE}')",
+    )
+    parser.add_argument("--single-process", action="store_true", help="run Chromium with --single-process")
+    parser.add_argument(
+        "--layout",
+        choices=LAYOUTS,
+        default="flat",
+        help="output sub-folders: flat, per partner, by URL-hash prefix or by render date (default: flat)",
+    )
+    parser.add_argument(
+        "--formats",
+        type=parse_formats,
+        default=("pdf",),
+        metavar="LIST",
+        help=f"comma-separated outputs per course from one prepared page: {', '.join(FORMATS)} (default: pdf)",
+    )
+    parser.add_argument(
+        "--pdf-profile",
+        choices=sorted(PDF_PROFILES),
+        default=None,
+        help="PDF layout for the run; a 'pdf_profile' sheet column overrides it per row "
+        "(default: $COURSERA_PDF_PROFILE or 'a4')",
+    )
+    parser.add_argument(
+        "--page-state",
+        default=None,
+        metavar="PATH",
+        help="cookie/storage flags that keep consent dialogs closed, or 'none' "
+        "(default: $COURSERA_PAGE_STATE or page_state.json)",
+    )
+    parser.add_argument(
+        "--har",
+        choices=HAR_MODES,
+        default="off",
+        help="record every row's traffic into a HAR archive, or replay rows offline from them (default: off)",
+    )
+    parser.add_argument(
+        "--har-dir", default=None, metavar="DIR", help="HAR archive folder (default: <output dir>/har)"
+    )
+    parser.add_argument("--sync-write", action="store_true", help="write PDFs on the worker instead of in the background")
+    parser.add_argument("--compress", action="store_true", help="gzip PDFs on write (saved as .pdf.gz)")
+    parser.add_argument(
+        "--progress",
+        choices=PROGRESS_MODES,
+        default="auto",
+        help="live dashboard (detailed output goes to <output dir>/run.log), plain periodic lines, "
+        "or off (default: live on a terminal, plain otherwise)",
+    )
+    parser.add_argument(
+        "--log-level",
+        choices=list(LOG_LEVELS),
+        default=None,
+        help="debug, info (default), quiet (one line per row) or warning; or $COURSERA_LOG_LEVEL",
+    )
+    parser.add_argument(
+        "--log-format", choices=LOG_FORMATS, default=None, help="console format: text (default) or json lines"
+    )
+    parser.add_argument("--log-file", default=None, help="also write JSON-lines logs to this file")
+    parser.add_argument(
+        "--trace-sample", type=int, default=0, metavar="N", help="keep a Playwright trace of every Nth row"
+    )
+    parser.add_argument(
+        "--trace-on-failure", action="store_true", help="record every row, keep the traces of failed rows"
+    )
+    parser.add_argument(
+        "--trace-slower-than",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="record every row, keep the traces of rows slower than this",
+    )
+    parser.add_argument(
+        "--perf-metrics",
+        action="store_true",
+        help="log Chromium JS heap, layout count and script time per step (Chromium only)",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="parallel browser workers (default: 1)")
+    parser.add_argument(
+        "--schedule",
+        choices=SCHEDULES,
+        default="longest-first",
+        help="row order: sheet order, longest-first from timing history, or cost-balanced per worker",
+    )
+    parser.add_argument(
+        "--recycle-rows", type=int, default=20, help="open a fresh browser context after N rows (0 = never)"
+    )
+    parser.add_argument(
+        "--recycle-mb", type=int, default=1500, help="open a fresh browser context above M MB browser RSS (0 = never)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main execution flow: read URLs from Excel and generate PDFs in batch."""
 
-    excel_path = "courses.xlsx"
-    output_dir = "pdfs"
+    args = _parse_args(argv)
+    configure_logging(args.log_level, args.log_format, args.log_file)
+    excel_path = args.excel
+    output_dir = args.output_dir
 
-    print("\n" + "="*70)
-    print("🚀 COURSERA SCRAPER - BATCH MODE FROM EXCEL")
-    print("="*70)
-    print(f"📄 Excel source: {excel_path}")
-    print(f"📂 Output folder: {output_dir}")
-    print("="*70)
+    log.info("🚀 COURSERA SCRAPER - BATCH MODE FROM EXCEL", extra={"banner": True})
+    log.info(f"📄 Excel source: {excel_path}")
+    log.info(f"📂 Output folder: {output_dir}")
+    log.info(f"🧭 Launch profile: {resolve_profile_name(args.launch_profile)}")
+    log.info(f"📐 PDF profile: {resolve_pdf_profile(args.pdf_profile)}")
+    try:
+        skipped = asset_skips(args.pdf_profile)
+    except ValueError as e:
+        log.error(f"❌ {e}")
+        return
+    if skipped:
+        log.info(f"🪶 Skipping lazy assets: {', '.join(skipped)}")
+    try:
+        state_path = resolve_state_path(args.page_state)
+    except ValueError as e:
+        log.error(f"❌ {e}")
+        return
+    args.page_state = load_state(state_path) if state_path else None
+    log.info(f"🍪 Page state: {state_path or 'none, popups are clicked away'}")
+    if args.har != "off":
+        log.info(f"📼 HAR {args.har}: {args.har_dir or os.path.join(output_dir, HAR_DIR)}")
 
     if not os.path.exists(excel_path):
-        print(f"❌ Excel file not found: {excel_path}")
+        log.error(f"❌ Excel file not found: {excel_path}")
         return
 
-    # Read Excel with URLs and names
-    try:
-        df = pd.read_excel(excel_path)
-    except PermissionError as e:
-        print(f"❌ Cannot open '{excel_path}': {e}")
-        print("   Please close the Excel file (or any program using it) and run the script again.")
+    if args.mode == "plan":
+        print_plan(build_plan(excel_path, output_dir, workers=args.workers))
         return
-    if df.empty:
-        print("❌ Excel file has no rows.")
+
+    if args.mode == "merge":
+        _print_merge(output_dir)
         return
 
-    url_col, name_col = _detect_excel_columns(df)
-    if not url_col:
-        raise ValueError(
-            "Could not detect URL column in Excel. "
-            "Please name it one of: 'url', 'course_url', 'link'."
-        )
-    if not name_col:
-        raise ValueError(
-            "Could not detect course-name column in Excel. "
-            "Please name it one of: 'name', 'course_name', 'course name', 'title'."
-        )
+    if args.shard and args.mode != "run":
+        log.error("❌ --shard only works with 'run'")
+        return
+
+    if args.processes > 1 and not args.shard:
+        run_processes(args, argv if argv is not None else sys.argv[1:])
+        return
+
+    if args.mode == "watch":
+        watch(args)
+        return
 
-    print(f"✅ Detected columns - URL: '{url_col}', Name: '{name_col}'")
-    print(f"🧮 Total rows: {len(df)}")
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(channel="msedge",
-            headless=False,
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--disable-web-security',
-                '--no-sandbox'
-            ]
+    loaded = _load_sheet(args)
+    if loaded is None:
+        return
+    jobs, total_rows = loaded
+    if args.mode == "update":
+        run_update(args, jobs, total_rows)
+    elif args.shard:
+        index, count = args.shard
+        jobs = select_shard(jobs, index, count)
+        log.info(f"🧩 Shard {index}/{count}: {len(jobs)} row(s)")
+        worker_stats, writer_stats = run_batch(jobs, args, output_dir, total_rows)
+        save_report(output_dir, shard_suffix(index, count), worker_stats, writer_stats)
+        print_run_report(worker_stats, writer_stats)
+    else:
+        print_run_report(*run_batch(jobs, args, output_dir, total_rows))
+
+
+def _without_option(argv, name):
+    """`argv` minus `name VALUE` / `name=VALUE`."""
+    out, skip = [], False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg == name:
+            skip = True
+        elif not arg.startswith(name + "="):
+            out.append(arg)
+    return out
+
+
+def run_processes(args, argv):
+    """Run `args.processes` shards of this command as child processes, then merge them.
+
+    Every child gets its own Playwright driver, browser and CPU core; its
+    output goes to `<output dir>/.shard-I-of-N.log`.
+    """
+    if args.mode != "run":
+        log.error("❌ --processes only works with 'run'")
+        return
+    count = args.processes
+    child_argv = _without_option(argv, "--processes")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    children = []
+    for index in range(count):
+        log_path = os.path.join(args.output_dir, f".{shard_suffix(index, count)}.log")
+        log_file = open(log_path, "w", encoding="utf-8")
+        proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), *child_argv, "--shard", f"{index}/{count}"],
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
         )
+        children.append((index, proc, log_file, log_path))
+        log.info(f"🧩 Shard {index}/{count} started (pid {proc.pid}), log: {log_path}")
 
-        # Use a browser context; popups are closed per-page to avoid closing the main tab.
-        context = browser.new_context(viewport={"width": 1920, "height": 1080})
-        page = context.new_page()
-        page.on("popup", lambda popup: popup.close())
-        
-        try:
-            # Pre-compute column indexes for faster access in the loop
-            url_idx = df.columns.get_loc(url_col)
-            name_idx = df.columns.get_loc(name_col)
-
-            for idx, row in enumerate(df.itertuples(index=False, name=None)):
-                base_url = str(row[url_idx]).strip()
-                if not isinstance(base_url, str) or not base_url or base_url.lower() == "nan":
-                    print(f"\n[Row {idx}] ⚠️ Skipping row with empty URL")
-                    continue
-
-                name_value = row[name_idx]
-                custom_name = name_value if pd.notna(name_value) else None
-
-                print("\n" + "="*70)
-                print(f"▶️  Processing row {idx + 1}/{len(df)}")
-                print(f"📍 URL: {base_url}")
-                if custom_name:
-                    print(f"🏷  Name: {custom_name}")
-                print("="*70)
+    try:
+        for index, proc, log_file, log_path in children:
+            code = proc.wait()
+            log_file.close()
+            (log.info if code == 0 else log.error)(
+                f"{'✅' if code == 0 else '❌'} Shard {index}/{count} finished (exit {code})"
+            )
+    except KeyboardInterrupt:
+        for _, proc, log_file, _ in children:
+            proc.terminate()
+            log_file.close()
+        raise
+    _print_merge(args.output_dir)
+
+
+def _print_merge(output_dir):
+    """Merge finished shards and print the combined report."""
+    worker_stats, writer_stats, ledger_lines, manifest_lines = merge_shards(output_dir)
+    log.info(f"🧩 Merged shards: {ledger_lines} ledger line(s), {manifest_lines} manifest line(s)")
+    print_run_report(worker_stats, writer_stats)
+
+
+def _load_sheet(args):
+    """Read and de-duplicate the sheet's jobs; None (after printing why) if it cannot be used.
+
+    Per-row PDF profiles are stored on `args.row_pdf_profiles`.
+    """
+    excel_path = args.excel
 
-                # Initial page load
-                print("\n⏳ Loading page...")
-                try:
-                    page.goto(base_url, wait_until="domcontentloaded")
-                except Exception as e:
-                    print(f"\n❌ Navigation failed for URL '{base_url}': {e}")
-                    print("   Skipping this row and continuing with the next one.")
-                    continue
-                page.wait_for_timeout(3000)
-                
-                # Close initial popups and block unwanted buttons
-                close_initial_popups(page)
-                page.wait_for_timeout(1000)
-                
-                # Additional aggressive cleanup after initial load
-                print("  🧹 Additional cleanup after page load...")
-                for i in range(3):
-                    close_ads_and_popups(page)
-                    page.wait_for_timeout(800)
-                
-                # Sequential flow
-                process_about_section(page, base_url)
-                page.wait_for_timeout(500)
-                
-                process_modules_section(page, base_url)
-                page.wait_for_timeout(600)
-                
-                progressive_scroll_to_bottom(page)
-                page.wait_for_timeout(600)
-                
-                prepare_page_for_pdf(page)
-                
-                pdf_file = generate_pdf(
-                    page,
-                    base_url,
-                    output_dir=output_dir,
-                    custom_name=custom_name,
-                )
-                
-                if pdf_file:
-                    print("\n" + "="*70)
-                    print("🎉 SUCCESS!")
-                    print(f"📄 {pdf_file}")
-                    print("="*70)
-                
-                page.wait_for_timeout(3000)
-            
-        except Exception as e:
-            print(f"\n❌ Critical error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-        
-        finally:
-            context.close()
-            browser.close()
-            print("\n✅ Browser closed")
+    # Read Excel with URLs and names; parsed once for the jobs and the profile column
+    try:
+        rows = read_sheet_rows(excel_path)
+    except PermissionError as e:
+        log.error(f"❌ Cannot open '{excel_path}': {e}")
+        log.info("   Please close the Excel file (or any program using it) and run the script again.")
+        return None
+    jobs, total_rows, url_col, name_col = jobs_from_rows(rows)
+    if not total_rows:
+        log.error("❌ Excel file has no rows.")
+        return None
 
+    log.info(f"✅ Detected columns - URL: '{url_col}', Name: '{name_col}'")
+    log.info(f"🧮 Total rows: {total_rows}")
+    if total_rows > len(jobs):
+        log.warning(f"⚠️ Skipping {total_rows - len(jobs)} row(s) with empty URL")
+
+    args.row_pdf_profiles = {}
+    profile_col, row_profiles = column_from_rows(rows, PDF_PROFILE_COLUMN_NAMES)
+    for row_no, profile in row_profiles.items():
+        if profile.lower() in PDF_PROFILES:
+            args.row_pdf_profiles[row_no] = profile.lower()
+        else:
+            log.warning(f"⚠️ Row {row_no}: unknown PDF profile '{profile}', using the run default")
+    if profile_col:
+        log.info(f"📐 Per-row PDF profiles from column '{profile_col}': {len(args.row_pdf_profiles)} row(s)")
+
+    jobs, duplicates = dedupe_jobs(jobs)
+    for row_no, url, _ in duplicates:
+        log.warning(f"⚠️ Row {row_no}: duplicate of an earlier row, skipping ({url})")
+    return jobs, total_rows
+
+
+def run_update(args, jobs, total_rows):
+    """Incremental run: apply the sheet's changes since the last snapshot.
+
+    Removed rows lose their outputs, renamed rows are renamed on disk and
+    only new (or still missing) rows are rendered.
+    """
+    output_dir = args.output_dir
+    snapshot = snapshot_path(output_dir)
+    diff = diff_jobs(load_snapshot(snapshot), jobs)
+    log.info(f"🔁 Sheet changes: {len(diff['added'])} added, {len(diff['removed'])} removed, "
+             f"{len(diff['renamed'])} renamed, {len(diff['unchanged'])} unchanged")
+
+    outputs = OutputManager(output_dir, layout=args.layout)
+    todo = apply_diff(diff, outputs, ledger_path(output_dir))
+    if todo:
+        log.info(f"▶️  {len(todo)} row(s) need rendering")
+        print_run_report(*run_batch(todo, args, output_dir, total_rows))
+    else:
+        log.info("✅ Nothing to render")
+    save_snapshot(snapshot, jobs)
+
+
+def watch(args):
+    """Run `run_update` whenever the sheet changes on disk, until Ctrl+C."""
+    log.info(f"👀 Watching {args.excel} every {args.interval}s (Ctrl+C to stop)")
+    last_seen = None
+    try:
+        while True:
+            try:
+                stamp = os.stat(args.excel).st_mtime_ns
+            except OSError:
+                stamp = None
+            if stamp is not None and stamp != last_seen:
+                loaded = _load_sheet(args)
+                # A sheet that is open in Excel is retried on the next tick.
+                if loaded is not None:
+                    last_seen = stamp
+                    run_update(args, *loaded)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        log.info("\n👋 Stopped watching")
 
 if __name__ == "__main__":
     main()
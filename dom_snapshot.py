@@ -0,0 +1,86 @@
+"""Bulk DOM introspection: one round trip per locator set.
+
+Reading `aria-label`, `data-e2e`, `data-testid`, `class`, `aria-expanded`
+and the text of each button separately costs one IPC hop per attribute per
+element.
+`snapshot(locator)` reads everything the section processors look at for
+every matching element in a single `evaluate_all` call and returns
+`ElementInfo` records. Each element is tagged with a `data-cert-ref`
+attribute so `element(page, info)` can click it later even if the page
+added or removed buttons in between.
+
+`expand_toggles(page, root)` goes further for the "Read more" and "View all
+skills" toggles of one section: it finds, filters and clicks them all
+inside the page, waits for the DOM to settle and does one more round for
+the toggles the first one revealed.
+"""
+from collections import namedtuple
+
+from filter_rules import expand_js, is_faq, should_skip_read_more
+
+REF_ATTRIBUTE = "data-cert-ref"
+
+_SNAPSHOT_JS = """
+els => els.map(el => {
+    const attr = name => el.getAttribute(name) || '';
+    const ref = String(window.__certRef = (window.__certRef || 0) + 1);
+    el.setAttribute('%s', ref);
+    const parent = el.parentElement && el.parentElement.parentElement;
+    const style = window.getComputedStyle(el);
+    const rect = el.getBoundingClientRect();
+    return [
+        ref,
+        attr('aria-label'),
+        attr('data-e2e'),
+        attr('data-testid'),
+        attr('class'),
+        el.getAttribute('aria-expanded'),
+        el.textContent || '',
+        parent ? (parent.textContent || '').slice(0, 200) : '',
+        rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden',
+    ];
+})
+""" % REF_ATTRIBUTE
+
+_Fields = namedtuple(
+    "_Fields", "ref aria_label data_e2e data_testid css_class expanded text context_text visible"
+)
+
+
+class ElementInfo(_Fields):
+    """What the processors need to know about one element, read in bulk."""
+
+    __slots__ = ()
+
+    @property
+    def is_faq(self) -> bool:
+        return is_faq(self.aria_label, self.data_e2e, self.css_class, self.text, self.context_text,
+                      self.data_testid)
+
+    @property
+    def skip_read_more(self) -> bool:
+        return should_skip_read_more(self.aria_label)
+
+    @property
+    def is_expanded(self) -> bool:
+        return self.expanded == "true"
+
+
+def snapshot(locator) -> list:
+    """`ElementInfo` for every element matching `locator`, in document order."""
+    return [ElementInfo(*row) for row in locator.evaluate_all(_SNAPSHOT_JS)]
+
+
+def element(page, info):
+    """Locator for the element `info` was read from."""
+    return page.locator(f'[{REF_ATTRIBUTE}="{info.ref}"]')
+
+
+def expand_toggles(page, root=None, quiet_ms=300, max_ms=3000) -> dict:
+    """Click every eligible expand toggle under `root` in one evaluate; `{section id: clicks}`.
+
+    `root` is a CSS selector for the section(s); the whole page when it is
+    None or matches nothing. After each round of clicks, waits until the
+    DOM has had no mutation for `quiet_ms` (at most `max_ms`).
+    """
+    return page.evaluate(expand_js(), [root, quiet_ms, max_ms])
@@ -0,0 +1,426 @@
+"""Single registry for the FAQ, promo and ad filtering rules.
+
+The rules live in `filter_rules.json` and are loaded once per process. They
+compile to:
+
+- a Python matcher (`is_faq`, `should_skip_read_more`) over precompiled
+  lower-case keyword tuples, lowering each candidate string only once;
+- a blocking stylesheet (`blocking_css`);
+- one in-page JS matcher (`rules_js`) that installs `window.__certRules`
+  with the same keyword checks, the overlay cleanup, a popup finder and
+  the one-pass toggle expansion;
+- a document-start script (`init_js`) with both of the above, registered
+  once per browser context by `add_init_rules`, so every page the context
+  opens has the stylesheet before its first paint.
+"""
+import functools
+import json
+from pathlib import Path
+
+RULES_PATH = Path(__file__).with_name("filter_rules.json")
+
+
+@functools.lru_cache(maxsize=None)
+def load_rules(path=None) -> dict:
+    """Read the rule file once; later calls return the cached dict."""
+    with open(path or RULES_PATH, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _keywords(rules, key):
+    """Lower-cased keyword tuple; matching lowers the haystack once instead."""
+    return tuple(k.lower() for k in rules[key])
+
+
+_RULES = load_rules()
+_FAQ_KEYWORDS = _keywords(_RULES, "faq_keywords")
+_FAQ_CONTEXT_KEYWORDS = _keywords(_RULES, "faq_context_keywords")
+_READ_MORE_SKIP_KEYWORDS = _keywords(_RULES, "read_more_skip_keywords")
+
+
+def _contains_any(haystack, keywords) -> bool:
+    for keyword in keywords:
+        if keyword in haystack:
+            return True
+    return False
+
+
+def is_faq(aria_label="", data_e2e="", css_class="", text="", context_text="", data_testid="") -> bool:
+    """Classify an accordion/button as FAQ from its attributes, like `isFaqElement` in the page.
+
+    `context_text` is the text of the surrounding block (e.g. the first 200
+    characters of the grandparent), matched against `faq_context_keywords`.
+    Keywords never contain newlines, so the attributes are joined and
+    lower-cased once and searched in a single pass.
+    """
+    haystack = f"{aria_label}\n{data_e2e}\n{data_testid}\n{css_class}\n{text}".lower()
+    if _contains_any(haystack, _FAQ_KEYWORDS):
+        return True
+    return bool(context_text) and _contains_any(context_text.lower(), _FAQ_CONTEXT_KEYWORDS)
+
+
+def should_skip_read_more(aria_label) -> bool:
+    """True for Read more toggles that belong to Explore/FAQ/partner blocks."""
+    return bool(aria_label) and _contains_any(aria_label.lower(), _READ_MORE_SKIP_KEYWORDS)
+
+
+def close_button_selector() -> str:
+    """Playwright selector for close buttons of promo dialogs."""
+    return ", ".join(load_rules()["close_button_selectors"])
+
+
+@functools.lru_cache(maxsize=None)
+def blocking_css() -> str:
+    """Stylesheet that disables FAQ/Explore buttons and hides promos and cookie banners."""
+    rules = load_rules()
+
+    def block(selectors, body):
+        return ",\n".join(selectors) + " {\n" + body + "\n}\n"
+
+    return "".join([
+        block(rules["blocked_button_selectors"],
+              "  pointer-events: none !important;\n  display: none !important;"),
+        block(rules["faq_block_selectors"],
+              "  pointer-events: none !important;\n  opacity: 0.3 !important;\n  cursor: not-allowed !important;"),
+        block(rules["disabled_button_selectors"],
+              "  pointer-events: none !important;\n  opacity: 0.3 !important;"),
+        block(rules["promo_selectors"],
+              "  display: none !important;\n  visibility: hidden !important;\n"
+              "  pointer-events: none !important;\n  opacity: 0 !important;\n  z-index: -9999 !important;"),
+        block(rules["cookie_banner_selectors"], "  display: none !important;"),
+    ])
+
+
+_RULES_JS_TEMPLATE = """
+(() => {
+    if (window.__certRules) return;
+    const R = __RULES__;
+    const esc = s => s.replace(/[.*+?^${}()|[\\]\\\\]/g, '\\\\$&');
+    const kw = list => new RegExp(list.map(esc).join('|'), 'i');
+    const faqRe = kw(R.faq_keywords);
+    const faqContextRe = kw(R.faq_context_keywords);
+    const skipRe = kw(R.read_more_skip_keywords);
+    const overlayRe = kw(R.overlay_class_keywords);
+    const join = list => list.join(', ');
+    const promoSel = join(R.promo_selectors);
+    const dialogSel = join(R.dialog_selectors);
+    const cookieSel = join(R.cookie_accept_selectors);
+    const consentSel = join(R.cookie_banner_selectors);
+    const adSel = join(R.ad_selectors);
+    const notifSel = join(R.notification_selectors);
+    const closeSel = join(R.dialog_close_selectors);
+    const noClickSel = join(R.faq_block_selectors.concat(R.blocked_button_selectors, R.disabled_button_selectors));
+    const cls = el => String(el.getAttribute && el.getAttribute('class') || '');
+    const attr = (el, name) => (el.getAttribute && el.getAttribute(name)) || '';
+
+    const isFaqContext = text => faqContextRe.test(text);
+
+    const isFaqElement = el => {
+        if (faqRe.test(attr(el, 'aria-label')) || faqRe.test(attr(el, 'data-e2e')) ||
+            faqRe.test(attr(el, 'data-testid')) || faqRe.test(cls(el)) ||
+            faqRe.test(el.textContent || '')) return true;
+        const parent = el.parentElement && el.parentElement.parentElement;
+        return !!parent && faqContextRe.test((parent.textContent || '').slice(0, 200));
+    };
+
+    const removeOverlays = () => {
+        let removed = 0;
+        const drop = el => { el.remove(); removed++; };
+
+        document.querySelectorAll(promoSel).forEach(drop);
+
+        document.querySelectorAll(dialogSel).forEach(el => {
+            if (!isFaqContext(el.textContent || '')) drop(el);
+        });
+
+        document.querySelectorAll(closeSel).forEach(btn => {
+            if (isFaqElement(btn)) return;
+            const parent = btn.closest(dialogSel);
+            if (parent && !isFaqContext(parent.textContent || '')) {
+                try { btn.click(); } catch (e) {}
+            }
+        });
+
+        document.querySelectorAll('body *').forEach(el => {
+            const style = window.getComputedStyle(el);
+            if (style.position !== 'fixed' && style.position !== 'absolute') return;
+            const z = parseInt(style.zIndex);
+            if (!(z > R.overlay_z_index || (z > R.overlay_class_z_index && overlayRe.test(cls(el))))) return;
+            if (!isFaqContext(el.textContent || '') && !isFaqContext(cls(el))) drop(el);
+        });
+
+        const cookieBtn = document.querySelector(cookieSel);
+        if (cookieBtn) cookieBtn.click();
+
+        document.querySelectorAll(adSel).forEach(drop);
+
+        document.querySelectorAll(notifSel).forEach(el => {
+            const style = window.getComputedStyle(el);
+            if ((style.position === 'fixed' || style.position === 'sticky') &&
+                !isFaqContext(el.textContent || '')) drop(el);
+        });
+
+        document.body.style.overflow = 'visible';
+        document.body.style.position = 'static';
+        document.documentElement.style.overflow = 'visible';
+        return removed;
+    };
+
+    const visible = el => {
+        if (!el.getClientRects().length) return false;
+        const style = window.getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none' && style.opacity !== '0';
+    };
+
+    const describe = el =>
+        `${el.tagName.toLowerCase()} ${attr(el, 'aria-label') || el.id || cls(el)}`.trim().slice(0, 60);
+
+    const knownText = el => R.popup_texts.find(t => (el.textContent || '').includes(t));
+
+    // Consent popups the observer removed; `findPopups` still reports them.
+    const stale = window.__certStale = window.__certStale || [];
+    const noteStale = el => {
+        const text = knownText(el);
+        const banners = (el.matches(consentSel) ? [el] : []).concat(Array.from(el.querySelectorAll(consentSel)));
+        (text ? [`text: ${text}`] : []).concat(banners.map(describe))
+            .forEach(d => { if (!stale.includes(d)) stale.push(d); });
+    };
+
+    // Consent popups the saved flags should have kept away (cookie banners
+    // in the DOM, even if our stylesheet hides them, visible dialogs with a
+    // known text, and both kinds the observer already removed) and any other
+    // visible dialog. Page content that merely mentions a known text does
+    // not count.
+    const findPopups = () => {
+        const shown = Array.from(document.querySelectorAll(dialogSel))
+            .filter(el => visible(el) && !isFaqContext(el.textContent || ''));
+        const consent = Array.from(document.querySelectorAll(consentSel)).map(describe)
+            .concat(shown.filter(knownText).map(el => `text: ${knownText(el)}`));
+        return {
+            consent: consent.concat(stale.filter(d => !consent.includes(d))),
+            dialogs: shown.filter(el => !knownText(el)).map(describe),
+        };
+    };
+
+    // Dismiss popups among newly added elements (`nodes`); used by the
+    // observer in `init_js`. Returns `[kind, description]` per popup.
+    const dismissAdded = nodes => {
+        const handled = [];
+        const done = new Set();
+        const batch = new Set(nodes);
+        const isRoot = el => {
+            for (let p = el.parentElement; p; p = p.parentElement) if (batch.has(p)) return false;
+            return true;
+        };
+        const within = (el, sel) => (el.matches(sel) ? [el] : []).concat(Array.from(el.querySelectorAll(sel)));
+        const drop = (el, kind) => {
+            if (done.has(el) || !el.isConnected || isFaqContext(el.textContent || '')) return;
+            done.add(el);
+            handled.push([kind, describe(el)]);
+            noteStale(el);
+            el.remove();
+        };
+
+        for (const root of nodes.filter(el => el.isConnected && isRoot(el))) {
+            within(root, promoSel).forEach(el => drop(el, 'promo'));
+            within(root, adSel).forEach(el => drop(el, 'ad'));
+            within(root, dialogSel).forEach(el => {
+                if (isFaqContext(el.textContent || '')) return;
+                const close = el.querySelector(closeSel);
+                if (close && !isFaqElement(close)) { try { close.click(); } catch (e) {} }
+                drop(el, 'dialog');
+            });
+            // Accept cookie banners but leave them in the DOM (hidden by the
+            // stylesheet), so `findPopups` still sees stale consent flags.
+            within(root, consentSel).forEach(el => {
+                const accept = el.querySelector(cookieSel);
+                if (!accept || done.has(el)) return;
+                done.add(el);
+                try { accept.click(); } catch (e) {}
+                handled.push(['cookie', describe(el)]);
+            });
+        }
+        for (const el of nodes) {
+            if (!el.isConnected) continue;
+            const style = window.getComputedStyle(el);
+            const z = parseInt(style.zIndex);
+            if ((style.position === 'fixed' || style.position === 'absolute') &&
+                (z > R.overlay_z_index || (z > R.overlay_class_z_index && overlayRe.test(cls(el))))) {
+                drop(el, 'overlay');
+            } else if ((style.position === 'fixed' || style.position === 'sticky') && el.matches(notifSel)) {
+                drop(el, 'notification');
+            }
+        }
+        if (handled.length && document.body) {
+            document.body.style.overflow = 'visible';
+            document.body.style.position = 'static';
+            document.documentElement.style.overflow = 'visible';
+        }
+        return handled;
+    };
+
+    // Click every visible expand toggle (`expand_texts`) inside the
+    // elements matching `root` (the whole page if none match), minus the
+    // skip-keyword and blocked buttons, and wait until the DOM has been
+    // quiet for `quietMs` (at most `maxMs` per round). A second round picks
+    // up the toggles the first one revealed (e.g. under "View all
+    // skills"). Resolves to `{section id: clicks}`.
+    const expandToggles = async (root, quietMs, maxMs) => {
+        const texts = R.expand_texts.map(t => t.toLowerCase());
+        const roots = root ? Array.from(document.querySelectorAll(root)) : [];
+        const counts = {};
+        const clicked = new Set();
+        const round = () => {
+            let n = 0;
+            (roots.length ? roots : [document]).forEach(r => r.querySelectorAll('button').forEach(btn => {
+                if (clicked.has(btn)) return;
+                const text = (btn.textContent || '').trim().toLowerCase();
+                if (!texts.some(t => text.includes(t)) || !visible(btn)) return;
+                if (skipRe.test(attr(btn, 'aria-label')) || btn.matches(noClickSel)) return;
+                clicked.add(btn);
+                const section = btn.closest('section[id]') || btn.closest('[id]');
+                const key = section ? section.id : 'page';
+                try { btn.click(); } catch (e) { return; }
+                counts[key] = (counts[key] || 0) + 1;
+                n++;
+            }));
+            return n;
+        };
+        const settle = () => new Promise(resolve => {
+            let last = performance.now();
+            const started = last;
+            const observer = new MutationObserver(() => { last = performance.now(); });
+            observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true});
+            const check = () => {
+                const now = performance.now();
+                if (now - last >= quietMs || now - started >= maxMs) {
+                    observer.disconnect();
+                    resolve();
+                } else {
+                    setTimeout(check, 50);
+                }
+            };
+            setTimeout(check, quietMs);
+        });
+        if (round()) {
+            await settle();
+            if (round()) await settle();
+        }
+        return counts;
+    };
+
+    window.__certRules = {
+        isFaqElement,
+        skipReadMore: label => skipRe.test(label || ''),
+        removeOverlays,
+        findPopups,
+        dismissAdded,
+        expandToggles,
+    };
+})();
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def rules_js() -> str:
+    """JS source that installs `window.__certRules` (idempotent per document)."""
+    return _RULES_JS_TEMPLATE.replace("__RULES__", json.dumps(load_rules()))
+
+
+@functools.lru_cache(maxsize=None)
+def cleanup_js() -> str:
+    """JS expression that installs the matcher if needed and removes overlays.
+
+    Evaluates to the number of removed elements.
+    """
+    return rules_js() + "\nwindow.__certRules.removeOverlays();"
+
+
+@functools.lru_cache(maxsize=None)
+def popup_check_js() -> str:
+    """JS expression that evaluates to the visible consent popups and dialogs.
+
+    See `page_state.check_popups`.
+    """
+    return rules_js() + "\nwindow.__certRules.findPopups();"
+
+
+@functools.lru_cache(maxsize=None)
+def expand_js() -> str:
+    """JS function `(args) => {section: clicks}` that expands the toggles under a root in one evaluate.
+
+    `args` is `[root, quiet_ms, max_ms]`; see `dom_snapshot.expand_toggles`.
+    """
+    return (
+        "([root, quietMs, maxMs]) => {\n" + rules_js()
+        + "\nreturn window.__certRules.expandToggles(root, quietMs, maxMs);\n}"
+    )
+
+
+_INIT_JS_TEMPLATE = """
+(() => {
+    const started = performance.now();
+    __RULES_JS__
+    const R = window.__certRules;
+    const addStyle = () => {
+        if (document.getElementById('__cert-blocking-css')) return;
+        const style = document.createElement('style');
+        style.id = '__cert-blocking-css';
+        style.textContent = __CSS__;
+        (document.head || document.documentElement).appendChild(style);
+    };
+    if (document.documentElement) addStyle();
+    else document.addEventListener('readystatechange', addStyle, {once: true});
+    if (__OBSERVE__) {
+        // Event-driven clean-up: collect the elements the page adds and
+        // dismiss the popups among them once the document is parsed, then
+        // in 50 ms batches. Each dismissal is counted and, when the
+        // `__certPopup` binding is exposed, reported to Python.
+        window.__certPopupCount = 0;
+        let pending = [];
+        let timer = null;
+        const flush = () => {
+            timer = null;
+            const batch = pending;
+            pending = [];
+            for (const [kind, label] of R.dismissAdded(batch)) {
+                window.__certPopupCount++;
+                if (window.__certPopup) window.__certPopup(kind, label).catch(() => {});
+            }
+        };
+        const schedule = () => {
+            if (!timer && pending.length && document.readyState !== 'loading') timer = setTimeout(flush, 50);
+        };
+        new MutationObserver(records => {
+            for (const r of records) for (const n of r.addedNodes) if (n.nodeType === 1) pending.push(n);
+            schedule();
+        }).observe(document, {childList: true, subtree: true});
+        document.addEventListener('DOMContentLoaded', schedule);
+        window.removeAds = () => R.removeOverlays();
+    }
+    R.initMs = performance.now() - started;
+})();
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def init_js(observe=False) -> str:
+    """Document-start script: the matcher, the blocking stylesheet and, with
+    `observe`, a MutationObserver that dismisses popups as they appear
+    (see `popup_handler.py`).
+
+    Records its own in-page cost in `window.__certRules.initMs`.
+    """
+    return (
+        _INIT_JS_TEMPLATE.replace("__RULES_JS__", rules_js())
+        .replace("__CSS__", json.dumps(blocking_css()))
+        .replace("__OBSERVE__", "true" if observe else "false")
+    )
+
+
+INIT_COST_JS = "window.__certRules && window.__certRules.initMs || 0"
+
+
+def add_init_rules(context, observe=False):
+    """Register `init_js()` on a browser context; every page it opens gets it from document start."""
+    context.add_init_script(init_js(observe))
@@ -0,0 +1,67 @@
+"""Record course pages into HAR archives and replay them offline.
+
+Debugging a slow row against coursera.org is not reproducible: content,
+A/B tests and promos change between attempts. Two modes fix the input:
+
+- `record`: every row runs in its own browser context, which records all
+  its traffic into `<har dir>/<type>-<slug>.har.zip` through
+  `context.route_from_har(update=True)`. The archive is written when the
+  context closes.
+- `replay`: the same rows are served entirely from those archives.
+  Requests not in the archive are aborted, so nothing touches the
+  network and a render is reproducible. This also gives regression
+  benchmarks a stable input.
+
+Replay matches requests by URL and method, so a page that adds timestamps
+to its API calls may miss some responses; record again after site changes.
+"""
+import os
+import re
+
+from course_urls import canonical_url, page_type, url_slug
+
+HAR_MODES = ("off", "record", "replay")
+HAR_DIR = "har"
+
+
+def har_path(har_dir, url) -> str:
+    """Archive for one course URL; spellings of the same course share it."""
+    url = canonical_url(url)
+    name = re.sub(r"[^\w.-]+", "_", f"{page_type(url)}-{url_slug(url)}")
+    return os.path.join(har_dir, f"{name}.har.zip")
+
+
+def har_options(mode, har_dir, url):
+    """`route_from_har()` keyword arguments for one row, or None when `mode` is `off`.
+
+    Raises FileNotFoundError in replay mode if the URL was never recorded.
+    """
+    if not mode or mode == "off":
+        return None
+    path = har_path(har_dir, url)
+    if mode == "record":
+        os.makedirs(har_dir, exist_ok=True)
+        return {"har": path, "update": True}
+    if mode == "replay":
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No HAR archive for {url} ({path}); record it with '--har record' first")
+        return {"har": path, "not_found": "abort"}
+    raise ValueError(f"Unknown HAR mode '{mode}'. Choose one of: {', '.join(HAR_MODES)}.")
+
+
+def replay_context(context, har_dir, urls) -> list:
+    """Serve every recorded URL of `urls` from its archive in one context.
+
+    Requests no archive answers are aborted. Returns the URLs that have no
+    archive. Used by the benchmarks to render many rows on one context.
+    """
+    # Routes run newest first: each archive falls back to the next, then to the abort.
+    context.route("**/*", lambda route: route.abort())
+    missing = []
+    for url in dict.fromkeys(urls):
+        path = har_path(har_dir, url)
+        if os.path.exists(path):
+            context.route_from_har(path, not_found="fallback")
+        else:
+            missing.append(url)
+    return missing
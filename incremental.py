@@ -0,0 +1,98 @@
+"""Incremental runs: only re-render what changed in the sheet.
+
+After every incremental run the sheet's rows are saved to
+`.sheet_snapshot.json` in the output folder, keyed by canonical URL. The
+next run compares the current sheet with that snapshot:
+
+- new URLs, and URLs without an output yet, are rendered (a new URL that
+  already has one, e.g. from a plain run, is not);
+- URLs no longer in the sheet have their outputs deleted;
+- a changed name renames the existing files without opening a browser
+  (unless the name was cleared: the old files are deleted and the row is
+  rendered again, since the page title is needed then).
+
+A URL edited in place counts as one removal plus one addition.
+"""
+import json
+import os
+
+from course_urls import canonical_url
+from pdf_writer import write_atomic
+from run_ledger import append_record
+from run_log import log
+
+SNAPSHOT_NAME = ".sheet_snapshot.json"
+
+
+def snapshot_path(output_dir) -> str:
+    return os.path.join(output_dir, SNAPSHOT_NAME)
+
+
+def load_snapshot(path) -> dict:
+    """`{canonical_url: {"row", "url", "name"}}` from the last run; empty if there is none."""
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_snapshot(path, jobs):
+    """Record `(row_number, url, name)` jobs as the processed state of the sheet."""
+    snapshot = {canonical_url(url): {"row": row_no, "url": url, "name": name} for row_no, url, name in jobs}
+    write_atomic(path, json.dumps(snapshot, ensure_ascii=False, indent=1).encode("utf-8"))
+
+
+def diff_jobs(snapshot, jobs) -> dict:
+    """Compare de-duplicated jobs with a snapshot.
+
+    Returns `{"added": [job], "removed": [snapshot entry],
+    "renamed": [(job, old_name)], "unchanged": [job]}`.
+    """
+    diff = {"added": [], "removed": [], "renamed": [], "unchanged": []}
+    current = set()
+    for job in jobs:
+        key = canonical_url(job[1])
+        current.add(key)
+        old = snapshot.get(key)
+        if old is None:
+            diff["added"].append(job)
+        elif (old.get("name") or None) != job[2]:
+            diff["renamed"].append((job, old.get("name")))
+        else:
+            diff["unchanged"].append(job)
+    diff["removed"] = [entry for key, entry in snapshot.items() if key not in current]
+    return diff
+
+
+def apply_diff(diff, outputs, ledger=None) -> list:
+    """Delete and rename outputs for `diff`; return the jobs that still need a browser.
+
+    `outputs` is the folder's `OutputManager`; renames and removals are
+    appended to `ledger` when given.
+    """
+    def remove(url, row):
+        for path in outputs.remove(url):
+            log.info(f"  🗑️  Removed {path}")
+        if ledger:
+            append_record(ledger, event="removed", url=url, row=row)
+
+    for entry in diff["removed"]:
+        remove(entry["url"], entry.get("row"))
+
+    todo = [job for job in diff["added"] if not outputs.has_output(job[1])]
+    for job, _ in diff["renamed"]:
+        if not job[2]:
+            # Name cleared: the new name comes from the page title.
+            remove(job[1], job[0])
+            todo.append(job)
+            continue
+        for old_path, new_path in outputs.rename(job[1], job[2]):
+            log.info(f"  ✏️  Renamed {os.path.basename(old_path)} -> {os.path.basename(new_path)}")
+            if ledger:
+                append_record(ledger, event="renamed", url=job[1], row=job[0], old=old_path, new=new_path)
+        if not outputs.has_output(job[1]):
+            todo.append(job)
+
+    todo.extend(job for job in diff["unchanged"] if not outputs.has_output(job[1]))
+    return sorted(todo, key=lambda job: job[0])
@@ -0,0 +1,99 @@
+"""Browser launch profiles shared by the batch scripts.
+
+Both `coursera.py` and `coursera_pipeline.py` used to hardcode a headed
+Edge window, which cannot start on a Linux render box. Every launch now goes
+through a named profile; the default is headless bundled Chromium.
+"""
+import os
+
+# Flags every profile gets: hide the automation banner and keep Chromium
+# from touching the (tiny) /dev/shm of a container.
+_BASE_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+]
+
+# Flags that cut idle memory and background work on a render server.
+_LOW_MEMORY_ARGS = [
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--mute-audio",
+    "--no-first-run",
+    "--renderer-process-limit=2",
+]
+
+LAUNCH_PROFILES = {
+    # Bundled Chromium, headless, low-memory flags. Default for servers.
+    "headless": {
+        "channel": None,
+        "headless": True,
+        "args": _BASE_ARGS + _LOW_MEMORY_ARGS,
+    },
+    # One renderer and no site isolation: slowest to recover from a crash,
+    # but the smallest footprint that still keeps the browser process apart.
+    "headless-lowmem": {
+        "channel": None,
+        "headless": True,
+        "args": _BASE_ARGS + [a for a in _LOW_MEMORY_ARGS if not a.startswith("--renderer-process-limit")] + [
+            "--renderer-process-limit=1",
+            "--disable-features=site-per-process,Translate,MediaRouter",
+            "--js-flags=--max-old-space-size=512",
+        ],
+    },
+    # Everything in one OS process, for very small containers.
+    "single-process": {
+        "channel": None,
+        "headless": True,
+        "args": _BASE_ARGS + _LOW_MEMORY_ARGS + ["--single-process", "--no-zygote"],
+    },
+    # The original desktop setup: visible Edge window, useful for debugging.
+    "headed-edge": {
+        "channel": "msedge",
+        "headless": False,
+        "args": [
+            "--disable-blink-features=AutomationControlled",
+            "--disable-web-security",
+            "--no-sandbox",
+        ],
+    },
+}
+
+DEFAULT_LAUNCH_PROFILE = "headless"
+
+
+def resolve_profile_name(profile=None) -> str:
+    """Pick a profile name: explicit argument, then $COURSERA_LAUNCH_PROFILE, then the default."""
+    name = profile or os.environ.get("COURSERA_LAUNCH_PROFILE") or DEFAULT_LAUNCH_PROFILE
+    if name not in LAUNCH_PROFILES:
+        raise ValueError(
+            f"Unknown launch profile '{name}'. "
+            f"Choose one of: {', '.join(sorted(LAUNCH_PROFILES))}."
+        )
+    return name
+
+
+def launch_options(profile=None, *, single_process: bool = False) -> dict:
+    """Build keyword arguments for `playwright.chromium.launch()`.
+
+    - `profile`: name from `LAUNCH_PROFILES` (see `resolve_profile_name`).
+    - `single_process`: add `--single-process` to any headless profile.
+    """
+    spec = LAUNCH_PROFILES[resolve_profile_name(profile)]
+    args = list(spec["args"])
+    if single_process and spec["headless"] and "--single-process" not in args:
+        args += ["--single-process", "--no-zygote"]
+
+    options = {"headless": spec["headless"], "args": args}
+    if spec["channel"]:
+        options["channel"] = spec["channel"]
+    return options
+
+
+def launch_browser(playwright, profile=None, *, single_process: bool = False):
+    """Launch Chromium from a Playwright instance using a named profile."""
+    return playwright.chromium.launch(**launch_options(profile, single_process=single_process))
@@ -0,0 +1,86 @@
+"""Hide or stub lazy assets the PDF archive does not need.
+
+Video embeds, instructor avatars, carousels and recommendation sections
+load while the pipeline scrolls and add bytes and layout shifts without
+adding anything to the archive. Which classes a render skips is part of
+its PDF profile (`skip_assets` in `pdf_profiles.py`, or
+`$COURSERA_SKIP_ASSETS` for any profile); the selectors per
+class live in `filter_rules.json` (`lazy_asset_selectors`).
+
+`skip_assets()` runs right after navigation, before any scrolling:
+
+- video embeds are replaced by a one-line stub, so no player or poster
+  loads; a MutationObserver stubs the players the page mounts later;
+- every class, videos included, is hidden with `display: none`, so lazy
+  images never enter the viewport and are never fetched, and a player
+  mounted between two observer callbacks takes no space.
+
+Compare with `python benchmarks/bench_pdf.py`.
+"""
+import functools
+
+from filter_rules import load_rules
+
+STUBBED = ("video",)
+
+_SKIP_JS = """
+([css, stubSel]) => {
+    let style = document.getElementById('__cert-asset-css');
+    if (!style) {
+        style = document.createElement('style');
+        style.id = '__cert-asset-css';
+        (document.head || document.documentElement).appendChild(style);
+    }
+    style.textContent = css;
+    window.__certAssetStubSel = stubSel;
+    const stubAll = root => {
+        const sel = window.__certAssetStubSel;
+        if (!sel) return 0;
+        let stubbed = 0;
+        const found = (root.matches && root.matches(sel) ? [root] : []).concat(Array.from(root.querySelectorAll(sel)));
+        found.forEach(el => {
+            if (!el.isConnected) return;
+            const stub = document.createElement('div');
+            stub.className = 'cert-asset-stub';
+            stub.textContent = '▶ ' + (el.getAttribute('title') || el.getAttribute('aria-label') || 'Video');
+            el.replaceWith(stub);
+            stubbed++;
+        });
+        return stubbed;
+    };
+    if (stubSel && !window.__certAssetObserver) {
+        // Players mounted after this call (lazy sections, SPA updates).
+        window.__certAssetObserver = new MutationObserver(records => records.forEach(r =>
+            r.addedNodes.forEach(node => { if (node.nodeType === 1 && node.isConnected) stubAll(node); })));
+        window.__certAssetObserver.observe(document.documentElement, {childList: true, subtree: true});
+    }
+    return stubAll(document);
+}
+"""
+
+
+def asset_classes() -> tuple:
+    """Names of the asset classes that can be skipped."""
+    return tuple(load_rules()["lazy_asset_selectors"])
+
+
+@functools.lru_cache(maxsize=None)
+def _selectors(kinds) -> tuple:
+    """`(css hiding every class, selector of the stubbed ones)` for a tuple of classes."""
+    rules = load_rules()["lazy_asset_selectors"]
+    unknown = [k for k in kinds if k not in rules]
+    if unknown:
+        raise ValueError(f"Unknown asset class(es): {', '.join(unknown)}. Choose from: {', '.join(rules)}.")
+    hidden = [s for k in kinds for s in rules[k]]
+    stubbed = [s for k in kinds if k in STUBBED for s in rules[k]]
+    css = ",\n".join(hidden) + " {\n  display: none !important;\n}\n" if hidden else ""
+    return css, ", ".join(stubbed)
+
+
+def skip_assets(page, kinds) -> int:
+    """Hide/stub the asset classes `kinds` on the loaded page; returns the number of stubs."""
+    kinds = tuple(kinds or ())
+    if not kinds:
+        return 0
+    css, stub_selector = _selectors(kinds)
+    return page.evaluate(_SKIP_JS, [css, stub_selector])
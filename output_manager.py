@@ -0,0 +1,303 @@
+"""Output naming, layout, collision handling and the manifest.
+
+Filenames are still `<name>_<url slug>.pdf`, but every name is reserved
+through one `OutputManager` per output folder, so parallel workers never
+race on the same path. When two different courses sanitize to the same
+path, the course that already owns it (per the manifest) keeps it and the
+other gets a short hash of its canonical URL appended, so a course always
+gets the same suffix.
+
+Large catalogues can be sharded into sub-folders (`LAYOUTS`):
+
+- `flat`: everything in the output folder (the original behaviour);
+- `partner`: one folder per partner/university;
+- `hash`: 256 folders named after the first byte of the URL hash;
+- `date`: one folder per render date (`YYYY-MM-DD`).
+
+Every written file is recorded in `manifest.jsonl` with its relative path,
+kind (`pdf`, `png`, `mhtml`, `html`), size, SHA-256, source URL and render
+time. The manifest doubles as the index behind `has_output()`, so neither
+we nor downstream tools need to walk the folder tree.
+
+A shard of a sharded run (`shard="shard-0-of-4"`, see `sharding.py`)
+appends to its own `manifest.shard-0-of-4.jsonl` instead and treats files
+it finds on disk but not in its manifest as taken by another shard.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from course_urls import canonical_url, url_slug
+from pdf_writer import finish_artifact
+
+MANIFEST_NAME = "manifest.jsonl"
+LAYOUTS = ("flat", "partner", "hash", "date")
+MAX_FILENAME = 200
+
+_UNSAFE_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+
+def sanitize(name) -> str:
+    """Replace characters that are invalid in Windows/Linux filenames with `_`."""
+    return _UNSAFE_CHARS.sub("_", str(name).strip())
+
+
+def build_filename(base_url, title=None, custom_name=None, ext=".pdf") -> str:
+    """`<custom name or page title>_<url slug><ext>`, sanitized and capped at 200 characters."""
+    stem = sanitize(f"{custom_name or title or 'Coursera_Course'}_{url_slug(base_url)}")
+    return stem[: MAX_FILENAME - len(ext)] + ext
+
+
+def _url_hash(key) -> str:
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def shard_dir(layout, key, partner=None) -> str:
+    """Sub-folder (relative, may be empty) for a canonical URL under `layout`."""
+    if layout == "flat":
+        return ""
+    if layout == "hash":
+        return _url_hash(key)[:2]
+    if layout == "date":
+        return time.strftime("%Y-%m-%d")
+    if layout == "partner":
+        return sanitize(partner or "").strip(". ")[:80] or "unknown-partner"
+    raise ValueError(f"Unknown output layout '{layout}'. Choose one of: {', '.join(LAYOUTS)}.")
+
+
+def _kind(path) -> str:
+    """Artifact kind from a file name: `x.pdf.gz` -> `pdf`."""
+    name = path[:-3] if path.endswith(".gz") else path
+    return os.path.splitext(name)[1].lstrip(".").lower() or "pdf"
+
+
+def _reserved_name(rel_path) -> str:
+    """Relative path as reserved, i.e. without the `.gz` the writer may add."""
+    rel_path = rel_path.replace(os.sep, "/")
+    return rel_path[:-3] if rel_path.endswith(".gz") else rel_path
+
+
+def _replay(path, entries) -> int:
+    """Replay one manifest file into `entries` (`{(url, kind): entry}`); returns its line count."""
+    if not os.path.exists(path):
+        return 0
+    lines = 0
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            lines += 1
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            key = (entry["url"], entry.get("kind") or _kind(entry.get("path") or ""))
+            entries.pop(key, None)
+            if entry.get("path"):
+                entry["kind"] = key[1]
+                entries[key] = entry
+    return lines
+
+
+def read_manifest(output_dir) -> dict:
+    """`{(canonical URL, kind): entry}` from a folder's manifest, read-only.
+
+    Unlike `OutputManager` it creates nothing and never compacts, so it is
+    safe next to a running batch (the planner uses it).
+    """
+    entries = {}
+    _replay(os.path.join(output_dir, MANIFEST_NAME), entries)
+    return entries
+
+
+class OutputManager:
+    """Reserve, write and look up outputs in one folder. Thread-safe."""
+
+    def __init__(self, output_dir, *, layout="flat", writer=None, shard=None):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown output layout '{layout}'. Choose one of: {', '.join(LAYOUTS)}.")
+        self.output_dir = output_dir
+        self.layout = layout
+        self.writer = writer
+        self.shard = shard
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self._append_path = (
+            os.path.join(output_dir, f"manifest.{shard}.jsonl") if shard else self.manifest_path
+        )
+        self._lock = threading.Lock()
+        self._entries = {}     # (canonical URL, kind) -> manifest entry (relative path)
+        self._owners = {}      # relative path -> canonical URL (written or reserved)
+        self._pending = {}     # reserved relative path -> ((canonical URL, kind), metadata)
+        os.makedirs(output_dir, exist_ok=True)
+        self._load()
+
+    # -- manifest -------------------------------------------------------
+
+    def _load(self):
+        lines = self._read(self.manifest_path)
+        if self.shard:
+            # Leftovers of an interrupted run of this shard; compaction is left to the merge.
+            self._read(self._append_path)
+        elif lines > 2 * len(self._entries) + 100:
+            self._compact()
+
+    def _read(self, path) -> int:
+        """Replay one manifest file into the index; returns its line count."""
+        lines = _replay(path, self._entries)
+        self._owners = {_reserved_name(e["path"]): key[0] for key, e in self._entries.items()}
+        return lines
+
+    def _compact(self):
+        """Rewrite the manifest with one line per course and kind."""
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            for entry in self._entries.values():
+                fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.manifest_path)
+
+    def _append(self, entry):
+        with open(self._append_path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def entries(self):
+        """Snapshot of the manifest entries, one per course and kind."""
+        with self._lock:
+            return list(self._entries.values())
+
+    # -- lookups --------------------------------------------------------
+
+    def has_output(self, url, kind="pdf") -> bool:
+        """True if a file of `kind` for this course was written (by this or an earlier run)."""
+        return (canonical_url(url), kind) in self._entries
+
+    def path_for(self, url, kind="pdf"):
+        """Path of the existing `kind` output for this course, or None."""
+        entry = self._entries.get((canonical_url(url), kind))
+        return os.path.join(self.output_dir, entry["path"]) if entry else None
+
+    # -- writing --------------------------------------------------------
+
+    def reserve(self, base_url, title=None, custom_name=None, ext=".pdf", partner=None) -> str:
+        """Pick the output path for a course and hold it until it is written.
+
+        `partner` is only used by the `partner` layout. A path owned by a
+        different course gets an 8-character hash suffix.
+        """
+        key = canonical_url(base_url)
+        folder = shard_dir(self.layout, key, partner)
+        filename = build_filename(base_url, title, custom_name, ext)
+        with self._lock:
+            rel = self._claim(key, folder, filename, ext)
+            self._pending[rel] = ((key, ext.lstrip(".").lower()), {})
+        return os.path.join(self.output_dir, rel)
+
+    def _claim(self, key, folder, filename, ext) -> str:
+        """Relative path for `key` in `folder`, hash-suffixed if another course owns it. Hold the lock."""
+        rel = f"{folder}/{filename}" if folder else filename
+        owner = self._owners.get(rel)
+        if owner is None and self.shard and os.path.exists(os.path.join(self.output_dir, rel)):
+            owner = ""   # written by another shard
+        if owner is not None and owner != key:
+            suffix = "-" + _url_hash(key)[:8]
+            stem = filename[: -len(ext)][: MAX_FILENAME - len(ext) - len(suffix)]
+            rel = f"{folder}/{stem}{suffix}{ext}" if folder else f"{stem}{suffix}{ext}"
+        self._owners[rel] = key
+        return rel
+
+    def rename(self, url, custom_name):
+        """Move every output of a course to the name built from `custom_name`.
+
+        Files stay in their folder. Returns `[(old_path, new_path)]` for the
+        files that moved; outputs whose file is missing are dropped from the
+        manifest so the course gets rendered again.
+        """
+        key = canonical_url(url)
+        moved = []
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == key]:
+                entry = self._entries[entry_key]
+                old_rel = entry["path"]
+                reserved = _reserved_name(old_rel)
+                folder, ext = os.path.dirname(reserved), os.path.splitext(reserved)[1]
+                new_rel = self._claim(key, folder, build_filename(url, custom_name=custom_name, ext=ext), ext)
+                if new_rel == reserved:
+                    continue
+                new_rel += old_rel[len(reserved):]   # keep `.gz`
+                old_path = os.path.join(self.output_dir, old_rel)
+                new_path = os.path.join(self.output_dir, new_rel)
+                self._owners.pop(reserved, None)
+                try:
+                    os.replace(old_path, new_path)
+                except FileNotFoundError:
+                    self._owners.pop(_reserved_name(new_rel), None)
+                    del self._entries[entry_key]
+                    self._append({"url": key, "kind": entry_key[1], "path": None})
+                    continue
+                entry = {**entry, "path": new_rel, "renamed_at": round(time.time(), 3)}
+                self._entries[entry_key] = entry
+                self._append(entry)
+                moved.append((old_path, new_path))
+        return moved
+
+    def remove(self, url):
+        """Delete every output file of a course and drop it from the manifest."""
+        key = canonical_url(url)
+        removed = []
+        for entry in self.entries():
+            if entry["url"] == key:
+                path = os.path.join(self.output_dir, entry["path"])
+                try:
+                    os.remove(path)
+                    removed.append(path)
+                except FileNotFoundError:
+                    pass
+        self.forget(key)
+        return removed
+
+    def store(self, path, data: bytes, **meta) -> str:
+        """Write a reserved path, in the background if a writer is attached.
+
+        `meta` (e.g. `render_s`) is copied into the manifest entry. Returns
+        the final path (`.gz` appended when the writer compresses).
+        """
+        rel = _reserved_name(os.path.relpath(path, self.output_dir))
+        with self._lock:
+            if rel in self._pending:
+                self._pending[rel] = (self._pending[rel][0], meta)
+        if self.writer is not None:
+            return self.writer.submit(path, data)
+        result = finish_artifact(path, data)
+        self.commit(result)
+        return result["path"]
+
+    def commit(self, result):
+        """Record a finished write (a `finish_artifact` result) in the manifest."""
+        rel = os.path.relpath(result["path"], self.output_dir).replace(os.sep, "/")
+        with self._lock:
+            key, meta = self._pending.pop(_reserved_name(rel), (None, None))
+            if key is None:
+                return
+            old = self._entries.get(key)
+            if old and _reserved_name(old["path"]) != _reserved_name(rel):
+                self._owners.pop(_reserved_name(old["path"]), None)
+            entry = {
+                "url": key[0],
+                "kind": key[1],
+                "path": rel,
+                "bytes": result["bytes"],
+                "sha256": result["sha256"],
+                **meta,
+                "written_at": round(time.time(), 3),
+            }
+            self._entries[key] = entry
+            self._append(entry)
+
+    def forget(self, url, kind=None):
+        """Drop a course's outputs (or only `kind`) from the manifest; files are left alone."""
+        url = canonical_url(url)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == url and kind in (None, k[1])]:
+                entry = self._entries.pop(key)
+                self._owners.pop(_reserved_name(entry["path"]), None)
+                self._append({"url": url, "kind": key[1], "path": None})
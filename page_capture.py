@@ -0,0 +1,78 @@
+"""Serialize one prepared page into several output formats.
+
+The page is navigated and prepared once; every extra format then costs
+only its own serialization. Screen formats (PNG, MHTML, HTML) are taken
+first, then print media is switched on for the PDF, so the screenshot
+looks like the page and the PDF like before.
+"""
+import time
+
+from pdf_profiles import pdf_options
+from run_log import log
+
+FORMATS = ("pdf", "png", "mhtml", "html")
+EXTENSIONS = {"pdf": ".pdf", "png": ".png", "mhtml": ".mhtml", "html": ".html"}
+
+
+def parse_formats(value) -> tuple:
+    """`"pdf,png"` -> `("pdf", "png")`, de-duplicated. Raises ValueError on unknown formats."""
+    formats = []
+    for name in str(value).replace(" ", "").lower().split(","):
+        if not name or name in formats:
+            continue
+        if name not in FORMATS:
+            raise ValueError(f"Unknown output format '{name}'. Choose from: {', '.join(FORMATS)}.")
+        formats.append(name)
+    if not formats:
+        raise ValueError("At least one output format is required.")
+    return tuple(formats)
+
+
+def _mhtml(page) -> bytes:
+    """Single-file MHTML archive via the DevTools protocol (Chromium only)."""
+    session = page.context.new_cdp_session(page)
+    try:
+        return session.send("Page.captureSnapshot", {"format": "mhtml"})["data"].encode("utf-8")
+    finally:
+        session.detach()
+
+
+def serialize(page, kind, pdf_profile=None) -> bytes:
+    """Bytes of the page in one format. The PDF uses whatever media is active."""
+    if kind == "pdf":
+        return page.pdf(**pdf_options(pdf_profile, page))
+    if kind == "png":
+        return page.screenshot(full_page=True, type="png")
+    if kind == "mhtml":
+        return _mhtml(page)
+    if kind == "html":
+        return page.content().encode("utf-8")
+    raise ValueError(f"Unknown output format '{kind}'")
+
+
+def capture(page, formats=("pdf",), pdf_profile=None, before_pdf=None):
+    """Serialize the page in every requested format, screen formats first.
+
+    When screen formats were taken first, `before_pdf()` runs after print
+    media is switched on, to re-apply layout fixes and let the print
+    layout settle before the PDF.
+
+    Returns a list of `(kind, data, seconds)`; `data` is None (and the
+    error logged) for a format that failed, so one bad artifact does not
+    cost the others.
+    """
+    ordered = [k for k in formats if k != "pdf"] + [k for k in formats if k == "pdf"]
+    results = []
+    for kind in ordered:
+        started = time.perf_counter()
+        try:
+            if kind == "pdf":
+                page.emulate_media(media="print")
+                if before_pdf and results:
+                    before_pdf()
+            data = serialize(page, kind, pdf_profile)
+        except Exception as e:
+            log.error(f"  ❌ {kind.upper()} capture failed: {str(e)[:80]}")
+            data = None
+        results.append((kind, data, time.perf_counter() - started))
+    return results
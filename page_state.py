@@ -0,0 +1,174 @@
+"""Consent and popup flags set before the first navigation.
+
+A fresh browser profile gets Coursera's cookie banner and the
+"Recommended experience" dialog on every URL, and the pipeline used to
+spend 8+ seconds per row clicking them away. The flags that keep them
+closed live in `page_state.json`, in Playwright's `storage_state` format
+(cookies plus localStorage per origin) with an optional `sessionStorage`
+list per origin. Every new context starts with that state, so the dialogs
+never open.
+
+When the site changes its flags the dialogs come back; `check_popups()`
+runs after every page load and the pipeline warns and runs a one-off
+clean-up whenever it finds one. To refresh the file:
+
+    python page_state.py capture                 # headed browser: dismiss the dialogs, press Enter
+    python page_state.py check https://www.coursera.org/learn/python
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+from filter_rules import popup_check_js
+
+PAGE_STATE_PATH = Path(__file__).with_name("page_state.json")
+
+_stale_lock = threading.Lock()
+_stale_rows = 0
+
+
+def resolve_state_path(path=None):
+    """State file to use: argument, `$COURSERA_PAGE_STATE`, then `page_state.json`.
+
+    Returns None for `none`, or when the default file does not exist.
+    """
+    path = path or os.environ.get("COURSERA_PAGE_STATE")
+    if path and path.lower() == "none":
+        return None
+    if path:
+        if not os.path.exists(path):
+            raise ValueError(f"Page state file not found: {path}")
+        return str(path)
+    return str(PAGE_STATE_PATH) if PAGE_STATE_PATH.exists() else None
+
+
+def load_state(path) -> dict:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def context_options(state) -> dict:
+    """`new_context()` keyword arguments: the cookies and localStorage part of `state`."""
+    if not state:
+        return {}
+    return {
+        "storage_state": {
+            "cookies": state.get("cookies", []),
+            "origins": [
+                {"origin": o["origin"], "localStorage": o.get("localStorage", [])}
+                for o in state.get("origins", [])
+            ],
+        }
+    }
+
+
+def init_script(state):
+    """JS for `add_init_script()` that sets the sessionStorage flags, or None if there are none.
+
+    Runs before any page script, so the site reads the flags on its first render.
+    """
+    flags = {
+        o["origin"]: {item["name"]: item["value"] for item in o["sessionStorage"]}
+        for o in (state or {}).get("origins", [])
+        if o.get("sessionStorage")
+    }
+    if not flags:
+        return None
+    return (
+        "(() => { const flags = " + json.dumps(flags) + "[location.origin];\n"
+        "  if (!flags) return;\n"
+        "  try { for (const [k, v] of Object.entries(flags)) sessionStorage.setItem(k, v); } catch (e) {}\n"
+        "})();"
+    )
+
+
+def prepare_context(context, state):
+    """Add the sessionStorage flags of `state` to a context made with `context_options(state)`."""
+    script = init_script(state)
+    if script:
+        context.add_init_script(script)
+
+
+def check_popups(page):
+    """`{"consent": [...], "dialogs": [...]}`: short descriptions of what is on screen.
+
+    `consent` lists cookie banners and dialogs with a known text that the
+    saved flags should have kept away, also those the popup observer has
+    already removed; `dialogs` any other visible dialog (promos). None if the page could not be checked: that is not a pass.
+    """
+    try:
+        return page.evaluate(popup_check_js())
+    except Exception:
+        return None
+
+
+def record_stale():
+    global _stale_rows
+    with _stale_lock:
+        _stale_rows += 1
+
+
+def stale_rows() -> int:
+    """Rows in this process that showed popups although the state was loaded."""
+    return _stale_rows
+
+
+def main(argv=None):
+    from playwright.sync_api import sync_playwright
+
+    from launch_config import launch_options
+
+    parser = argparse.ArgumentParser(description="Capture or check the saved consent/popup state.")
+    parser.add_argument("command", choices=["capture", "check"])
+    parser.add_argument("url", nargs="?", default="https://www.coursera.org/learn/python")
+    parser.add_argument("--state", default=str(PAGE_STATE_PATH), help="state file (default: page_state.json)")
+    args = parser.parse_args(argv)
+
+    options = launch_options()
+    with sync_playwright() as p:
+        if args.command == "capture":
+            browser = p.chromium.launch(**{**options, "headless": False})
+            context = browser.new_context(viewport={"width": 1920, "height": 1080})
+            page = context.new_page()
+            page.goto(args.url, wait_until="domcontentloaded")
+            input("👉 Accept the cookie banner and close every dialog, then press Enter here... ")
+            state = context.storage_state()
+            # storage_state() leaves out sessionStorage; keep it for init_script().
+            session = page.evaluate("() => Object.entries(sessionStorage).map(([name, value]) => ({name, value}))")
+            if session:
+                origin = page.evaluate("location.origin")
+                entry = next((o for o in state["origins"] if o["origin"] == origin), None)
+                if entry is None:
+                    entry = {"origin": origin, "localStorage": []}
+                    state["origins"].append(entry)
+                entry["sessionStorage"] = session
+            Path(args.state).write_text(json.dumps(state, indent=2), encoding="utf-8")
+            print(f"💾 Saved page state to {args.state}")
+            browser.close()
+            return
+
+        state = load_state(args.state)
+        browser = p.chromium.launch(**options)
+        context = browser.new_context(viewport={"width": 1920, "height": 1080}, **context_options(state))
+        prepare_context(context, state)
+        page = context.new_page()
+        page.goto(args.url, wait_until="domcontentloaded")
+        page.wait_for_timeout(3000)
+        popups = check_popups(page)
+        browser.close()
+    if popups is None:
+        print(f"❓ Could not check {args.url} for popups; try again.")
+        sys.exit(1)
+    found = popups["consent"]
+    if found:
+        print(f"❌ Popups despite {args.state}: {', '.join(found)}")
+        print("   The site changed its flags; run 'python page_state.py capture' again.")
+        sys.exit(1)
+    print(f"✅ No popups with {args.state}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Named `page.pdf()` layouts.
+
+Paper size, backgrounds and scale change render time and file size a lot,
+so they are picked by name per run (`--pdf-profile` or
+`COURSERA_PDF_PROFILE`) or per row (a `pdf_profile` column in the sheet).
+A profile can also skip lazy assets the archive does not need (its
+`skip_assets` entry, see `lazy_assets.py`); `COURSERA_SKIP_ASSETS`
+overrides that for any layout. Compare them with
+`python benchmarks/bench_pdf.py`.
+"""
+import os
+import re
+
+from filter_rules import load_rules
+
+_MARGINS = {"top": "0.4in", "bottom": "0.4in", "left": "0.5in", "right": "0.5in"}
+_HEAVY_ASSETS = ("video", "avatars", "carousels", "recommendations")
+
+PDF_PROFILES = {
+    # The original layout.
+    "a4": {
+        "format": "A4",
+        "print_background": True,
+        "prefer_css_page_size": False,
+        "margin": _MARGINS,
+        "scale": 0.90,
+    },
+    # Same pages without background colours/images or lazy media: smaller, faster.
+    "a4-plain": {
+        "format": "A4",
+        "print_background": False,
+        "prefer_css_page_size": False,
+        "margin": _MARGINS,
+        "scale": 0.90,
+        "skip_assets": _HEAVY_ASSETS,
+    },
+    "letter": {
+        "format": "Letter",
+        "print_background": True,
+        "prefer_css_page_size": False,
+        "margin": _MARGINS,
+        "scale": 0.90,
+    },
+    # One tall page as wide as the layout viewport; no page breaks.
+    "long": {
+        "width": "1200px",
+        "print_background": True,
+        "prefer_css_page_size": False,
+        "margin": {"top": "0", "bottom": "0", "left": "0", "right": "0"},
+        "scale": 1.0,
+    },
+}
+
+# `skip_assets`: lazy asset classes a profile hides or stubs before
+# scrolling; profiles without it load everything, as before.
+PROFILE_ONLY_KEYS = ("skip_assets",)
+
+DEFAULT_PDF_PROFILE = "a4"
+PDF_PROFILE_ENV = "COURSERA_PDF_PROFILE"
+SKIP_ASSETS_ENV = "COURSERA_SKIP_ASSETS"
+PDF_PROFILE_COLUMN_NAMES = ["pdf_profile", "pdf profile", "pdf layout"]
+
+# Chromium cannot make a PDF page taller than 200 inches (19200 CSS px).
+MAX_PAGE_HEIGHT_PX = 19200
+
+
+def resolve_pdf_profile(profile=None) -> str:
+    """Profile name from the argument, `$COURSERA_PDF_PROFILE`, or the default."""
+    name = (profile or os.environ.get(PDF_PROFILE_ENV) or DEFAULT_PDF_PROFILE).strip().lower()
+    if name not in PDF_PROFILES:
+        raise ValueError(f"Unknown PDF profile '{name}'. Choose one of: {', '.join(sorted(PDF_PROFILES))}.")
+    return name
+
+
+def asset_skips(profile=None) -> tuple:
+    """Lazy asset classes to skip (see `lazy_assets.skip_assets`).
+
+    `$COURSERA_SKIP_ASSETS` (comma-separated classes, or `none`) applies to
+    every layout; otherwise the profile's `skip_assets` entry.
+    """
+    override = os.environ.get(SKIP_ASSETS_ENV)
+    if override is not None:
+        kinds = tuple(k for k in (p.strip().lower() for p in override.split(",")) if k and k != "none")
+        known = load_rules()["lazy_asset_selectors"]
+        unknown = [k for k in kinds if k not in known]
+        if unknown:
+            raise ValueError(f"Unknown asset class(es) in ${SKIP_ASSETS_ENV}: {', '.join(unknown)}. "
+                             f"Choose from: {', '.join(known)}.")
+        return kinds
+    return tuple(PDF_PROFILES[resolve_pdf_profile(profile)].get("skip_assets", ()))
+
+
+def pdf_options(profile=None, page=None) -> dict:
+    """Keyword arguments for `page.pdf()`.
+
+    The `long` profile measures the document height, so pass the page
+    after print media has been switched on.
+    """
+    options = {k: v for k, v in PDF_PROFILES[resolve_pdf_profile(profile)].items() if k not in PROFILE_ONLY_KEYS}
+    if "format" not in options:
+        height = page.evaluate("document.documentElement.scrollHeight") if page is not None else MAX_PAGE_HEIGHT_PX
+        options["height"] = f"{min(max(int(height), 1), MAX_PAGE_HEIGHT_PX)}px"
+    return options
+
+
+_PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+
+
+def pdf_page_count(data: bytes) -> int:
+    """Number of page objects in a PDF (good enough for Chromium output)."""
+    return len(_PAGE_OBJECT.findall(data))
@@ -0,0 +1,123 @@
+"""Background writer for rendered PDFs.
+
+`page.pdf()` without a path returns the bytes; the worker hands them to a
+`PdfWriter` and moves on to the next URL while a single background thread
+checksums, optionally gzips and atomically writes the file.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+
+from run_log import event, log
+
+_STOP = object()
+
+
+def write_atomic(path, data: bytes):
+    """Write `data` to a temp file next to `path`, then rename it into place.
+
+    Readers never see a half-written file, and a crash leaves at most a
+    stray `.tmp` file behind.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def finish_artifact(path, data: bytes, *, compress: bool = False) -> dict:
+    """Checksum, optionally gzip, and atomically write one file.
+
+    Returns `{"path", "bytes", "sha256", "write_s"}`; `sha256` is of the
+    uncompressed data, `bytes` is what landed on disk.
+    """
+    started = time.perf_counter()
+    digest = hashlib.sha256(data).hexdigest()
+    if compress:
+        data = gzip.compress(data, compresslevel=6)
+        path = path + ".gz"
+    write_atomic(path, data)
+    return {"path": path, "bytes": len(data), "sha256": digest, "write_s": time.perf_counter() - started}
+
+
+class PdfWriter:
+    """One background thread draining a bounded queue of `(path, data)` writes.
+
+    Use as a context manager; leaving the block waits for pending writes.
+    `max_pending` bounds memory: `submit` blocks while that many documents
+    are still waiting to be written.
+    """
+
+    def __init__(self, *, compress: bool = False, max_pending: int = 8, on_done=None):
+        self.compress = compress
+        self.on_done = on_done
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="pdf-writer", daemon=True)
+        self.stats = {
+            "written": 0,
+            "errors": 0,
+            "bytes": 0,
+            "write_s": 0.0,
+            "submit_wait_s": 0.0,
+            "max_queue_depth": 0,
+        }
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, path, data: bytes) -> str:
+        """Queue `data` for `path`; returns the path the file will end up at."""
+        started = time.perf_counter()
+        self._queue.put((path, data))
+        with self._lock:
+            self.stats["submit_wait_s"] += time.perf_counter() - started
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self._queue.qsize())
+        return path + ".gz" if self.compress else path
+
+    def close(self):
+        """Wait for every queued write to finish and stop the thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            path, data = item
+            try:
+                result = finish_artifact(path, data, compress=self.compress)
+            except Exception as e:
+                with self._lock:
+                    self.stats["errors"] += 1
+                event(logging.ERROR, f"  ❌ Background write failed for {path}: {e}", event="write_failed", path=path)
+                continue
+            with self._lock:
+                self.stats["written"] += 1
+                self.stats["bytes"] += result["bytes"]
+                self.stats["write_s"] += result["write_s"]
+            if self.on_done:
+                try:
+                    self.on_done(result)
+                except Exception as e:
+                    log.warning(f"  ⚠️ Write callback failed for {path}: {e}")
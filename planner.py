@@ -0,0 +1,126 @@
+"""Dry-run planner: what a batch run would do and roughly what it would cost.
+
+Reads the sheet, dedupes URLs, checks the output folder for rows that are
+already done and estimates wall time and peak memory from the run ledger.
+Never starts a browser.
+"""
+import os
+
+from course_sheet import dedupe_jobs, read_jobs
+from course_urls import canonical_url, url_slug
+from output_manager import MANIFEST_NAME, read_manifest
+from run_ledger import ledger_path, load_timings, read_records
+from run_log import ROW, configure as configure_logging, log
+from scheduler import balance
+
+# Browser + driver RSS per worker when the ledger has no memory readings yet.
+DEFAULT_WORKER_MB = 900.0
+# The Python process itself (Playwright client, queues, bookkeeping).
+PYTHON_OVERHEAD_MB = 120.0
+
+
+def _completed(output_dir, ledger_records):
+    """Predicate telling whether a job already has an output in `output_dir`.
+
+    Uses the manifest when the folder has one (no directory listing), read
+    only, so planning never rewrites it under a running batch.
+    Folders written before the manifest existed fall back to one listing
+    plus the ledger: filenames end in `_<url slug>.pdf`.
+    """
+    if os.path.exists(os.path.join(output_dir, MANIFEST_NAME)):
+        done = {url for url, kind in read_manifest(output_dir) if kind == "pdf"}
+        return lambda url: canonical_url(url) in done
+
+    try:
+        files = {
+            name[:-3] if name.endswith(".gz") else name
+            for name in os.listdir(output_dir)
+            if name.lower().endswith((".pdf", ".pdf.gz"))
+        }
+    except OSError:
+        return lambda url: False
+
+    done_urls = set()
+    for record in ledger_records:
+        pdf = record.get("pdf")
+        if record.get("status") == "ok" and pdf and os.path.basename(pdf).removesuffix(".gz") in files:
+            done_urls.add(canonical_url(record["url"]))
+    done_slugs = {name[:-4].rsplit("_", 1)[-1] for name in files}
+    return lambda url: canonical_url(url) in done_urls or url_slug(url) in done_slugs
+
+
+def build_plan(excel_path, output_dir, workers=1):
+    """Collect everything `print_plan` shows, as a dict."""
+    jobs, total_rows, _, _ = read_jobs(excel_path)
+    unique, duplicates = dedupe_jobs(jobs)
+
+    ledger = ledger_path(output_dir)
+    records = list(read_records(ledger))
+    history = load_timings(ledger)
+    is_done = _completed(output_dir, records)
+
+    todo, done, with_history = [], [], 0
+    for job in unique:
+        if is_done(job[1]):
+            done.append(job)
+        else:
+            todo.append(job)
+            with_history += canonical_url(job[1]) in history
+
+    workers = max(1, min(int(workers), len(todo) or 1))
+    _, totals = balance(todo, workers, history)
+    rss_readings = [r["rss_mb"] for r in records if r.get("rss_mb")]
+    worker_mb = max(rss_readings) if rss_readings else DEFAULT_WORKER_MB
+
+    return {
+        "sheet_rows": total_rows,
+        "empty_rows": total_rows - len(jobs),
+        "duplicates": len(duplicates),
+        "done": len(done),
+        "todo": todo,
+        "with_history": with_history,
+        "workers": workers,
+        "serial_seconds": sum(totals),
+        "wall_seconds": max(totals, default=0.0),
+        "worker_mb": worker_mb,
+        "worker_mb_measured": bool(rss_readings),
+        "peak_mb": worker_mb * workers + PYTHON_OVERHEAD_MB,
+    }
+
+
+def _duration(seconds) -> str:
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours}h {rest // 60:02d}m" if hours else f"{rest // 60}m {rest % 60:02d}s"
+
+
+def print_plan(plan):
+    """Human-readable plan summary, through the run log."""
+    log.log(ROW, "🗺️  PLAN (dry run, no browser)", extra={"banner": True})
+    log.log(ROW, f"  🧮 Sheet rows:        {plan['sheet_rows']}")
+    log.log(ROW, f"  ⊘  Empty URL rows:    {plan['empty_rows']}")
+    log.log(ROW, f"  ♊ Duplicate URLs:    {plan['duplicates']}")
+    log.log(ROW, f"  ✅ Already done:      {plan['done']}")
+    log.log(ROW, f"  ▶️  To render:         {len(plan['todo'])} ({plan['with_history']} with timing history)")
+    log.log(ROW, f"  👷 Workers:           {plan['workers']}")
+    log.log(ROW, f"  ⏱️  Estimated wall:    {_duration(plan['wall_seconds'])} "
+                 f"(serial {_duration(plan['serial_seconds'])})")
+    source = "measured" if plan["worker_mb_measured"] else "default estimate"
+    log.log(ROW, f"  📈 Estimated peak:    {plan['peak_mb']:.0f} MB "
+                 f"({plan['worker_mb']:.0f} MB per worker, {source})")
+
+
+def main(argv=None):
+    """Standalone entry point; skips the Playwright import of coursera_pipeline."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Dry-run plan for a batch render.")
+    parser.add_argument("--excel", default="courses.xlsx")
+    parser.add_argument("--output-dir", default="pdfs")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+    configure_logging()
+    print_plan(build_plan(args.excel, args.output_dir, workers=args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Event-driven popup handling: dismiss overlays when they appear, and count them.
+
+The pipeline used to poll for popups: press Escape, click close buttons
+and sweep the DOM a few times after every scroll and click, whether
+anything had opened or not. Now the MutationObserver registered by
+`filter_rules.add_init_rules(context, observe=True)` reacts to the page
+instead: it looks at the elements the page adds and dismisses promos,
+dialogs (the "Recommended experience" one included), ads, fixed overlays
+and cookie banners among them, and reports each one back through the
+`__certPopup` binding.
+
+`PopupCounter` receives those reports and counts what was dismissed per page.
+"""
+import threading
+from collections import Counter
+
+from run_log import log
+
+BINDING = "__certPopup"
+
+
+class PopupCounter:
+    """Counts the popups dismissed on each page of the contexts it is attached to."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}   # page -> Counter of kinds
+
+    def attach(self, context):
+        """Receive the observer's reports from every page of `context`."""
+        context.expose_binding(BINDING, self._on_popup)
+
+    def _on_popup(self, source, kind, label):
+        page = source.get("page")
+        with self._lock:
+            self._counts.setdefault(page, Counter())[kind] += 1
+        log.debug(f"    🧹 Dismissed {kind}: {label}")
+
+    def take(self, page) -> dict:
+        """`{kind: count}` dismissed on `page` since the last call."""
+        with self._lock:
+            return dict(self._counts.pop(page, {}))
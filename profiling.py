@@ -0,0 +1,202 @@
+"""Opt-in profiling for batch runs: Playwright traces and CDP metrics per step.
+
+Nothing is recorded unless asked for:
+
+- `trace_sample=N` keeps a trace of every Nth row (the first row, then N+1, ...);
+- `trace_on_failure` records every row and keeps the trace of rows that fail;
+- `trace_budget_s` records every row and keeps the trace of rows slower than that;
+- `metrics` reads Chromium's performance counters (`Performance.getMetrics`)
+  around every pipeline step and adds them to the step's log event.
+
+Traces go to `<output dir>/traces/row-<row>-<reason>.zip` and open with
+`playwright show-trace`. Recording a trace costs far more than the
+metrics, so the failure/budget modes are for hunting specific rows.
+"""
+import contextlib
+import contextvars
+import os
+import threading
+import time
+
+from run_log import add_step_hook, log
+
+TRACES_DIR = "traces"
+
+# CDP counters that accumulate over the page's life; a step reports the increase.
+_COUNTERS = {
+    "LayoutCount": "layouts",
+    "RecalcStyleCount": "style_recalcs",
+    "ScriptDuration": "script_s",
+    "LayoutDuration": "layout_s",
+    "RecalcStyleDuration": "style_s",
+    "TaskDuration": "task_s",
+}
+# Levels at the end of the step.
+_GAUGES = {
+    "JSHeapUsedSize": "heap_mb",
+    "Nodes": "dom_nodes",
+}
+
+_active = contextvars.ContextVar("profile_row", default=None)
+
+
+def metric_deltas(before, after) -> dict:
+    """Step fields from two `{name: value}` CDP metric readings."""
+    fields = {}
+    for name, key in _COUNTERS.items():
+        if name in before and name in after:
+            fields[key] = round(after[name] - before[name], 3)
+    for name, key in _GAUGES.items():
+        if name in after:
+            value = after[name] / (1024 * 1024) if key == "heap_mb" else after[name]
+            fields[key] = round(value, 1)
+    return fields
+
+
+def trace_reason(*, sampled, ok, seconds, on_failure=False, budget_s=None):
+    """Why a recorded trace is worth keeping (`failed`, `slow`, `sampled`), or None."""
+    if on_failure and not ok:
+        return "failed"
+    if budget_s and seconds > budget_s:
+        return "slow"
+    if sampled:
+        return "sampled"
+    return None
+
+
+class Profiler:
+    """Shared by all workers; `row()` wraps one row on one worker's page."""
+
+    def __init__(self, output_dir, *, trace_sample=0, trace_on_failure=False, trace_budget_s=None, metrics=False):
+        self.trace_dir = os.path.join(output_dir, TRACES_DIR)
+        self.trace_sample = trace_sample
+        self.trace_on_failure = trace_on_failure
+        self.trace_budget_s = trace_budget_s
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._rows = 0
+        self.traces = []   # (row, reason, path)
+        self._steps = {}   # step -> {"count", "duration_s", "script_s", "layouts", "peak_heap_mb"}
+        if metrics:
+            add_step_hook(_step_hook)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.trace_sample or self.trace_on_failure or self.trace_budget_s or self.metrics)
+
+    def _sampled(self) -> bool:
+        with self._lock:
+            self._rows += 1
+            return bool(self.trace_sample) and (self._rows - 1) % self.trace_sample == 0
+
+    @contextlib.contextmanager
+    def row(self, context, page, row_no):
+        """Profile one row; set `result["ok"]` inside the block.
+
+        The trace is recorded only when the row might need it and written
+        only when `trace_reason()` says so.
+        """
+        result = {"ok": False}
+        sampled = self._sampled()
+        tracing = sampled or self.trace_on_failure or self.trace_budget_s
+        if tracing:
+            try:
+                context.tracing.start(screenshots=True, snapshots=True)
+            except Exception as e:
+                log.warning(f"  ⚠️  Could not start tracing: {e}")
+                tracing = False
+        state = {"profiler": self, "cdp": self._cdp(context, page)}
+        token = _active.set(state)
+        started = time.perf_counter()
+        try:
+            yield result
+        finally:
+            _active.reset(token)
+            seconds = time.perf_counter() - started
+            if state["cdp"] is not None:
+                with contextlib.suppress(Exception):
+                    state["cdp"].detach()
+            if tracing:
+                self._stop_trace(context, row_no, sampled, result["ok"], seconds)
+
+    def _cdp(self, context, page):
+        if not self.metrics:
+            return None
+        try:
+            session = context.new_cdp_session(page)
+            session.send("Performance.enable")
+            return session
+        except Exception as e:
+            log.warning(f"  ⚠️  Performance metrics unavailable (Chromium only): {e}")
+            return None
+
+    def _stop_trace(self, context, row_no, sampled, ok, seconds):
+        reason = trace_reason(sampled=sampled, ok=ok, seconds=seconds,
+                              on_failure=self.trace_on_failure, budget_s=self.trace_budget_s)
+        path = os.path.join(self.trace_dir, f"row-{row_no}-{reason}.zip") if reason else None
+        try:
+            if path:
+                os.makedirs(self.trace_dir, exist_ok=True)
+                context.tracing.stop(path=path)
+                log.info(f"  🔬 Trace kept ({reason}, {seconds:.1f}s): {path}")
+                with self._lock:
+                    self.traces.append((row_no, reason, path))
+            else:
+                context.tracing.stop()
+        except Exception as e:
+            log.warning(f"  ⚠️  Could not save trace for row {row_no}: {e}")
+
+    def record_step(self, name, fields):
+        with self._lock:
+            totals = self._steps.setdefault(
+                name, {"count": 0, "duration_s": 0.0, "script_s": 0.0, "layouts": 0, "peak_heap_mb": 0.0}
+            )
+            totals["count"] += 1
+            totals["duration_s"] += fields.get("duration_s", 0.0)
+            totals["script_s"] += fields.get("script_s", 0.0)
+            totals["layouts"] += fields.get("layouts", 0)
+            totals["peak_heap_mb"] = max(totals["peak_heap_mb"], fields.get("heap_mb", 0.0))
+
+    def summary(self) -> dict:
+        """Per-step means over every profiled row, plus the traces kept."""
+        with self._lock:
+            steps = {
+                name: {
+                    "rows": t["count"],
+                    "mean_s": round(t["duration_s"] / t["count"], 3),
+                    "mean_script_s": round(t["script_s"] / t["count"], 3),
+                    "mean_layouts": round(t["layouts"] / t["count"], 1),
+                    "peak_heap_mb": t["peak_heap_mb"],
+                }
+                for name, t in self._steps.items()
+            }
+            return {"steps": steps, "traces": list(self.traces)}
+
+
+def _read_metrics(session) -> dict:
+    reply = session.send("Performance.getMetrics")
+    return {m["name"]: m["value"] for m in reply.get("metrics", [])}
+
+
+@contextlib.contextmanager
+def _step_hook(name, fields):
+    """Step hook: CDP metrics before and after the step of the active row, if any."""
+    state = _active.get()
+    session = state and state["cdp"]
+    if session is None:
+        yield
+        return
+    try:
+        before = _read_metrics(session)
+    except Exception:
+        before = None
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if before is not None:
+            try:
+                fields.update(metric_deltas(before, _read_metrics(session)))
+            except Exception:
+                pass
+        state["profiler"].record_step(name, {**fields, "duration_s": time.perf_counter() - started})
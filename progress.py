@@ -0,0 +1,156 @@
+"""Live progress for batch runs: rows done, throughput, ETA and what each worker is on.
+
+On a terminal (`live`) a compact block is redrawn in place once a second
+and the pipeline's step-by-step output goes to a log file instead. When
+stdout is not a TTY (`plain`) one summary line is logged every 30 s
+between the normal output (a `progress` event, so `--log-format json`
+stays JSON lines). The throughput and ETA use the last `window`
+finished rows, so they follow the run as it speeds up or slows down.
+"""
+import collections
+import shutil
+import sys
+import threading
+import time
+
+from run_log import ROW, event
+
+PROGRESS_MODES = ("auto", "live", "plain", "off")
+
+
+def resolve_mode(mode, stream=None) -> str:
+    """`auto` -> `live` on a terminal, `plain` otherwise."""
+    if mode != "auto":
+        return mode
+    stream = stream or sys.stdout
+    return "live" if getattr(stream, "isatty", lambda: False)() else "plain"
+
+
+def _duration(seconds) -> str:
+    if seconds is None:
+        return "?"
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours}h{rest // 60:02d}m" if hours else f"{rest // 60}m{rest % 60:02d}s"
+
+
+class Progress:
+    """Thread-safe row counters plus a low-frequency reporter thread."""
+
+    def __init__(self, total, *, mode="plain", stream=None, interval=None, window=50):
+        self.total = total
+        self.mode = mode
+        self.stream = stream or sys.stdout
+        self.interval = interval or (1.0 if mode == "live" else 30.0)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = time.time()
+        self._finished_at = collections.deque(maxlen=window)
+        self._current = {}     # worker -> (row number, url, started)
+        self._workers = set()
+        self._drawn = 0
+        self.ok = 0
+        self.failed = 0
+
+    # -- counters ---------------------------------------------------------
+
+    def row_started(self, worker, row_no, url):
+        with self._lock:
+            self._workers.add(worker)
+            self._current[worker] = (row_no, url, time.time())
+
+    def row_finished(self, worker, ok):
+        with self._lock:
+            self._current.pop(worker, None)
+            self._finished_at.append(time.time())
+            if ok:
+                self.ok += 1
+            else:
+                self.failed += 1
+
+    def snapshot(self, now=None) -> dict:
+        """Counters, rows/min, ETA in seconds and per-worker current rows."""
+        now = now or time.time()
+        with self._lock:
+            ok, failed = self.ok, self.failed
+            done = ok + failed
+            times = list(self._finished_at)
+            current = dict(self._current)
+            workers = sorted(self._workers | set(current), key=str)
+        if len(times) == self._finished_at.maxlen:
+            span, count = now - times[0], len(times) - 1
+        else:
+            span, count = now - self._started, len(times)
+        rate = count / span * 60 if count and span > 0 else None
+        remaining = max(self.total - done, 0)
+        slowest = max(current.items(), key=lambda kv: now - kv[1][2], default=None)
+        return {
+            "done": done,
+            "ok": ok,
+            "failed": failed,
+            "total": self.total,
+            "elapsed_s": now - self._started,
+            "rows_per_min": rate,
+            "eta_s": remaining / rate * 60 if rate else None,
+            "workers": {w: current.get(w) for w in workers},
+            "slowest": (slowest[0], slowest[1][0], now - slowest[1][2]) if slowest else None,
+            "now": now,
+        }
+
+    # -- output -----------------------------------------------------------
+
+    def summary_line(self, snap) -> str:
+        rate = f"{snap['rows_per_min']:.1f}" if snap["rows_per_min"] else "?"
+        line = (
+            f"{snap['done']}/{snap['total']} rows ({snap['ok']} ok, {snap['failed']} failed), "
+            f"{rate} rows/min, ETA {_duration(snap['eta_s'])}, elapsed {_duration(snap['elapsed_s'])}"
+        )
+        if snap["slowest"]:
+            worker, row_no, seconds = snap["slowest"]
+            line += f", slowest: worker {worker} row {row_no} ({seconds:.0f}s)"
+        return line
+
+    def live_lines(self, snap) -> list:
+        width = shutil.get_terminal_size((100, 20)).columns
+        pct = snap["done"] / snap["total"] if snap["total"] else 1.0
+        bar_width = max(10, min(40, width - 20))
+        filled = int(bar_width * pct)
+        lines = [f"[{'#' * filled}{'.' * (bar_width - filled)}] {pct:6.1%}", self.summary_line(snap)]
+        for worker, current in snap["workers"].items():
+            if current:
+                row_no, url, started = current
+                lines.append(f"  worker {worker}: row {row_no} ({snap['now'] - started:.0f}s) {url}")
+            else:
+                lines.append(f"  worker {worker}: idle")
+        return [line[: width - 1] for line in lines]
+
+    def draw(self):
+        snap = self.snapshot()
+        if self.mode != "live":
+            event(
+                ROW, f"📊 [progress] {self.summary_line(snap)}", event="progress",
+                **{k: snap[k] for k in ("done", "ok", "failed", "total", "rows_per_min", "eta_s")},
+            )
+            return
+        lines = self.live_lines(snap)
+        clear = f"\x1b[{self._drawn}F\x1b[J" if self._drawn else ""
+        self.stream.write(clear + "\n".join(lines) + "\n")
+        self._drawn = len(lines)
+        self.stream.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.draw()
+
+    def start(self):
+        if self.mode != "off":
+            self._thread = threading.Thread(target=self._run, name="progress", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stop the reporter and print the final state."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self.draw()
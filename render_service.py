@@ -0,0 +1,337 @@
+"""Long-running render service with a small local HTTP API.
+
+Keeps a pool of warm browsers (one Playwright driver per worker thread)
+and renders course URLs on request:
+
+    python render_service.py --port 8765 --workers 2
+
+    POST /jobs            {"url": ..., "name": ..., "force": false} -> 202 + job
+    GET  /jobs/<id>       job status, PDF path when done
+    GET  /jobs/<id>/events  JSON lines, one per status change, until done
+    GET  /metrics         queue depth, job counts, render times
+    GET  /health
+
+A URL that already has a PDF in the output folder is answered straight
+away unless `force` is set; a URL that is already queued or running
+returns the existing job. When the queue is full, POST returns 429.
+Only binds to localhost by default.
+"""
+import argparse
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from course_urls import canonical_url
+from output_manager import OutputManager
+from run_ledger import append_record, ledger_path
+from run_log import log
+
+FINISHED = ("done", "failed", "cancelled")
+# Finished jobs kept for status queries; older ones are forgotten.
+MAX_FINISHED_JOBS = 1000
+
+
+class BrowserRenderer:
+    """One browser for one worker thread; `render()` runs the full pipeline flow."""
+
+    def __init__(self, output_dir, outputs, *, launch_profile=None, formats=("pdf",), pdf_profile=None,
+                 page_state=None):
+        from playwright.sync_api import sync_playwright
+
+        from launch_config import launch_browser
+
+        self.output_dir = output_dir
+        self.outputs = outputs
+        self.formats = formats
+        self.pdf_profile = pdf_profile
+        self.page_state = page_state
+        self._playwright = sync_playwright().start()
+        self._browser = launch_browser(self._playwright, launch_profile)
+
+    def render(self, url, name=None):
+        """PDF path for `url`, or None if the render failed."""
+        from coursera_pipeline import _new_page, render_row
+
+        context, page = _new_page(self._browser, self.page_state)
+        try:
+            return render_row(page, url, self.output_dir, name, self.outputs, self.formats, self.pdf_profile,
+                              self.page_state)
+        finally:
+            context.close()
+
+    def close(self):
+        try:
+            self._browser.close()
+        finally:
+            self._playwright.stop()
+
+
+class RenderService:
+    """Job queue plus `workers` render threads.
+
+    `renderer_factory()` is called once in every worker thread and must
+    return an object with `render(url, name) -> path or None` and `close()`.
+    """
+
+    def __init__(self, renderer_factory, outputs, *, workers=1, max_queue=100, ledger=None):
+        self.renderer_factory = renderer_factory
+        self.outputs = outputs
+        self.workers = workers
+        self.ledger = ledger
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = OrderedDict()      # id -> job dict
+        self._active = {}               # canonical URL -> id of a queued/running job
+        self._changed = threading.Condition()
+        self._ids = itertools.count(1)
+        self._threads = []
+        self._started = time.time()
+        self._render_s = []
+
+    # -- lifecycle --------------------------------------------------------
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, args=(i,), name=f"render-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self):
+        """Let running jobs finish, then stop the workers; queued jobs are cancelled."""
+        while True:
+            try:
+                job_id = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job_id is not None:
+                self._update(job_id, status="cancelled", error="service stopped", finished_at=time.time())
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+    # -- jobs -------------------------------------------------------------
+
+    def submit(self, url, name=None, force=False) -> dict:
+        """Queue a render; raises `queue.Full` when the queue is at its limit."""
+        key = canonical_url(url)
+        with self._changed:
+            if key in self._active:
+                return dict(self._jobs[self._active[key]])
+            job = {"id": str(next(self._ids)), "url": url, "name": name, "status": "queued",
+                   "path": None, "error": None, "submitted_at": time.time()}
+            existing = None if force else self.outputs.path_for(url)
+            if existing:
+                job.update(status="done", path=existing, cached=True, finished_at=job["submitted_at"])
+            else:
+                self._queue.put_nowait(job["id"])
+                self._active[key] = job["id"]
+            self._jobs[job["id"]] = job
+            self._trim()
+            return dict(job)
+
+    def get(self, job_id):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait(self, job_id, last_status=None, timeout=None):
+        """Block until the job's status differs from `last_status`; returns the job."""
+        with self._changed:
+            self._changed.wait_for(
+                lambda: job_id not in self._jobs or self._jobs[job_id]["status"] != last_status, timeout
+            )
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def metrics(self) -> dict:
+        with self._changed:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            times = list(self._render_s)
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize(),
+            "queue_limit": self._queue.maxsize,
+            "jobs": counts,
+            "rendered": len(times),
+            "mean_render_s": round(sum(times) / len(times), 3) if times else None,
+            "max_render_s": round(max(times), 3) if times else None,
+            "uptime_s": round(time.time() - self._started, 1),
+        }
+
+    def _trim(self):
+        finished = [i for i, j in self._jobs.items() if j["status"] in FINISHED]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def _update(self, job_id, **changes):
+        with self._changed:
+            job = self._jobs[job_id]
+            job.update(changes)
+            if job["status"] in FINISHED:
+                self._active.pop(canonical_url(job["url"]), None)
+            self._changed.notify_all()
+            return dict(job)
+
+    # -- workers ----------------------------------------------------------
+
+    def _worker(self, worker_id):
+        renderer, error = None, None
+        try:
+            renderer = self.renderer_factory()
+        except Exception as e:
+            error = f"renderer failed to start: {e}"
+            log.error(f"❌ [render {worker_id}] {error}")
+        try:
+            while True:
+                job_id = self._queue.get()
+                if job_id is None:
+                    return
+                self._run_job(worker_id, job_id, renderer, error)
+        finally:
+            if renderer is not None:
+                renderer.close()
+
+    def _run_job(self, worker_id, job_id, renderer, error):
+        job = self._update(job_id, status="running", started_at=time.time(), worker=worker_id)
+        started = time.perf_counter()
+        path = None
+        if renderer is not None:
+            try:
+                path = renderer.render(job["url"], job["name"])
+                error = None if path else "render failed"
+            except Exception as e:
+                error = str(e)
+        seconds = time.perf_counter() - started
+        with self._changed:
+            self._render_s.append(seconds)
+            del self._render_s[:-1000]
+        self._update(job_id, status="done" if path else "failed", path=path, error=error,
+                     finished_at=time.time(), seconds=round(seconds, 3))
+        if self.ledger:
+            append_record(self.ledger, url=job["url"], name=job["name"], status="ok" if path else "failed",
+                          seconds=round(seconds, 3), pdf=path, worker=worker_id, source="service")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None  # set by make_server
+
+    def _send(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        parts = [p for p in self.path.split("?", 1)[0].split("/") if p]
+        if parts == ["health"]:
+            return self._send(200, {"ok": True})
+        if parts == ["metrics"]:
+            return self._send(200, self.service.metrics())
+        if len(parts) == 2 and parts[0] == "jobs":
+            job = self.service.get(parts[1])
+            return self._send(200, job) if job else self._send(404, {"error": "unknown job"})
+        if len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            return self._stream(parts[1])
+        self._send(404, {"error": "not found"})
+
+    def _stream(self, job_id):
+        """One JSON line per status change; the response ends when the job is finished."""
+        job = self.service.get(job_id)
+        if job is None:
+            return self._send(404, {"error": "unknown job"})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        while True:
+            self.wfile.write((json.dumps(job, ensure_ascii=False) + "\n").encode("utf-8"))
+            self.wfile.flush()
+            if job["status"] in FINISHED:
+                return
+            job = self.service.wait(job_id, job["status"], timeout=600) or job
+
+    def do_POST(self):
+        if self.path.split("?", 1)[0].rstrip("/") != "/jobs":
+            return self._send(404, {"error": "not found"})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            url = str(body["url"]).strip()
+            if not url.startswith(("http://", "https://", "file://")):
+                raise ValueError(url)
+        except (KeyError, ValueError, TypeError):
+            return self._send(400, {"error": "expected a JSON body with an http(s) 'url'"})
+        try:
+            job = self.service.submit(url, body.get("name") or None, force=bool(body.get("force")))
+        except queue.Full:
+            return self._send(429, {"error": "queue full, retry later"})
+        self._send(200 if job["status"] in FINISHED else 202, job)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(service, host="127.0.0.1", port=8765):
+    """HTTP server bound to `service`; `port=0` picks a free port."""
+    handler = type("RenderHandler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    from launch_config import LAUNCH_PROFILES
+    from page_capture import parse_formats
+    from page_state import load_state, resolve_state_path
+    from pdf_profiles import PDF_PROFILES
+    from run_log import configure as configure_logging
+
+    parser = argparse.ArgumentParser(description="Render Coursera course pages on request over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output-dir", default="pdfs")
+    parser.add_argument("--workers", type=int, default=1, help="warm browsers rendering in parallel (default: 1)")
+    parser.add_argument("--queue-size", type=int, default=100, help="jobs waiting before POST returns 429")
+    parser.add_argument("--launch-profile", choices=sorted(LAUNCH_PROFILES), default=None)
+    parser.add_argument("--pdf-profile", choices=sorted(PDF_PROFILES), default=None)
+    parser.add_argument("--formats", type=parse_formats, default=("pdf",), metavar="LIST")
+    parser.add_argument("--page-state", default=None, metavar="PATH", help="consent flags file, or 'none'")
+    args = parser.parse_args(argv)
+    configure_logging()
+    state_path = resolve_state_path(args.page_state)
+    page_state = load_state(state_path) if state_path else None
+
+    outputs = OutputManager(args.output_dir)
+    service = RenderService(
+        lambda: BrowserRenderer(
+            args.output_dir, outputs,
+            launch_profile=args.launch_profile, formats=args.formats, pdf_profile=args.pdf_profile,
+            page_state=page_state,
+        ),
+        outputs,
+        workers=max(1, args.workers),
+        max_queue=args.queue_size,
+        ledger=ledger_path(args.output_dir),
+    ).start()
+    server = make_server(service, args.host, args.port)
+    log.info(f"🛰️  Render service on http://{args.host}:{server.server_address[1]} "
+             f"({service.workers} worker(s), output: {args.output_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log.info("\n👋 Shutting down")
+    finally:
+        server.server_close()
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Memory readings for the Python process and the browser it drives.
+
+Playwright starts its driver as a child of this process and Chromium as a
+child of the driver, so summing the RSS of our process tree covers the
+browser, renderers and GPU/utility processes. `psutil` is used when it is
+installed; otherwise `/proc` is read directly (Linux only).
+"""
+import os
+
+try:
+    import psutil
+except ImportError:  # optional dependency
+    psutil = None
+
+
+def _proc_rss_kb(pid: int) -> int:
+    """RSS of one process in KiB from /proc, 0 if it vanished."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii", errors="ignore") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def _proc_parent_map() -> dict:
+    """Map of ppid -> [child pids], walking /proc once."""
+    parents = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return parents
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="ascii", errors="ignore") as fh:
+                # The command name may contain spaces, so split after the ')'.
+                ppid = int(fh.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        parents.setdefault(ppid, []).append(int(entry))
+    return parents
+
+
+def _proc_children(root: int) -> list:
+    """All descendant pids of `root`."""
+    parents = _proc_parent_map()
+    found, stack = [], [root]
+    while stack:
+        for child in parents.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def child_pids(pid=None) -> set:
+    """Direct children of `pid` (default: this process)."""
+    pid = pid or os.getpid()
+    if psutil is not None:
+        try:
+            return {c.pid for c in psutil.Process(pid).children()}
+        except psutil.NoSuchProcess:
+            return set()
+    return set(_proc_parent_map().get(pid, []))
+
+
+def process_tree_rss_mb(pid=None, *, include_self: bool = False) -> float:
+    """Total RSS in MB of every descendant of `pid` (default: this process).
+
+    With `include_self` the RSS of `pid` itself is added, which is what we
+    want when sizing a whole worker; without it the figure is browser-only.
+    """
+    pid = pid or os.getpid()
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            procs = root.children(recursive=True)
+            if include_self:
+                procs.append(root)
+            total = 0
+            for proc in procs:
+                try:
+                    total += proc.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            return total / (1024 * 1024)
+        except psutil.NoSuchProcess:
+            return 0.0
+
+    pids = _proc_children(pid)
+    if include_self:
+        pids.append(pid)
+    return sum(_proc_rss_kb(p) for p in pids) / 1024
@@ -0,0 +1,53 @@
+"""Append-only ledger of processed rows, one JSON object per line.
+
+Every finished row is recorded with its URL, outcome and duration. Later runs
+read the ledger back as timing history for scheduling and planning.
+"""
+import json
+import os
+import threading
+import time
+from statistics import median
+
+from course_urls import canonical_url
+
+LEDGER_NAME = ".ledger.jsonl"
+
+_WRITE_LOCK = threading.Lock()
+
+
+def ledger_path(output_dir, shard=None) -> str:
+    """Default ledger location inside an output folder; a shard writes its own (see `sharding.py`)."""
+    return os.path.join(output_dir, f".ledger.{shard}.jsonl" if shard else LEDGER_NAME)
+
+
+def append_record(path, **record):
+    """Append one row record; safe to call from several worker threads."""
+    record.setdefault("finished_at", time.time())
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _WRITE_LOCK:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write(line)
+
+
+def read_records(path):
+    """Yield every record in the ledger; unreadable lines are skipped."""
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def load_timings(path, *, last_n: int = 3) -> dict:
+    """Median duration in seconds of the last `last_n` successful runs per canonical URL."""
+    history = {}
+    for record in read_records(path):
+        if record.get("status") != "ok" or not record.get("url"):
+            continue
+        history.setdefault(canonical_url(record["url"]), []).append(float(record.get("seconds", 0.0)))
+    return {url: median(times[-last_n:]) for url, times in history.items()}
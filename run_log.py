@@ -0,0 +1,168 @@
+"""Structured logging shared by `coursera.py` and `coursera_pipeline.py`.
+
+Everything goes through the `cert_automation` logger. Records carry the
+row, URL, worker and step they were logged in (see `log_context` and
+`step`), so the JSON-lines output can be filtered per row or step:
+
+    {"ts": 1760000000.123, "level": "row", "msg": "...", "row": 12, "url": "...",
+     "event": "row", "outcome": "ok", "duration_s": 41.2}
+
+Levels, most to least verbose: `debug` (per-button lines), `info` (steps,
+the default), `quiet` (one summary per row, plus warnings and errors) and
+`warning`. Configure with `configure()` or `COURSERA_LOG_LEVEL`,
+`COURSERA_LOG_FORMAT` (`text`/`json`) and `COURSERA_LOG_FILE` (JSON lines,
+in addition to the console).
+"""
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import sys
+import time
+
+ROW = 25
+logging.addLevelName(ROW, "ROW")
+
+LOG_LEVELS = {"debug": logging.DEBUG, "info": logging.INFO, "quiet": ROW, "warning": logging.WARNING}
+LOG_FORMATS = ("text", "json")
+
+log = logging.getLogger("cert_automation")
+
+_context = contextvars.ContextVar("log_context", default={})
+_step_state = contextvars.ContextVar("log_step_state", default=None)
+_step_hooks = []
+
+
+@contextlib.contextmanager
+def log_context(**fields):
+    """Attach `fields` (row, url, worker, ...) to every record logged inside the block."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def event(level, msg, **fields):
+    """Log `msg` with extra structured `fields`."""
+    log.log(level, msg, extra={"fields": fields})
+
+
+def add_step_hook(hook):
+    """Run `hook(name, fields)` (a context manager) around every `step()`.
+
+    Whatever the hook puts in `fields` is added to the step's event.
+    """
+    if hook not in _step_hooks:
+        _step_hooks.append(hook)
+
+
+@contextlib.contextmanager
+def step(name, title=None):
+    """Log a step banner, then its duration and outcome (`ok`, `warning`, `error`).
+
+    The outcome is the worst level logged inside the step, or `error` if
+    the block raises.
+    """
+    if title:
+        log.info(title, extra={"banner": True})
+    state = {"outcome": "ok"}
+    fields = {}
+    started = time.perf_counter()
+    token = _step_state.set(state)
+    try:
+        with contextlib.ExitStack() as hooks:
+            for hook in _step_hooks:
+                hooks.enter_context(hook(name, fields))
+            with log_context(step=name):
+                yield state
+    except BaseException:
+        state["outcome"] = "error"
+        raise
+    finally:
+        _step_state.reset(token)
+        seconds = time.perf_counter() - started
+        event(logging.DEBUG, f"  ⏱️  {name}: {seconds:.1f}s ({state['outcome']})",
+              event="step", step=name, duration_s=round(seconds, 3), outcome=state["outcome"], **fields)
+
+
+class _ContextFilter(logging.Filter):
+    def filter(self, record):
+        record.context = _context.get()
+        state = _step_state.get()
+        if state is not None and record.levelno >= logging.WARNING:
+            outcome = "error" if record.levelno >= logging.ERROR else "warning"
+            if state["outcome"] != "error":
+                state["outcome"] = outcome
+        return True
+
+
+log.addFilter(_ContextFilter())
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, message, context and fields."""
+
+    def format(self, record):
+        data = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "msg": record.getMessage().strip(),
+            **getattr(record, "context", {}),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The console look the scripts always had: the message, banners framed by `=` lines."""
+
+    def format(self, record):
+        text = record.getMessage()
+        if getattr(record, "banner", False):
+            text = "\n" + "=" * 70 + "\n" + text + "\n" + "=" * 70
+        if record.exc_info:
+            text += "\n" + self.formatException(record.exc_info)
+        return text
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever `sys.stdout` is at the time, so redirection keeps working."""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def configure(level=None, fmt=None, log_file=None):
+    """Set up the console handler (and an optional JSON-lines file); safe to call again."""
+    level = (level or os.environ.get("COURSERA_LOG_LEVEL") or "info").lower()
+    fmt = (fmt or os.environ.get("COURSERA_LOG_FORMAT") or "text").lower()
+    log_file = log_file or os.environ.get("COURSERA_LOG_FILE")
+    if level not in LOG_LEVELS:
+        raise ValueError(f"Unknown log level '{level}'. Choose one of: {', '.join(LOG_LEVELS)}.")
+    if fmt not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format '{fmt}'. Choose one of: {', '.join(LOG_FORMATS)}.")
+
+    for handler in list(log.handlers):
+        log.removeHandler(handler)
+        handler.close()
+    log.setLevel(LOG_LEVELS[level])
+    log.propagate = False
+
+    console = _StdoutHandler()
+    console.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    log.addHandler(console)
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        log.addHandler(file_handler)
+    return log
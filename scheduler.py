@@ -0,0 +1,68 @@
+"""Order and distribute rows across workers by expected cost.
+
+Costs come from the run ledger (median seconds per URL from earlier runs);
+URLs never seen before get a fixed estimate for their page type, since
+specializations and professional certificates have many more modules to
+expand than a single course.
+"""
+import heapq
+
+from course_urls import canonical_url, page_type
+
+# Seconds per row by page type, used when a URL has no history yet.
+PAGE_TYPE_ESTIMATES = {
+    "professional-certificates": 150.0,
+    "specializations": 120.0,
+    "learn": 75.0,
+    "projects": 45.0,
+}
+DEFAULT_ESTIMATE = 90.0
+
+SCHEDULES = ("sheet", "longest-first", "balanced")
+
+
+def estimate_seconds(url, history=None) -> float:
+    """Expected render time for one URL: history first, page-type estimate otherwise."""
+    if history:
+        known = history.get(canonical_url(url))
+        if known is not None:
+            return known
+    return PAGE_TYPE_ESTIMATES.get(page_type(url), DEFAULT_ESTIMATE)
+
+
+def _costed(jobs, history):
+    """`(cost, job)` pairs, most expensive first; ties keep sheet order."""
+    costed = [(estimate_seconds(job[1], history), job) for job in jobs]
+    costed.sort(key=lambda pair: (-pair[0], pair[1][0]))
+    return costed
+
+
+def order_longest_first(jobs, history=None):
+    """Sort `(row_number, url, name)` jobs by expected cost, most expensive first.
+
+    Ties keep sheet order, so runs without history stay predictable.
+    """
+    return [job for _, job in _costed(jobs, history)]
+
+
+def balance(jobs, workers, history=None):
+    """Split jobs into `workers` lists with roughly equal total cost.
+
+    Greedy longest-processing-time: each job, most expensive first, goes to
+    the worker with the least work so far. Returns `(buckets, totals)`.
+    """
+    workers = max(1, int(workers))
+    buckets = [[] for _ in range(workers)]
+    totals = [0.0] * workers
+    heap = [(0.0, i) for i in range(workers)]
+    for cost, job in _costed(jobs, history):
+        load, i = heapq.heappop(heap)
+        buckets[i].append(job)
+        totals[i] = load + cost
+        heapq.heappush(heap, (totals[i], i))
+    return buckets, totals
+
+
+def makespan(jobs, workers, history=None) -> float:
+    """Estimated wall time of `jobs` on `workers` workers with `balance()`."""
+    return max(balance(jobs, workers, history)[1], default=0.0)
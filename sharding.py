@@ -0,0 +1,103 @@
+"""Split a run into shards by a stable hash of the canonical URL.
+
+`--shard I/N` keeps the rows whose URL hashes to shard I of N, so the same
+spec can be given to N processes on one machine or to N machines sharing
+the output folder; every row lands in exactly one shard, whatever the
+sheet order. While shards run, each one appends to its own ledger,
+manifest and report files (`*.shard-I-of-N.*`) so they never write the
+same file; `merge_shards()` folds them into the main ones afterwards.
+"""
+import glob
+import hashlib
+import json
+import os
+
+from course_urls import canonical_url
+from output_manager import MANIFEST_NAME
+from pdf_writer import write_atomic
+from run_ledger import LEDGER_NAME
+
+REPORT_NAME = ".report.json"
+
+
+def parse_shard(value):
+    """`"1/4"` -> `(1, 4)`. Raises ValueError unless 0 <= I < N."""
+    try:
+        index, count = (int(part) for part in str(value).split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like I/N, got '{value}'") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be between 0 and {count - 1}, got '{value}'")
+    return index, count
+
+
+def shard_of(url, count) -> int:
+    """Shard number of a URL; stable across processes, machines and Python versions."""
+    digest = hashlib.sha1(canonical_url(url).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def select_shard(jobs, index, count):
+    """The `(row, url, name)` jobs that belong to shard `index` of `count`."""
+    return [job for job in jobs if shard_of(job[1], count) == index]
+
+
+def shard_suffix(index, count) -> str:
+    return f"shard-{index}-of-{count}"
+
+
+def shard_file(name, suffix) -> str:
+    """`manifest.jsonl` + `shard-0-of-2` -> `manifest.shard-0-of-2.jsonl`."""
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{suffix}{ext}" if suffix else name
+
+
+def save_report(output_dir, suffix, worker_stats, writer_stats):
+    """Store one shard's run report for `merge_shards()`."""
+    path = os.path.join(output_dir, shard_file(REPORT_NAME, suffix))
+    data = {"workers": worker_stats, "writer": writer_stats}
+    write_atomic(path, json.dumps(data).encode("utf-8"))
+
+
+def _fold(output_dir, name):
+    """Append every shard file of `name` to the main file and delete it; returns lines moved."""
+    target = os.path.join(output_dir, name)
+    stem, ext = os.path.splitext(name)
+    moved = 0
+    for path in sorted(glob.glob(os.path.join(glob.escape(output_dir), f"{stem}.shard-*{ext}"))):
+        with open(path, encoding="utf-8") as fh:
+            lines = [line if line.endswith("\n") else line + "\n" for line in fh if line.strip()]
+        with open(target, "a", encoding="utf-8") as fh:
+            fh.writelines(lines)
+        os.remove(path)
+        moved += len(lines)
+    return moved
+
+
+def merge_shards(output_dir):
+    """Fold shard ledgers and manifests into the main ones and combine the shard reports.
+
+    Run once after every shard has finished. Returns
+    `(worker_stats, writer_stats, ledger_lines, manifest_lines)`; worker
+    ids become `"<shard>.<worker>"`.
+    """
+    ledger_lines = _fold(output_dir, LEDGER_NAME)
+    manifest_lines = _fold(output_dir, MANIFEST_NAME)
+
+    worker_stats, writer_stats = [], None
+    stem, ext = os.path.splitext(REPORT_NAME)
+    for path in sorted(glob.glob(os.path.join(glob.escape(output_dir), f"{stem}.shard-*{ext}"))):
+        shard = os.path.basename(path)[len(stem) + len(".shard-"):].split("-", 1)[0]
+        with open(path, encoding="utf-8") as fh:
+            report = json.load(fh)
+        for stats in report["workers"]:
+            worker_stats.append({**stats, "worker": f"{shard}.{stats['worker']}"})
+        if report.get("writer"):
+            if writer_stats is None:
+                writer_stats = dict(report["writer"])
+            else:
+                for key, value in report["writer"].items():
+                    writer_stats[key] = max(writer_stats[key], value) if key == "max_queue_depth" \
+                        else writer_stats[key] + value
+        os.remove(path)
+    return worker_stats, writer_stats, ledger_lines, manifest_lines
@@ -0,0 +1,54 @@
+import openpyxl
+
+from course_sheet import column_from_rows, dedupe_jobs, jobs_from_rows, read_jobs, read_sheet_rows
+
+
+def _write_sheet(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def test_read_jobs_detects_columns_and_skips_empty_urls(tmp_path):
+    path = tmp_path / "courses.xlsx"
+    _write_sheet(path, [
+        ["Course Name", "Course URL"],
+        ["Python", "https://www.coursera.org/learn/python"],
+        ["No link", None],
+        [None, "https://www.coursera.org/specializations/x"],
+    ])
+    jobs, total, url_col, name_col = read_jobs(str(path))
+    assert (url_col, name_col) == ("Course URL", "Course Name")
+    assert total == 3
+    assert jobs == [
+        (1, "https://www.coursera.org/learn/python", "Python"),
+        (3, "https://www.coursera.org/specializations/x", None),
+    ]
+
+
+def test_read_jobs_csv(tmp_path):
+    path = tmp_path / "courses.csv"
+    path.write_text("url,title\nhttps://www.coursera.org/learn/a,A\n", encoding="utf-8")
+    assert read_jobs(str(path))[0] == [(1, "https://www.coursera.org/learn/a", "A")]
+
+
+def test_dedupe_uses_canonical_url():
+    jobs = [
+        (1, "https://www.coursera.org/learn/a", None),
+        (2, "https://WWW.coursera.org/learn/a/?utm_source=x", None),
+        (3, "https://www.coursera.org/learn/b", None),
+    ]
+    unique, duplicates = dedupe_jobs(jobs)
+    assert [j[0] for j in unique] == [1, 3]
+    assert [j[0] for j in duplicates] == [2]
+
+
+def test_jobs_and_optional_column_from_one_read(tmp_path):
+    path = tmp_path / "courses.csv"
+    path.write_text("url,name,PDF Profile\nhttps://a,A,long\nhttps://b,B,\n", encoding="utf-8")
+    rows = read_sheet_rows(str(path))
+    assert jobs_from_rows(rows)[0] == [(1, "https://a", "A"), (2, "https://b", "B")]
+    assert column_from_rows(rows, ["pdf_profile", "pdf profile"]) == ("PDF Profile", {1: "long"})
+    assert column_from_rows(rows, ["missing"]) == (None, {})
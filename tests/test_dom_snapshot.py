@@ -0,0 +1,22 @@
+from dom_snapshot import ElementInfo
+
+
+def _info(**fields):
+    defaults = dict(ref="1", aria_label="", data_e2e="", data_testid="", css_class="", expanded=None, text="",
+                    context_text="", visible=True)
+    return ElementInfo(**{**defaults, **fields})
+
+
+def test_records_apply_the_shared_rules():
+    module = _info(aria_label="Course 1: Foundations", expanded="false", text="Course 1: Foundations")
+    faq = _info(text="Is this course really 100% online?", context_text="Frequently asked questions")
+    partner = _info(aria_label="Read more about partner Fixture University")
+
+    assert not module.is_faq and not module.is_expanded
+    assert faq.is_faq
+    assert partner.skip_read_more and not module.skip_read_more
+    assert _info(expanded="true").is_expanded
+
+
+def test_records_are_lightweight():
+    assert not hasattr(_info(), "__dict__")
@@ -0,0 +1,41 @@
+import json
+
+from filter_rules import blocking_css, cleanup_js, expand_js, init_js, is_faq, load_rules, should_skip_read_more
+
+
+def test_faq_keywords_match_any_attribute_case_insensitively():
+    assert is_faq(aria_label="Frequently Asked Questions")
+    assert is_faq(data_e2e="FAQ-item")
+    assert is_faq(data_testid="faq-accordion")
+    assert is_faq(css_class="css-faq-accordion")
+    assert is_faq(text="What background do I need? (question)")
+    assert not is_faq("Course 1: Foundations", "module-toggle", "css-1x2y", "Course 1: Foundations")
+
+
+def test_faq_context_text_is_checked():
+    assert is_faq("Course 2", context_text="Frequently asked questions\nCourse 2")
+    assert not is_faq("Course 2", context_text="Specialization - 3 course series")
+
+
+def test_read_more_skip_rules():
+    assert should_skip_read_more("Read more about partner Fixture University")
+    assert should_skip_read_more("EXPLORE more")
+    assert not should_skip_read_more("Read more about this specialization")
+    assert not should_skip_read_more(None)
+
+
+def test_rules_load_once_and_feed_css_and_js():
+    assert load_rules() is load_rules()
+    css = blocking_css()
+    for selector in load_rules()["promo_selectors"]:
+        assert selector in css
+    assert "window.__certRules.removeOverlays()" in cleanup_js()
+    assert "expandToggles(root, quietMs, maxMs)" in expand_js()
+
+
+def test_init_script_carries_css_and_optional_observer():
+    script = init_js()
+    assert json.dumps(blocking_css()) in script
+    assert "if (false)" in script and "if (true)" in init_js(observe=True)
+    assert "initMs" in script
+    assert "__certPopup" in init_js(observe=True) and "setInterval" not in init_js(observe=True)
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from har_replay import har_options, har_path, replay_context
+
+
+def test_spellings_of_a_course_share_one_archive(tmp_path):
+    a = har_path(tmp_path, "https://www.coursera.org/learn/python")
+    b = har_path(tmp_path, "https://coursera.org/learn/python/?utm_source=sheet#about")
+    assert a == b == os.path.join(tmp_path, "learn-python.har.zip")
+    assert har_path(tmp_path, "https://www.coursera.org/specializations/python") != a
+
+
+def test_modes(tmp_path):
+    url = "https://www.coursera.org/learn/python"
+    har_dir = tmp_path / "har"
+    assert har_options("off", har_dir, url) is None
+
+    assert har_options("record", har_dir, url) == {"har": har_path(har_dir, url), "update": True}
+    assert har_dir.is_dir()
+
+    with pytest.raises(FileNotFoundError):
+        har_options("replay", har_dir, url)
+    open(har_path(har_dir, url), "wb").close()
+    assert har_options("replay", har_dir, url)["not_found"] == "abort"
+
+    with pytest.raises(ValueError):
+        har_options("rewind", har_dir, url)
+
+
+class FakeContext:
+    def __init__(self):
+        self.routes = []
+
+    def route(self, pattern, handler):
+        self.routes.append(("route", pattern))
+
+    def route_from_har(self, har, not_found=None):
+        self.routes.append(("har", os.path.basename(har), not_found))
+
+
+def test_replay_context_falls_back_through_archives_to_abort(tmp_path):
+    recorded = "https://www.coursera.org/learn/python"
+    open(har_path(tmp_path, recorded), "wb").close()
+    context = FakeContext()
+
+    missing = replay_context(context, tmp_path, [recorded, recorded, "https://www.coursera.org/learn/sql"])
+
+    assert missing == ["https://www.coursera.org/learn/sql"]
+    assert context.routes == [("route", "**/*"), ("har", "learn-python.har.zip", "fallback")]
@@ -0,0 +1,60 @@
+import os
+
+from course_urls import canonical_url
+from incremental import apply_diff, diff_jobs, load_snapshot, save_snapshot
+from output_manager import OutputManager
+from run_ledger import read_records
+
+A = "https://www.coursera.org/learn/a"
+B = "https://www.coursera.org/learn/b"
+C = "https://www.coursera.org/learn/c"
+
+
+def test_diff_against_snapshot(tmp_path):
+    path = str(tmp_path / "snap.json")
+    assert load_snapshot(path) == {}
+    save_snapshot(path, [(1, A, "A"), (2, B, "B")])
+
+    diff = diff_jobs(load_snapshot(path), [(1, A + "/", "A"), (2, B, "Bee"), (3, C, None)])
+    assert diff["unchanged"] == [(1, A + "/", "A")]
+    assert diff["renamed"] == [((2, B, "Bee"), "B")]
+    assert diff["added"] == [(3, C, None)]
+    assert diff["removed"] == []
+
+
+def test_apply_renames_and_removes_without_rendering(tmp_path):
+    outputs = OutputManager(str(tmp_path))
+    for url, name in ((A, "A"), (B, "B")):
+        outputs.store(outputs.reserve(url, custom_name=name), b"%PDF-")
+    path = str(tmp_path / ".sheet_snapshot.json")
+    save_snapshot(path, [(1, A, "A"), (2, B, "B")])
+
+    diff = diff_jobs(load_snapshot(path), [(1, B, "Bee"), (2, C, "C")])
+    todo = apply_diff(diff, outputs)
+
+    assert todo == [(2, C, "C")]
+    assert sorted(os.listdir(tmp_path)) == [".sheet_snapshot.json", "Bee_b.pdf", "manifest.jsonl"]
+    reloaded = OutputManager(str(tmp_path))
+    assert not reloaded.has_output(A)
+    assert reloaded.path_for(B).endswith("Bee_b.pdf")
+
+
+def test_added_rows_with_an_output_are_not_rendered_again(tmp_path):
+    outputs = OutputManager(str(tmp_path))
+    outputs.store(outputs.reserve(A, custom_name="A"), b"%PDF-")
+
+    diff = diff_jobs({}, [(1, A, "A"), (2, B, "B")])
+    assert apply_diff(diff, outputs) == [(2, B, "B")]
+
+
+def test_cleared_name_removes_the_old_output_before_rendering(tmp_path):
+    outputs = OutputManager(str(tmp_path))
+    outputs.store(outputs.reserve(A, custom_name="Old"), b"%PDF-")
+    ledger = str(tmp_path / ".ledger.jsonl")
+
+    diff = diff_jobs({canonical_url(A): {"row": 1, "url": A, "name": "Old"}}, [(1, A, None)])
+    assert apply_diff(diff, outputs, ledger) == [(1, A, None)]
+
+    assert not os.path.exists(tmp_path / "Old_a.pdf")
+    assert not OutputManager(str(tmp_path)).has_output(A)
+    assert [r["event"] for r in read_records(ledger)] == ["removed"]
@@ -0,0 +1,35 @@
+import pytest
+
+from launch_config import DEFAULT_LAUNCH_PROFILE, launch_options, resolve_profile_name
+
+
+def test_default_profile_is_headless_bundled_chromium(monkeypatch):
+    monkeypatch.delenv("COURSERA_LAUNCH_PROFILE", raising=False)
+    options = launch_options()
+    assert resolve_profile_name() == DEFAULT_LAUNCH_PROFILE
+    assert options["headless"] is True
+    assert "channel" not in options
+    assert "--disable-dev-shm-usage" in options["args"]
+
+
+def test_env_var_selects_profile(monkeypatch):
+    monkeypatch.setenv("COURSERA_LAUNCH_PROFILE", "headed-edge")
+    options = launch_options()
+    assert options["channel"] == "msedge"
+    assert options["headless"] is False
+
+
+def test_single_process_flag_only_added_once():
+    args = launch_options("single-process", single_process=True)["args"]
+    assert args.count("--single-process") == 1
+    assert "--single-process" in launch_options("headless", single_process=True)["args"]
+
+
+def test_lowmem_profile_has_one_renderer_limit():
+    args = launch_options("headless-lowmem")["args"]
+    assert [a for a in args if a.startswith("--renderer-process-limit")] == ["--renderer-process-limit=1"]
+
+
+def test_unknown_profile_raises():
+    with pytest.raises(ValueError):
+        launch_options("firefox")
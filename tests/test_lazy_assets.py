@@ -0,0 +1,50 @@
+import pytest
+
+from lazy_assets import _selectors, asset_classes, skip_assets
+from pdf_profiles import PDF_PROFILES, asset_skips, pdf_options
+
+
+class FakePage:
+    def __init__(self):
+        self.calls = []
+
+    def evaluate(self, script, arg=None):
+        self.calls.append(arg)
+        return 1
+
+
+def test_profiles_only_name_known_classes(monkeypatch):
+    monkeypatch.delenv("COURSERA_SKIP_ASSETS", raising=False)
+    for profile in PDF_PROFILES:
+        assert set(asset_skips(profile)) <= set(asset_classes())
+        assert "skip_assets" not in pdf_options(profile)
+    assert asset_skips("a4") == ()
+    assert "video" in asset_skips("a4-plain")
+
+
+def test_env_sets_the_skips_for_any_layout(monkeypatch):
+    monkeypatch.setenv("COURSERA_SKIP_ASSETS", "video, Avatars")
+    assert asset_skips("letter") == ("video", "avatars")
+    monkeypatch.setenv("COURSERA_SKIP_ASSETS", "none")
+    assert asset_skips("a4-plain") == ()
+    monkeypatch.setenv("COURSERA_SKIP_ASSETS", "fonts")
+    with pytest.raises(ValueError):
+        asset_skips("a4")
+
+
+def test_videos_are_stubbed_and_everything_hidden():
+    css, stub_selector = _selectors(("video", "avatars"))
+    assert "iframe[src*='youtube' i]" in stub_selector
+    assert "img[class*='avatar' i]" in css and "display: none" in css
+    assert "iframe[src*='youtube' i]" in css  # players mounted later stay hidden
+    assert "avatar" not in stub_selector
+    with pytest.raises(ValueError):
+        _selectors(("fonts",))
+
+
+def test_nothing_to_skip_costs_no_round_trip():
+    page = FakePage()
+    assert skip_assets(page, ()) == 0
+    assert page.calls == []
+    assert skip_assets(page, ("carousels",)) == 1
+    assert page.calls[0][1] == ""
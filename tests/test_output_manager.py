@@ -0,0 +1,87 @@
+import json
+import os
+
+from output_manager import OutputManager, build_filename
+
+
+def test_build_filename_sanitizes_and_keeps_extension():
+    name = build_filename("https://www.coursera.org/learn/python?x=1", title='A: "B" / C' + "x" * 300)
+    assert name.endswith(".pdf") and len(name) == 200
+    assert not set('<>:"/\\|?*') & set(name)
+    assert build_filename("https://www.coursera.org/learn/python", custom_name="My Course") == "My Course_python.pdf"
+
+
+def test_collisions_resolve_deterministically(tmp_path):
+    outputs = OutputManager(str(tmp_path))
+    a = outputs.reserve("https://www.coursera.org/learn/x", custom_name="Same")
+    b = outputs.reserve("https://www.coursera.org/specializations/x", custom_name="Same")
+    assert a != b
+    assert outputs.reserve("https://www.coursera.org/learn/x", custom_name="Same") == a
+    outputs.store(a, b"%PDF-")
+
+    # The written course keeps its name; the newcomer gets the same suffix again.
+    again = OutputManager(str(tmp_path))
+    assert again.reserve("https://www.coursera.org/specializations/x", custom_name="Same") == b
+
+
+def test_index_answers_has_output_across_instances(tmp_path):
+    outputs = OutputManager(str(tmp_path))
+    path = outputs.reserve("https://www.coursera.org/learn/x", title="X")
+    assert not outputs.has_output("https://www.coursera.org/learn/x")
+    assert outputs.store(path, b"%PDF-") == path
+    assert outputs.has_output("https://WWW.coursera.org/learn/x/")
+
+    reloaded = OutputManager(str(tmp_path))
+    assert reloaded.path_for("https://www.coursera.org/learn/x") == path
+    reloaded.forget("https://www.coursera.org/learn/x")
+    assert not OutputManager(str(tmp_path)).has_output("https://www.coursera.org/learn/x")
+
+
+def test_sharded_layouts(tmp_path):
+    url = "https://www.coursera.org/learn/x"
+    by_hash = OutputManager(str(tmp_path / "h"), layout="hash").reserve(url, title="X")
+    assert len(os.path.basename(os.path.dirname(by_hash))) == 2
+    by_partner = OutputManager(str(tmp_path / "p"), layout="partner").reserve(url, title="X", partner="Uni: A/B")
+    assert os.path.basename(os.path.dirname(by_partner)) == "Uni_ A_B"
+    unknown = OutputManager(str(tmp_path / "p")).reserve(url, title="X")
+    assert os.path.dirname(unknown) == str(tmp_path / "p")
+
+
+def test_manifest_records_relative_path_size_hash_and_render_time(tmp_path):
+    outputs = OutputManager(str(tmp_path), layout="hash")
+    path = outputs.reserve("https://www.coursera.org/learn/x", title="X")
+    outputs.store(path, b"%PDF-1", render_s=12.5)
+    lines = (tmp_path / "manifest.jsonl").read_text(encoding="utf-8").splitlines()
+    entry = json.loads(lines[-1])
+    assert entry["url"] == "https://www.coursera.org/learn/x"
+    assert os.path.join(str(tmp_path), entry["path"]) == path
+    assert entry["bytes"] == 6 and len(entry["sha256"]) == 64 and entry["render_s"] == 12.5
+
+
+def test_each_format_is_tracked_separately(tmp_path):
+    outputs = OutputManager(str(tmp_path))
+    url = "https://www.coursera.org/learn/x"
+    pdf = outputs.reserve(url, title="X")
+    png = outputs.reserve(url, title="X", ext=".png")
+    outputs.store(pdf, b"%PDF-")
+    outputs.store(png, b"\x89PNG")
+
+    reloaded = OutputManager(str(tmp_path))
+    assert reloaded.path_for(url) == pdf and reloaded.path_for(url, "png") == png
+    reloaded.forget(url, "png")
+    assert reloaded.has_output(url) and not reloaded.has_output(url, "png")
+
+
+def test_planner_reads_the_manifest_without_rewriting_it(tmp_path):
+    from planner import _completed
+
+    line = json.dumps({"url": "https://www.coursera.org/learn/x", "kind": "pdf", "path": "X_x.pdf"})
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text((line + "\n") * 300)
+
+    is_done = _completed(str(tmp_path), [])
+
+    assert is_done("https://www.coursera.org/learn/x/?utm_source=sheet") and not is_done("https://www.coursera.org/learn/y")
+    assert len(manifest.read_text().splitlines()) == 300
+    assert not _completed(str(tmp_path / "missing"), [])("https://www.coursera.org/learn/x")
+    assert not (tmp_path / "missing").exists()
@@ -0,0 +1,50 @@
+import pytest
+
+from page_capture import capture, parse_formats
+
+
+class FakePage:
+    def __init__(self):
+        self.calls = []
+
+    def emulate_media(self, media):
+        self.calls.append(f"media:{media}")
+
+    def pdf(self, **options):
+        self.calls.append("pdf")
+        return b"%PDF-"
+
+    def screenshot(self, full_page, type):
+        self.calls.append("png")
+        raise RuntimeError("too tall")
+
+    def content(self):
+        self.calls.append("html")
+        return "<html></html>"
+
+
+def test_parse_formats():
+    assert parse_formats("PDF, png,pdf") == ("pdf", "png")
+    with pytest.raises(ValueError):
+        parse_formats("pdf,docx")
+
+
+def test_screen_formats_first_and_failures_isolated():
+    page = FakePage()
+    results = capture(page, ("pdf", "png", "html"))
+    assert page.calls == ["png", "html", "media:print", "pdf"]
+    assert [(kind, data) for kind, data, _ in results] == [
+        ("png", None),
+        ("html", b"<html></html>"),
+        ("pdf", b"%PDF-"),
+    ]
+
+
+def test_print_layout_is_fixed_up_again_after_screen_formats():
+    page = FakePage()
+    capture(page, ("pdf", "html"), before_pdf=lambda: page.calls.append("fix"))
+    assert page.calls == ["html", "media:print", "fix", "pdf"]
+
+    page = FakePage()
+    capture(page, ("pdf",), before_pdf=lambda: page.calls.append("fix"))
+    assert page.calls == ["media:print", "pdf"]
@@ -0,0 +1,44 @@
+import pytest
+
+from page_state import check_popups, context_options, init_script, resolve_state_path
+
+STATE = {
+    "cookies": [{"name": "OptanonAlertBoxClosed", "value": "x", "domain": ".coursera.org", "path": "/"}],
+    "origins": [
+        {
+            "origin": "https://www.coursera.org",
+            "localStorage": [{"name": "seen", "value": "1"}],
+            "sessionStorage": [{"name": "recommended-dismissed", "value": "true"}],
+        }
+    ],
+}
+
+
+def test_context_options_keep_only_what_playwright_accepts():
+    storage = context_options(STATE)["storage_state"]
+    assert storage["cookies"] == STATE["cookies"]
+    assert storage["origins"] == [{"origin": "https://www.coursera.org", "localStorage": [{"name": "seen", "value": "1"}]}]
+    assert context_options(None) == {}
+
+
+def test_init_script_sets_session_flags_per_origin():
+    script = init_script(STATE)
+    assert '{"https://www.coursera.org": {"recommended-dismissed": "true"}}[location.origin]' in script
+    assert init_script({"cookies": [], "origins": [{"origin": "https://x", "localStorage": []}]}) is None
+
+
+def test_resolve_state_path(tmp_path, monkeypatch):
+    monkeypatch.delenv("COURSERA_PAGE_STATE", raising=False)
+    assert resolve_state_path("none") is None
+    with pytest.raises(ValueError):
+        resolve_state_path(str(tmp_path / "missing.json"))
+    monkeypatch.setenv("COURSERA_PAGE_STATE", str(tmp_path))
+    assert resolve_state_path() == str(tmp_path)
+
+
+def test_failed_popup_check_is_unknown_not_clean():
+    class ClosedPage:
+        def evaluate(self, script):
+            raise RuntimeError("Target page, context or browser has been closed")
+
+    assert check_popups(ClosedPage()) is None
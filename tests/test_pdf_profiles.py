@@ -0,0 +1,33 @@
+import pytest
+
+from pdf_profiles import MAX_PAGE_HEIGHT_PX, pdf_options, pdf_page_count, resolve_pdf_profile
+
+
+class FakePage:
+    def __init__(self, height):
+        self.height = height
+
+    def evaluate(self, script):
+        return self.height
+
+
+def test_default_is_the_original_a4_layout(monkeypatch):
+    monkeypatch.delenv("COURSERA_PDF_PROFILE", raising=False)
+    options = pdf_options()
+    assert options["format"] == "A4" and options["print_background"] and options["scale"] == 0.90
+
+
+def test_env_and_unknown_profiles(monkeypatch):
+    monkeypatch.setenv("COURSERA_PDF_PROFILE", "Letter")
+    assert resolve_pdf_profile() == "letter"
+    with pytest.raises(ValueError):
+        resolve_pdf_profile("a3")
+
+
+def test_long_profile_fits_document_height():
+    assert pdf_options("long", FakePage(5000))["height"] == "5000px"
+    assert pdf_options("long", FakePage(10**6))["height"] == f"{MAX_PAGE_HEIGHT_PX}px"
+
+
+def test_page_count_ignores_pages_tree():
+    assert pdf_page_count(b"<< /Type /Pages /Count 2 >> << /Type /Page >> << /Type/Page>>") == 2
@@ -0,0 +1,30 @@
+import gzip
+import hashlib
+
+from pdf_writer import PdfWriter, write_atomic
+
+
+def test_write_atomic_replaces_without_leftovers(tmp_path):
+    target = tmp_path / "out" / "a.pdf"
+    write_atomic(str(target), b"one")
+    write_atomic(str(target), b"two")
+    assert target.read_bytes() == b"two"
+    assert [p.name for p in target.parent.iterdir()] == ["a.pdf"]
+
+
+def test_writer_drains_queue_and_reports(tmp_path):
+    done = []
+    with PdfWriter(max_pending=2, on_done=done.append) as writer:
+        paths = [writer.submit(str(tmp_path / f"{i}.pdf"), b"%PDF-" + bytes([i])) for i in range(5)]
+    assert all((tmp_path / f"{i}.pdf").exists() for i in range(5))
+    assert paths == [str(tmp_path / f"{i}.pdf") for i in range(5)]
+    assert writer.stats["written"] == 5 and writer.stats["errors"] == 0
+    assert 1 <= writer.stats["max_queue_depth"] <= 2
+    assert done[0]["sha256"] == hashlib.sha256(b"%PDF-\x00").hexdigest()
+
+
+def test_writer_compresses(tmp_path):
+    with PdfWriter(compress=True) as writer:
+        path = writer.submit(str(tmp_path / "c.pdf"), b"%PDF-data" * 100)
+    assert path.endswith(".pdf.gz")
+    assert gzip.decompress((tmp_path / "c.pdf.gz").read_bytes()) == b"%PDF-data" * 100
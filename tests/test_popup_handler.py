@@ -0,0 +1,25 @@
+from popup_handler import BINDING, PopupCounter
+
+
+class FakeContext:
+    def __init__(self):
+        self.bindings = {}
+
+    def expose_binding(self, name, callback):
+        self.bindings[name] = callback
+
+
+def test_counts_are_kept_per_page_and_reset_on_take():
+    counter, context = PopupCounter(), FakeContext()
+    counter.attach(context)
+    report = context.bindings[BINDING]
+    page_a, page_b = object(), object()
+
+    report({"page": page_a}, "promo", "div black-friday")
+    report({"page": page_a}, "dialog", "div Sign up")
+    report({"page": page_a}, "dialog", "div modal-backdrop")
+    report({"page": page_b}, "cookie", "div onetrust-banner-sdk")
+
+    assert counter.take(page_a) == {"promo": 1, "dialog": 2}
+    assert counter.take(page_a) == {}
+    assert counter.take(page_b) == {"cookie": 1}
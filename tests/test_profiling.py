@@ -0,0 +1,81 @@
+import pytest
+
+from profiling import Profiler, metric_deltas, trace_reason
+from run_log import step
+
+
+class FakeTracing:
+    def __init__(self):
+        self.saved = []
+        self.running = False
+
+    def start(self, **options):
+        self.running = True
+
+    def stop(self, path=None):
+        self.running = False
+        if path:
+            self.saved.append(path)
+
+
+class FakeSession:
+    def __init__(self):
+        self.reads = 0
+
+    def send(self, method):
+        if method != "Performance.getMetrics":
+            return {}
+        self.reads += 1
+        return {"metrics": [
+            {"name": "LayoutCount", "value": 10 * self.reads},
+            {"name": "ScriptDuration", "value": 0.5 * self.reads},
+            {"name": "JSHeapUsedSize", "value": 8 * 1024 * 1024},
+        ]}
+
+    def detach(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self):
+        self.tracing = FakeTracing()
+        self.session = FakeSession()
+
+    def new_cdp_session(self, page):
+        return self.session
+
+
+def test_metric_deltas_and_trace_reasons():
+    before = {"LayoutCount": 3, "ScriptDuration": 1.0}
+    after = {"LayoutCount": 7, "ScriptDuration": 1.25, "JSHeapUsedSize": 3 * 1024 * 1024, "Nodes": 900}
+    assert metric_deltas(before, after) == {"layouts": 4, "script_s": 0.25, "heap_mb": 3.0, "dom_nodes": 900}
+
+    assert trace_reason(sampled=False, ok=False, seconds=1, on_failure=True) == "failed"
+    assert trace_reason(sampled=True, ok=True, seconds=90, budget_s=60) == "slow"
+    assert trace_reason(sampled=True, ok=True, seconds=1, budget_s=60) == "sampled"
+    assert trace_reason(sampled=False, ok=False, seconds=90) is None
+
+
+def test_sampling_keeps_every_nth_row(tmp_path):
+    profiler = Profiler(str(tmp_path), trace_sample=2)
+    context = FakeContext()
+    for row_no in range(1, 6):
+        with profiler.row(context, None, row_no) as result:
+            result["ok"] = True
+    assert [row for row, _, _ in profiler.traces] == [1, 3, 5]
+    assert not context.tracing.running
+
+
+def test_failed_rows_keep_traces_and_steps_get_metrics(tmp_path):
+    profiler = Profiler(str(tmp_path), trace_on_failure=True, metrics=True)
+    context = FakeContext()
+    with profiler.row(context, None, 7):
+        with step("about"):
+            pass
+    assert context.tracing.saved == [str(tmp_path / "traces" / "row-7-failed.zip")]
+
+    about = profiler.summary()["steps"]["about"]
+    assert about["rows"] == 1
+    assert about["mean_layouts"] == 10
+    assert about["mean_script_s"] == pytest.approx(0.5)
+    assert about["peak_heap_mb"] == 8.0
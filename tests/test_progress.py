@@ -0,0 +1,37 @@
+import io
+import json
+
+import pytest
+
+from progress import Progress, resolve_mode
+from run_log import configure
+
+
+def test_rate_eta_and_slowest_job():
+    progress = Progress(10, window=3)
+    progress._started = 0.0
+    progress._finished_at.extend([30.0, 60.0, 90.0])
+    progress.ok, progress.failed = 2, 1
+    progress._current = {0: (4, "https://x", 80.0), 1: (5, "https://y", 100.0)}
+
+    snap = progress.snapshot(now=120.0)
+    # Full window: 2 rows finished after the oldest one, 90 s ago.
+    assert snap["rows_per_min"] == pytest.approx(2 / 90 * 60)
+    assert snap["eta_s"] == pytest.approx(7 * 45)
+    assert snap["slowest"] == (0, 4, 40.0)
+
+
+def test_plain_mode_logs_summary_lines(capsys):
+    configure("info", "text")
+    progress = Progress(2, mode="plain")
+    progress.row_started(0, 1, "https://x")
+    progress.row_finished(0, ok=True)
+    progress.draw()
+    assert capsys.readouterr().out.startswith("📊 [progress] 1/2 rows (1 ok, 0 failed)")
+
+    configure("info", "json")
+    progress.draw()
+    record = json.loads(capsys.readouterr().out)
+    assert record["event"] == "progress" and record["done"] == 1 and record["total"] == 2
+    configure("info", "text")
+    assert resolve_mode("auto", io.StringIO()) == "plain"
@@ -0,0 +1,95 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from output_manager import OutputManager
+from render_service import RenderService, make_server
+
+
+class FakeRenderer:
+    def __init__(self, outputs):
+        self.outputs = outputs
+
+    def render(self, url, name=None):
+        if "broken" in url:
+            return None
+        return self.outputs.store(self.outputs.reserve(url, custom_name=name), b"%PDF-")
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def base_url(tmp_path):
+    outputs = OutputManager(str(tmp_path))
+    service = RenderService(lambda: FakeRenderer(outputs), outputs, workers=2, max_queue=10).start()
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    service.stop()
+
+
+def _call(url, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status, response.read().decode()
+
+
+def test_submit_stream_and_metrics(base_url):
+    status, body = _call(base_url + "/jobs", {"url": "https://www.coursera.org/learn/x", "name": "X"})
+    job = json.loads(body)
+    assert status == 202 and job["status"] == "queued"
+
+    _, stream = _call(f"{base_url}/jobs/{job['id']}/events")
+    final = json.loads(stream.splitlines()[-1])
+    assert final["status"] == "done" and final["path"].endswith("X_x.pdf")
+
+    # Already rendered: answered from the manifest without queueing.
+    status, body = _call(base_url + "/jobs", {"url": "https://www.coursera.org/learn/x/"})
+    assert status == 200 and json.loads(body)["cached"]
+
+    metrics = json.loads(_call(base_url + "/metrics")[1])
+    assert metrics["rendered"] == 1 and metrics["jobs"]["done"] == 2
+
+
+def test_failures_and_bad_requests(base_url):
+    job = json.loads(_call(base_url + "/jobs", {"url": "https://www.coursera.org/learn/broken"})[1])
+    final = json.loads(_call(f"{base_url}/jobs/{job['id']}/events")[1].splitlines()[-1])
+    assert final["status"] == "failed"
+
+    with pytest.raises(urllib.error.HTTPError) as e:
+        _call(base_url + "/jobs", {"name": "no url"})
+    assert e.value.code == 400
+    with pytest.raises(urllib.error.HTTPError) as e:
+        _call(base_url + "/jobs/999")
+    assert e.value.code == 404
+
+
+def test_stop_cancels_queued_jobs(tmp_path):
+    outputs = OutputManager(str(tmp_path))
+    release = threading.Event()
+
+    class SlowRenderer(FakeRenderer):
+        def render(self, url, name=None):
+            release.wait(10)
+            return super().render(url, name)
+
+    service = RenderService(lambda: SlowRenderer(outputs), outputs, workers=1, max_queue=2).start()
+    running = service.submit("https://www.coursera.org/learn/a")
+    service.wait(running["id"], "queued", timeout=10)
+    queued = [service.submit(f"https://www.coursera.org/learn/{c}") for c in "bc"]
+
+    stopper = threading.Thread(target=service.stop)
+    stopper.start()
+    for job in queued:
+        assert service.wait(job["id"], "queued", timeout=10)["status"] == "cancelled"
+    release.set()
+    stopper.join(10)
+    assert not stopper.is_alive()
+    assert service.get(running["id"])["status"] == "done"
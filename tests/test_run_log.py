@@ -0,0 +1,30 @@
+import json
+import logging
+
+from run_log import ROW, configure, event, log, log_context, step
+
+
+def test_json_lines_carry_row_step_and_outcome(capsys):
+    configure("debug", "json")
+    with log_context(row=3, url="https://x"):
+        with step("about"):
+            log.warning("  ⚠️  slow")
+        event(ROW, "row done", event="row", outcome="ok", duration_s=1.5)
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    warning, step_end, row = records
+    assert warning["level"] == "warning" and warning["step"] == "about" and warning["msg"] == "⚠️  slow"
+    assert step_end["event"] == "step" and step_end["outcome"] == "warning" and step_end["row"] == 3
+    assert row == {**row, "level": "row", "row": 3, "url": "https://x", "outcome": "ok", "duration_s": 1.5}
+
+
+def test_quiet_keeps_only_row_summaries_and_problems(capsys):
+    configure("quiet", "text")
+    with step("about", "📍 STEP 1"):
+        log.debug("per-button line")
+        log.info("step line")
+    event(ROW, "🎉 Row 1/1 done")
+    log.error("❌ broken")
+    assert capsys.readouterr().out.splitlines() == ["🎉 Row 1/1 done", "❌ broken"]
+    configure("info", "text")
+    assert log.level == logging.INFO
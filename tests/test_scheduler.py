@@ -0,0 +1,39 @@
+from run_ledger import append_record, load_timings
+from scheduler import balance, estimate_seconds, order_longest_first
+
+
+def _jobs(*urls):
+    return [(i + 1, url, None) for i, url in enumerate(urls)]
+
+
+def test_estimates_fall_back_to_page_type():
+    assert estimate_seconds("https://www.coursera.org/specializations/x") > estimate_seconds(
+        "https://www.coursera.org/learn/y"
+    )
+
+
+def test_history_overrides_estimate_and_uses_canonical_url(tmp_path):
+    ledger = tmp_path / "ledger.jsonl"
+    append_record(str(ledger), url="https://www.coursera.org/learn/y/?utm=1", status="ok", seconds=400)
+    append_record(str(ledger), url="https://www.coursera.org/learn/z", status="failed", seconds=999)
+    history = load_timings(str(ledger))
+    assert estimate_seconds("https://WWW.coursera.org/learn/y#about", history) == 400
+    assert "https://www.coursera.org/learn/z" not in history
+
+
+def test_longest_first_keeps_sheet_order_for_ties():
+    jobs = _jobs(
+        "https://www.coursera.org/learn/a",
+        "https://www.coursera.org/specializations/b",
+        "https://www.coursera.org/learn/c",
+    )
+    assert [j[0] for j in order_longest_first(jobs)] == [2, 1, 3]
+
+
+def test_balance_spreads_cost_across_workers():
+    history = {f"https://x.org/learn/{i}": float(cost) for i, cost in enumerate([10, 9, 8, 7, 6, 5, 4])}
+    jobs = _jobs(*history)
+    buckets, totals = balance(jobs, 3, history)
+    assert sorted(len(b) for b in buckets) == [2, 2, 3]
+    assert sum(totals) == 49
+    assert max(totals) - min(totals) <= 4
@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from output_manager import OutputManager
+from run_ledger import append_record, ledger_path, read_records
+from sharding import merge_shards, parse_shard, save_report, select_shard, shard_of, shard_suffix
+
+
+def test_parse_shard():
+    assert parse_shard("1/4") == (1, 4)
+    for bad in ("4/4", "x", "1/0"):
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+
+
+def test_shards_partition_jobs_by_canonical_url():
+    jobs = [(i, f"https://www.coursera.org/learn/c{i}", None) for i in range(200)]
+    shards = [select_shard(jobs, i, 3) for i in range(3)]
+    assert sorted(j for s in shards for j in s) == jobs
+    assert all(shards)
+    assert shard_of("https://WWW.coursera.org/learn/c1/", 3) == shard_of("https://www.coursera.org/learn/c1", 3)
+
+
+def test_merge_folds_ledgers_manifests_and_reports(tmp_path):
+    out = str(tmp_path)
+    for index in range(2):
+        suffix = shard_suffix(index, 2)
+        outputs = OutputManager(out, shard=suffix)
+        url = f"https://www.coursera.org/learn/c{index}"
+        outputs.store(outputs.reserve(url, custom_name="Same"), b"%PDF-")
+        append_record(ledger_path(out, suffix), url=url, status="ok", seconds=1.0)
+        stats = {"worker": 0, "rows": 1, "succeeded": 1, "failed": 0, "recycles": 0, "peak_rss_mb": 1.0, "seconds": 1}
+        save_report(out, suffix, [stats], None)
+
+    workers, _, ledger_lines, manifest_lines = merge_shards(out)
+    assert [w["worker"] for w in workers] == ["0.0", "1.0"]
+    assert (ledger_lines, manifest_lines) == (2, 2)
+    assert len(list(read_records(ledger_path(out)))) == 2
+    merged = OutputManager(out)
+    paths = {merged.path_for(f"https://www.coursera.org/learn/c{i}") for i in range(2)}
+    assert len(paths) == 2 and all(os.path.exists(p) for p in paths)
+    assert sorted(os.listdir(out)) == sorted([".ledger.jsonl", "manifest.jsonl"] + [os.path.basename(p) for p in paths])